@@ -27,6 +27,18 @@ from .helpers import (
     as_constant,
     as_expression,
     as_constant_or_expression,
+    to_ccode,
+    cached_expression,
+    clear_caches,
+    is_time_dependent,
+    ExpressionsRegistry,
+    is_time_dependent_only,
+    TimeDependentConstant,
+    separate_space_and_time,
+    SeparableExpression,
+    subdomain_dofs,
+    discontinuous_facet_dofs,
+    estimate_quadrature_degree,
 )
 
 from .meshing.mesh import Mesh
@@ -57,11 +69,14 @@ from .boundary_conditions.fluxes.convective_flux import ConvectiveFlux
 from .boundary_conditions.fluxes.flux_custom import CustomFlux
 from .boundary_conditions.fluxes.mass_flux import MassFlux
 
+from .exports.binary_files import is_hdf5, write_to_hdf5
+from .exports.projector import Projector
 from .exports.exports import Exports
 from .exports.export import Export
 from .exports.xdmf_export import XDMFExport
 from .exports.trap_density_xdmf import TrapDensityXDMF
 
+from .exports.derived_quantities.time_series import TimeSeries
 from .exports.derived_quantities.derived_quantity import (
     DerivedQuantity,
     VolumeQuantity,
@@ -82,6 +97,7 @@ from .exports.derived_quantities.maximum_surface import MaximumSurface
 from .exports.derived_quantities.total_surface import TotalSurface
 from .exports.derived_quantities.total_volume import TotalVolume
 from .exports.derived_quantities.average_surface import AverageSurface
+from .exports.derived_quantities.point_values import PointValues
 from .exports.derived_quantities.point_value import PointValue
 
 from .exports.derived_quantities.derived_quantities import DerivedQuantities
@@ -99,6 +115,8 @@ from .sources.radioactive_decay import RadioactiveDecay
 from .materials.material import Material
 from .materials.materials import Materials
 
+from .nonlinear_problem import ZeroDofsBC, Problem, BlockSparseProblem
+
 from .concentration.concentration import Concentration
 from .initial_condition import InitialCondition
 from .concentration.mobile import Mobile
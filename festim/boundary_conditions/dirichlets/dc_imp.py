@@ -1,6 +1,10 @@
-from festim import DirichletBC, BoundaryConditionExpression, k_B
+from festim import (
+    DirichletBC,
+    BoundaryConditionExpression,
+    k_B,
+    as_constant_or_expression,
+)
 import fenics as f
-import sympy as sp
 
 
 def dc_imp(T, phi, R_p, D_0, E_D, Kr_0=None, E_Kr=None, Kd_0=None, E_Kd=None, P=None):
@@ -69,11 +73,11 @@ class ImplantationDirichlet(DirichletBC):
         self.P = P
 
     def create_expression(self, T):
-        phi = f.Expression(sp.printing.ccode(self.phi), t=0, degree=1)
-        R_p = f.Expression(sp.printing.ccode(self.R_p), t=0, degree=1)
+        phi = as_constant_or_expression(self.phi, degree=1)
+        R_p = as_constant_or_expression(self.R_p, degree=1)
         sub_expressions = [phi, R_p]
         if self.P is not None:
-            P = f.Expression(sp.printing.ccode(self.P), t=0, degree=1)
+            P = as_constant_or_expression(self.P, degree=1)
             sub_expressions.append(P)
         else:
             P = self.P
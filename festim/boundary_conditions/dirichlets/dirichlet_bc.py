@@ -1,6 +1,5 @@
-from festim import BoundaryCondition, k_B
+from festim import BoundaryCondition, k_B, as_constant_or_expression
 import fenics as f
-import sympy as sp
 
 
 class DirichletBC(BoundaryCondition):
@@ -26,11 +25,8 @@ class DirichletBC(BoundaryCondition):
         Args:
             T (fenics.Function): temperature
         """
-        value_BC = sp.printing.ccode(self.value)
-        value_BC = f.Expression(value_BC, t=0, degree=4)
         # TODO : why degree 4?
-
-        self.expression = value_BC
+        self.expression = as_constant_or_expression(self.value, degree=4)
 
     def normalise_by_solubility(self, materials, volume_markers, T):
         """Normalise self.expression by the solubility
@@ -59,6 +55,7 @@ class DirichletBC(BoundaryCondition):
         chemical_pot=False,
         materials=None,
         volume_markers=None,
+        component=None,
     ):
         """creates a list of fenics.DirichletBC and stores it in
         self.dirichlet_bc
@@ -74,6 +71,9 @@ class DirichletBC(BoundaryCondition):
                 chemical_pot is True. Defaults to None.
             volume_markers (fenics.MeshFunction, optional): the volume markers,
                 only needed when chemical_pot is True. Defaults to None.
+            component (int, optional): the component of V the boundary
+                condition is applied to. If None, self.field is used.
+                Defaults to None.
         """
         self.dirichlet_bc = []
         self.create_expression(T)
@@ -85,6 +85,8 @@ class DirichletBC(BoundaryCondition):
         # create a DirichletBC and add it to bcs
         if V.num_sub_spaces() == 0:
             funspace = V
+        elif component is not None:
+            funspace = V.sub(component)
         else:  # if only one field, use subspace
             funspace = V.sub(self.field)
         for surface in self.surfaces:
@@ -118,7 +120,10 @@ class BoundaryConditionTheta(f.UserExpression):
         material = self._materials.find_material_from_id(subdomain_id)
         S_0 = material.S_0
         E_S = material.E_S
-        c = self._bci(x)
+        if isinstance(self._bci, f.Constant):
+            c = float(self._bci)
+        else:
+            c = self._bci(x)
         S = S_0 * f.exp(-E_S / k_B / self._T(x))
         if material.solubility_law == "sievert":
             value[0] = c / S
@@ -1,6 +1,10 @@
-from festim import DirichletBC, BoundaryConditionExpression, k_B
+from festim import (
+    DirichletBC,
+    BoundaryConditionExpression,
+    k_B,
+    as_constant_or_expression,
+)
 import fenics as f
-import sympy as sp
 
 
 def henrys_law(T, H_0, E_H, pressure):
@@ -25,7 +29,7 @@ class HenrysBC(DirichletBC):
         self.pressure = pressure
 
     def create_expression(self, T):
-        pressure = f.Expression(sp.printing.ccode(self.pressure), t=0, degree=1)
+        pressure = as_constant_or_expression(self.pressure, degree=1)
         value_BC = BoundaryConditionExpression(
             T,
             henrys_law,
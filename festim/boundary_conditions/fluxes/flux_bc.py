@@ -1,6 +1,10 @@
-from festim import BoundaryCondition
+from festim import (
+    BoundaryCondition,
+    SeparableExpression,
+    separate_space_and_time,
+    as_constant_or_expression,
+)
 import sympy as sp
-import fenics as f
 
 
 class FluxBC(BoundaryCondition):
@@ -12,12 +16,18 @@ class FluxBC(BoundaryCondition):
 
     Args:
         surfaces (list or int): the surfaces of the BC
-        value (sp.Expr or float, optional): value of the flux. Defaults to
+        value (sp.Expr or float or festim.SeparableExpression, optional):
+            value of the flux. If value is a sympy expression of the form
+            f(x) * g(t), a festim.SeparableExpression is created. Defaults to
             None.
     """
 
     def __init__(self, surfaces, value=None, **kwargs) -> None:
         super().__init__(surfaces=surfaces, **kwargs)
+        if isinstance(value, sp.Expr):
+            separated = separate_space_and_time(value)
+            if separated is not None:
+                value = SeparableExpression(*separated)
         self.value = value
 
     def create_form(self, T, solute):
@@ -27,6 +37,9 @@ class FluxBC(BoundaryCondition):
             T (f.Function or f.Expression): Temperature
             solute (f.Function): mobile concentration of hydrogen
         """
-        form = sp.printing.ccode(self.value)
-        self.form = f.Expression(form, t=0, degree=2)
+        if isinstance(self.value, SeparableExpression):
+            self.form = self.value.as_ufl()
+            self.sub_expressions.append(self.value)
+            return
+        self.form = as_constant_or_expression(self.value)
         self.sub_expressions.append(self.form)
@@ -1,4 +1,11 @@
-from festim import Concentration, FluxBC, k_B, RadioactiveDecay
+from festim import (
+    Concentration,
+    FluxBC,
+    k_B,
+    RadioactiveDecay,
+    SeparableExpression,
+    TimeDependentConstant,
+)
 from fenics import *
 
 
@@ -21,7 +28,16 @@ class Mobile(Concentration):
         self.sources = []
         self.boundary_conditions = []
 
-    def create_form(self, materials, mesh, T, dt=None, traps=None, soret=False):
+    def create_form(
+        self,
+        materials,
+        mesh,
+        T,
+        dt=None,
+        traps=None,
+        soret=False,
+        mass_lumping=None,
+    ):
         """Creates the variational formulation.
 
         Args:
@@ -34,14 +50,32 @@ class Mobile(Concentration):
                 potential is assumed. Defaults to False.
             soret (bool, optional): If True, Soret effect is assumed. Defaults
                 to False.
+            mass_lumping (str, optional): "traps" to lump the trapping
+                terms, "all" to also lump the transient term (see
+                festim.Settings). Defaults to None.
         """
         self.F = 0
-        self.create_diffusion_form(materials, mesh, T, dt=dt, traps=traps, soret=soret)
+        self.create_diffusion_form(
+            materials,
+            mesh,
+            T,
+            dt=dt,
+            traps=traps,
+            soret=soret,
+            mass_lumping=mass_lumping,
+        )
         self.create_source_form(mesh.dx)
         self.create_fluxes_form(T, mesh.ds)
 
     def create_diffusion_form(
-        self, materials, mesh, T, dt=None, traps=None, soret=False
+        self,
+        materials,
+        mesh,
+        T,
+        dt=None,
+        traps=None,
+        soret=False,
+        mass_lumping=None,
     ):
         """Creates the variational formulation for the diffusive part.
 
@@ -55,6 +89,9 @@ class Mobile(Concentration):
                 potential is assumed. Defaults to False.
             soret (bool, optional): If True, Soret effect is assumed. Defaults
                 to False.
+            mass_lumping (str, optional): "traps" to lump the trapping
+                terms, "all" to also lump the transient term (see
+                festim.Settings). Defaults to None.
         """
         if soret and mesh.type in ["cylindrical", "spherical"]:
             msg = "Soret effect not implemented in {} coordinates".format(mesh.type)
@@ -74,7 +111,10 @@ class Mobile(Concentration):
             for subdomain in subdomains:
                 dx = mesh.dx(subdomain)
                 # transient form
-                if dt is not None:
+                if dt is not None and mass_lumping == "all":
+                    dx_lumped = mesh.dx(subdomain, scheme="vertex", degree=1)
+                    F += ((c_0 - c_0_n) / dt.value) * self.test_function * dx_lumped
+                elif dt is not None:
                     F += ((c_0 - c_0_n) / dt.value) * self.test_function * dx
                 D = D_0 * exp(-E_D / k_B / T.T)
                 if mesh.type == "cartesian":
@@ -108,6 +148,9 @@ class Mobile(Concentration):
 
         # add the trapping terms
         F_trapping = 0
+        if mass_lumping in ["traps", "all"]:
+            # same quadrature as the traps equations
+            dx = mesh.dx(scheme="vertex", degree=1)
         if traps is not None:
             for trap in traps:
                 for i, mat in enumerate(trap.materials):
@@ -124,6 +167,16 @@ class Mobile(Concentration):
                         E_p = trap.E_p
                         density = trap.density[0]
                     c_m, _ = self.get_concentration_for_a_given_material(mat, T)
+                    if trap.equilibrium:
+                        # d(c_m + c_t)/dt, c_t at equilibrium with c_m
+                        if dt is not None:
+                            c_t = trap.get_equilibrium_concentration(c_m, T.T, i)
+                            F_trapping += (
+                                -((c_t - trap.previous_solution) / dt.value)
+                                * self.test_function
+                                * dx(mat.id)
+                            )
+                        continue
                     F_trapping += (
                         -k_0
                         * exp(-E_k / k_B / T.T)
@@ -155,6 +208,9 @@ class Mobile(Concentration):
 
         print("Defining source terms")
         for source in self.sources:
+            if isinstance(source, RadioactiveDecay) and source.exponential:
+                # applied by festim.HTransportProblem after each time step
+                continue
             if type(source.volume) is list:
                 volumes = source.volume
             else:
@@ -164,7 +220,15 @@ class Mobile(Concentration):
 
             for volume in volumes:
                 F_source += -source.value * self.test_function * dx(volume)
-            if isinstance(source.value, (Expression, UserExpression)):
+            if isinstance(
+                source.value,
+                (
+                    Expression,
+                    UserExpression,
+                    SeparableExpression,
+                    TimeDependentConstant,
+                ),
+            ):
                 expressions_source.append(source.value)
 
         self.F_source = F_source
@@ -1,4 +1,6 @@
-from festim import Trap, as_constant_or_expression
+from festim import Trap, as_constant_or_expression, is_time_dependent
+import fenics as f
+import numpy as np
 
 
 class ExtrinsicTrapBase(Trap):
@@ -14,6 +16,8 @@ class ExtrinsicTrapBase(Trap):
         relative_tolerance=1e-10,
         maximum_iterations=30,
         linear_solver=None,
+        pointwise=False,
+        coupled=False,
         **kwargs,
     ):
         """Inits ExtrinsicTrap
@@ -36,18 +40,108 @@ class ExtrinsicTrapBase(Trap):
                 If None, the default fenics linear solver will be used ("umfpack").
                 More information can be found at: https://fenicsproject.org/pub/tutorial/html/._ftut1017.html.
                 Defaults to None.
+            pointwise (bool, optional): if True, the density is updated
+                DOF-wise with the exact solution of its ODE over the time
+                step instead of a global Newton solve. Defaults to False.
+            coupled (bool, optional): if True, the density is an additional
+                component of the mixed function space and is solved together
+                with the concentrations. Defaults to False.
+
+        Raises:
+            ValueError: if both pointwise and coupled are True
+            ValueError: if pointwise is True and the subclass doesn't
+                implement get_density_coefficients
         """
         super().__init__(k_0, E_k, p_0, E_p, materials, density=None, id=id)
         self.absolute_tolerance = absolute_tolerance
         self.relative_tolerance = relative_tolerance
         self.maximum_iterations = maximum_iterations
         self.linear_solver = linear_solver
+        self.pointwise = pointwise
+        self.coupled = coupled
+        if self.pointwise and self.coupled:
+            raise ValueError("an extrinsic trap cannot be both pointwise and coupled")
+        if self.pointwise and (
+            type(self).get_density_coefficients
+            is ExtrinsicTrapBase.get_density_coefficients
+        ):
+            raise ValueError(
+                "pointwise update is not implemented for {}".format(type(self).__name__)
+            )
+        self.density_component = None
+        # nodal values of the time independent coefficients
+        self._nodal_values = {}
 
         for name, val in kwargs.items():
             setattr(self, name, as_constant_or_expression(val))
         self.density_previous_solution = None
         self.density_test_function = None
 
+    def get_density_coefficients(self, V, T):
+        """Returns the coefficients a and b of the density ODE
+        dn/dt = a - b * n at the DOFs of V. Needs to be overwritten by
+        subclasses supporting the pointwise update (checked when the trap
+        is created).
+
+        Args:
+            V (fenics.FunctionSpace): the function space of the density
+            T (festim.Temperature): the temperature of the simulation
+
+        Raises:
+            NotImplementedError: if not implemented by the subclass
+        """
+        raise NotImplementedError(
+            "pointwise update is not implemented for {}".format(type(self).__name__)
+        )
+
+    def update_density_pointwise(self, dt, T):
+        """Updates self.density[0] DOF-wise with the exact solution of
+        dn/dt = a - b * n from self.density_previous_solution, a and b being
+        frozen over the time step
+
+        Args:
+            dt (festim.Stepsize): the stepsize of the simulation
+            T (festim.Temperature): the temperature of the simulation
+        """
+        V = self.density[0].function_space()
+        n_prev = self.density_previous_solution.vector().get_local()
+        a, b = self.get_density_coefficients(V, T)
+        a = a + np.zeros_like(n_prev)
+        b = b + np.zeros_like(n_prev)
+        dt = float(dt.value)
+
+        # (1 - exp(-b*dt))/b tends to dt when b tends to zero
+        growth = np.full_like(n_prev, dt)
+        positive = b > 0
+        growth[positive] = -np.expm1(-b[positive] * dt) / b[positive]
+        n = n_prev * np.exp(-b * dt) + a * growth
+
+        self.density[0].vector().set_local(n)
+        self.density[0].vector().apply("insert")
+
+    def nodal_values(self, value, V):
+        """Returns the values of value at the DOFs of V. The values of
+        time independent expressions are only interpolated once per
+        function space.
+
+        Args:
+            value (fenics.Constant, fenics.Expression, fenics.Function): the
+                value to evaluate
+            V (fenics.FunctionSpace): the function space
+
+        Returns:
+            float or numpy.ndarray: the nodal values
+        """
+        if isinstance(value, f.Constant):
+            return float(value)
+        if isinstance(value, f.Function) or is_time_dependent(value):
+            return f.interpolate(value, V).vector().get_local()
+        key = (id(value), V.id())
+        if key not in self._nodal_values or self._nodal_values[key][0] is not value:
+            values = f.interpolate(value, V).vector().get_local()
+            self._nodal_values[key] = (value, values)
+        return self._nodal_values[key][1]
+
 
 class ExtrinsicTrap(ExtrinsicTrapBase):
     """
@@ -127,3 +221,24 @@ class ExtrinsicTrap(ExtrinsicTrapBase):
             * dx
         )
         self.form_density = F
+
+    def get_density_coefficients(self, V, T):
+        """Returns the coefficients a and b of the density ODE
+        dn/dt = a - b * n at the DOFs of V
+
+        Args:
+            V (fenics.FunctionSpace): the function space of the density
+            T (festim.Temperature): the temperature of the simulation
+
+        Returns:
+            float or numpy.ndarray, float or numpy.ndarray: a and b
+        """
+        phi_0 = self.nodal_values(self.phi_0, V)
+        rate_a = self.nodal_values(self.eta_a, V) * self.nodal_values(self.f_a, V)
+        rate_b = self.nodal_values(self.eta_b, V) * self.nodal_values(self.f_b, V)
+        a = phi_0 * (rate_a + rate_b)
+        b = phi_0 * (
+            rate_a / self.nodal_values(self.n_amax, V)
+            + rate_b / self.nodal_values(self.n_bmax, V)
+        )
+        return a, b
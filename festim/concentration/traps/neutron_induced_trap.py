@@ -1,5 +1,6 @@
 from festim import ExtrinsicTrapBase, k_B
 import fenics as f
+import numpy as np
 
 
 class NeutronInducedTrap(ExtrinsicTrapBase):
@@ -92,3 +93,23 @@ class NeutronInducedTrap(ExtrinsicTrapBase):
         )
 
         self.form_density = F
+
+    def get_density_coefficients(self, V, T):
+        """Returns the coefficients a and b of the density ODE
+        dn/dt = a - b * n at the DOFs of V with a = phi*K and
+        b = phi*K/n_max + A_0*exp(-E_A/(k_B*T))
+
+        Args:
+            V (fenics.FunctionSpace): the function space of the density
+            T (festim.Temperature): the temperature of the simulation
+
+        Returns:
+            float or numpy.ndarray, float or numpy.ndarray: a and b
+        """
+        T = f.interpolate(T.T, V).vector().get_local()
+        a = self.nodal_values(self.phi, V) * self.nodal_values(self.K, V)
+        b = a / self.nodal_values(self.n_max, V)
+        b = b + self.nodal_values(self.A_0, V) * np.exp(
+            -self.nodal_values(self.E_A, V) / (k_B * T)
+        )
+        return a, b
@@ -1,6 +1,15 @@
-from festim import Concentration, k_B, Material, Theta, RadioactiveDecay
+from festim import (
+    Concentration,
+    k_B,
+    Material,
+    Theta,
+    RadioactiveDecay,
+    SeparableExpression,
+    TimeDependentConstant,
+    to_ccode,
+    ZeroDofsBC,
+)
 from fenics import *
-import sympy as sp
 import numpy as np
 
 
@@ -16,6 +25,12 @@ class Trap(Concentration):
         density (sp.Add, float, list, fenics.Expresion, fenics.UserExpression):
             the trap density (m-3)
         id (int, optional): The trap id. Defaults to None.
+        equilibrium (bool, optional): if True, the trap is assumed to be in
+            local equilibrium with the mobile concentration (Oriani):
+            c_t = k c_m n / (k c_m + p). The trapped concentration is then
+            not a component of the mixed function space and only appears in
+            the transient term of the mobile concentration. Useful when the
+            trapping kinetics are fast. Defaults to False.
 
     Raises:
         ValueError: if duplicates are found in materials
@@ -36,11 +51,19 @@ class Trap(Concentration):
         This will act as a singular trap but with seperate properties for
         respective materials. Parameters k_0, E_k, p_0, E_p, materials and
         density MUST have the same length for this method to be valid.
+
+        Traps living in disjoint materials can be automatically
+        conglomerated in the same component of the mixed function space by
+        festim.HTransportProblem (see festim.Settings.conglomerate_traps and
+        festim.Traps.make_components).
     """
 
-    def __init__(self, k_0, E_k, p_0, E_p, materials, density, id=None):
+    def __init__(
+        self, k_0, E_k, p_0, E_p, materials, density, id=None, equilibrium=False
+    ):
         super().__init__()
         self.id = id
+        self.equilibrium = equilibrium
         self.k_0 = k_0
         self.E_k = E_k
         self.p_0 = p_0
@@ -50,6 +73,9 @@ class Trap(Concentration):
         self.density = []
         self.make_density(density)
         self.sources = []
+        self.restriction_bcs = []
+        self.component = None
+        self.shared_component = False
 
     @property
     def materials(self):
@@ -96,7 +122,7 @@ class Trap(Concentration):
                     self.density.append(density)
                 # else assume it's a sympy expression
                 else:
-                    density_expr = sp.printing.ccode(density)
+                    density_expr = to_ccode(density)
                     self.density.append(
                         Expression(
                             density_expr,
@@ -144,10 +170,17 @@ class Trap(Concentration):
         expressions_trap = []
         F_trapping = 0  # initialise the form
 
-        if dt is not None:
+        if dt is not None and self.shared_component:
+            # d(c_t)/dt in trapping equation, the rest of the component
+            # is handled by festim.Traps
+            for mat in self.materials:
+                F_trapping += (
+                    ((solution - prev_solution) / dt.value) * test_function * dx(mat.id)
+                )
+        elif dt is not None:
             # d(c_t)/dt in trapping equation
             F_trapping += ((solution - prev_solution) / dt.value) * test_function * dx
-        else:
+        elif not self.restriction_bcs and not self.shared_component:
             # if the sim is steady state and
             # if a trap is not defined in one subdomain
             # add c_t = 0 to the form in this subdomain
@@ -197,6 +230,192 @@ class Trap(Concentration):
         self.F += self.F_trapping
         self.sub_expressions += expressions_trap
 
+    def get_equilibrium_concentration(self, c_m, T, i=0):
+        """Computes the trapped concentration in equilibrium with the mobile
+        concentration c_t = k c_m n / (k c_m + p)
+
+        Args:
+            c_m (ufl.Expr): the mobile concentration
+            T (ufl.Expr): the temperature
+            i (int, optional): the index of the material in self.materials
+                (for conglomerated traps). Defaults to 0.
+
+        Returns:
+            ufl.Expr: the trapped concentration
+        """
+        if type(self.k_0) is list:
+            k_0, E_k = self.k_0[i], self.E_k[i]
+            p_0, E_p = self.p_0[i], self.E_p[i]
+            density = self.density[i]
+        else:
+            k_0, E_k = self.k_0, self.E_k
+            p_0, E_p = self.p_0, self.E_p
+            density = self.density[0]
+        k = k_0 * exp(-E_k / k_B / T)
+        p = p_0 * exp(-E_p / k_B / T)
+        return k * c_m * density / (k * c_m + p)
+
+    def initialise_equilibrium(self, mobile, T, V, dx):
+        """Creates the projection of the trapped concentration at
+        equilibrium on V and sets self.previous_solution to the projection
+        of the initial trapped concentration. With a DG space the projection
+        preserves the trapped inventory of each cell. The projection system
+        is only factorised once (cell by cell for DG spaces).
+
+        Args:
+            mobile (festim.Mobile): the mobile concentration of the simulation
+            T (festim.Temperature): the temperature of the simulation
+            V (fenics.FunctionSpace): the function space of the projection
+            dx (fenics.Measure): the dx measure of the sim
+        """
+        u, w = TrialFunction(V), TestFunction(V)
+        a = u * w * dx
+        if V.ufl_element().family() == "Discontinuous Lagrange":
+            self.equilibrium_solver = LocalSolver(a)
+            self.equilibrium_solver.factorize()
+        else:
+            self.equilibrium_solver = LUSolver(assemble(a))
+        equilibrium_concentration = 0
+        initial_concentration = 0
+        for i, mat in enumerate(self.materials):
+            c_m, c_m_n = mobile.get_concentration_for_a_given_material(mat, T)
+            equilibrium_concentration += (
+                self.get_equilibrium_concentration(c_m, T.T, i) * w * dx(mat.id)
+            )
+            initial_concentration += (
+                self.get_equilibrium_concentration(c_m_n, T.T, i) * w * dx(mat.id)
+            )
+        self.equilibrium_concentration = Form(equilibrium_concentration)
+        self.equilibrium_solution = Function(V)
+        self.previous_solution = Function(V)
+        self.solve_equilibrium_projection(
+            Form(initial_concentration), self.previous_solution
+        )
+
+    def solve_equilibrium_projection(self, L, c_t):
+        """Solves the projection system with the right hand side L
+
+        Args:
+            L (fenics.Form): the right hand side
+            c_t (fenics.Function): the projection (updated in place)
+        """
+        b = assemble(L)
+        if isinstance(self.equilibrium_solver, LocalSolver):
+            V = c_t.function_space()
+            self.equilibrium_solver.solve_local(c_t.vector(), b, V.dofmap())
+        else:
+            self.equilibrium_solver.solve(c_t.vector(), b)
+
+    def project_equilibrium_concentration(self):
+        """Projects the current trapped concentration at equilibrium
+
+        Returns:
+            fenics.Function: the trapped concentration (the same Function
+                self.equilibrium_solution is updated at each call)
+        """
+        self.solve_equilibrium_projection(
+            self.equilibrium_concentration, self.equilibrium_solution
+        )
+        return self.equilibrium_solution
+
+    def get_host_ids(self, materials=None):
+        """Returns the volume ids of the materials of the trap
+
+        Args:
+            materials (list, optional): the festim.Material objects to
+                consider. If None, self.materials will be used. Defaults to
+                None.
+
+        Returns:
+            list: the volume ids
+        """
+        if materials is None:
+            materials = self.materials
+        host_ids = []
+        for mat in materials:
+            host_ids += mat.id if isinstance(mat.id, list) else [mat.id]
+        return host_ids
+
+    def get_host_cells(self, volume_markers, materials=None):
+        """Finds the cells located in the materials of the trap
+
+        Args:
+            volume_markers (fenics.MeshFunction): the volume markers
+            materials (list, optional): the festim.Material objects to
+                consider. If None, self.materials will be used. Defaults to
+                None.
+
+        Returns:
+            np.ndarray: array of booleans, True if the cell is located in
+                the materials
+        """
+        return np.isin(volume_markers.array(), self.get_host_ids(materials))
+
+    def get_outside_dofs(self, V, volume_markers, materials=None, component=None):
+        """Finds the DOFs owned by the process located outside of the trap
+        materials: the integrals of their basis functions over the cells of
+        the materials (on all the processes) are zero. The DOFs on the
+        interfaces with the other materials are inside.
+
+        Args:
+            V (fenics.FunctionSpace): the function space (mixed if component
+                is not None)
+            volume_markers (fenics.MeshFunction): the volume markers
+            materials (list, optional): the festim.Material objects to
+                consider. If None, self.materials will be used. Defaults to
+                None.
+            component (int, optional): the component of the trap in the mixed
+                function space V. If None, V is a scalar function space.
+                Defaults to None.
+
+        Returns:
+            np.ndarray: the local indices of the DOFs
+        """
+        v = TestFunction(V)
+        if component is not None:
+            v = v[component]
+        dx_host = Measure("dx", domain=V.mesh(), subdomain_data=volume_markers)
+        integrals = assemble(
+            sum(v * dx_host(host_id) for host_id in self.get_host_ids(materials))
+        )
+
+        if component is not None:
+            start = V.dofmap().ownership_range()[0]
+            dofs = V.sub(component).dofmap().dofs() - start
+        else:
+            dofs = np.arange(integrals.local_size())
+        return dofs[integrals.get_local()[dofs] == 0]
+
+    def create_restriction_bcs(self, V, volume_markers, materials=None, component=None):
+        """Creates a festim.ZeroDofsBC setting the trap concentration to zero
+        on the DOFs located outside of the trap materials (see
+        get_outside_dofs). These DOFs are then eliminated from the Newton
+        system. The DOFs are still allocated in the function space.
+
+        Args:
+            V (fenics.FunctionSpace): the function space of the
+                concentrations (mixed if component is not None)
+            volume_markers (fenics.MeshFunction): the volume markers
+            materials (list, optional): the festim.Material objects hosting
+                the component of the trap (eg. when it is shared with other
+                traps). If None, self.materials will be used. Defaults to
+                None.
+            component (int, optional): the component of the trap in the mixed
+                function space V. If None, V is a scalar function space.
+                Defaults to None.
+
+        Returns:
+            list: the festim.ZeroDofsBC objects (empty if the trap is
+                defined everywhere)
+        """
+        outside_dofs = self.get_outside_dofs(V, volume_markers, materials, component)
+
+        self.restriction_bcs = []
+        comm = V.mesh().mpi_comm()
+        if MPI.sum(comm, len(outside_dofs)) > 0:
+            self.restriction_bcs.append(ZeroDofsBC(outside_dofs))
+        return self.restriction_bcs
+
     def create_source_form(self, dx):
         """Create the source form for the trap
 
@@ -204,9 +423,20 @@ class Trap(Concentration):
             dx (fenics.Measure): the dx measure of the sim
         """
         for source in self.sources:
+            if isinstance(source, RadioactiveDecay) and source.exponential:
+                # applied by festim.HTransportProblem after each time step
+                continue
             if isinstance(source, RadioactiveDecay):
                 source.value = source.form(self.solution)
             self.F_source = -source.value * self.test_function * dx(source.volume)
             self.F += self.F_source
-            if isinstance(source.value, (Expression, UserExpression)):
+            if isinstance(
+                source.value,
+                (
+                    Expression,
+                    UserExpression,
+                    SeparableExpression,
+                    TimeDependentConstant,
+                ),
+            ):
                 self.sub_expressions.append(source.value)
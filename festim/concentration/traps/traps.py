@@ -74,20 +74,171 @@ class Traps(list):
     def create_forms(self, mobile, materials, T, dx, dt=None):
         self.F = 0
         for trap in self:
+            if trap.equilibrium:
+                if trap.sources:
+                    raise ValueError(
+                        "sources are not supported for traps at equilibrium"
+                    )
+                # the trapped concentration is accounted for in festim.Mobile
+                self.sub_expressions += trap.density
+                continue
             trap.create_form(mobile, materials, T, dx, dt=dt)
             self.F += trap.F
             self.sub_expressions += trap.sub_expressions
 
+        # components shared by several traps outside of their materials
+        for component in self.get_components():
+            trap = component[0]
+            if not trap.shared_component:
+                continue
+            component_materials = [mat for tr in component for mat in tr.materials]
+            for mat in materials:
+                if mat in component_materials:
+                    continue
+                if dt is not None:
+                    self.F += (
+                        ((trap.solution - trap.previous_solution) / dt.value)
+                        * trap.test_function
+                        * dx(mat.id)
+                    )
+                elif not trap.restriction_bcs:
+                    self.F += trap.solution * trap.test_function * dx(mat.id)
+
+    def make_components(
+        self, volume_markers, element_type="CG", excluded=[], conglomerate=True
+    ):
+        """Assigns a component of the mixed function space to each trap.
+        If conglomerate is True, traps living in disjoint materials are
+        conglomerated in the same component to reduce the number of degrees
+        of freedom. With continuous elements, their materials must not be
+        adjacent either (no shared vertex) since the concentrations would be
+        continuous at the interfaces. The grouping is the same on all the
+        processes. Traps at equilibrium don't have a component.
+
+        Args:
+            volume_markers (fenics.MeshFunction): the volume markers
+            element_type (str, optional): the finite element of the traps
+                ("CG" or "DG"). Defaults to "CG".
+            excluded (list, optional): the traps that can't share their
+                component (eg. traps with initial conditions or Dirichlet
+                boundary conditions). Defaults to [].
+            conglomerate (bool, optional): if False, each trap has its own
+                component. Defaults to True.
+
+        Returns:
+            int: the number of components
+        """
+        # traps at equilibrium don't have a component
+        kinetic_traps = [trap for trap in self if not trap.equilibrium]
+        if not conglomerate:
+            for i, trap in enumerate(kinetic_traps, 1):
+                trap.component = i
+                trap.shared_component = False
+            return len(kinetic_traps)
+
+        mesh = volume_markers.mesh()
+        if element_type == "CG":
+            # vertices of the cells of the trap materials, the integrals of
+            # the basis functions are summed over the processes
+            v = f.TestFunction(f.FunctionSpace(mesh, "CG", 1))
+            dx = f.Measure("dx", domain=mesh, subdomain_data=volume_markers)
+            host_entities = [
+                f.assemble(sum(v * dx(host_id) for host_id in trap.get_host_ids()))
+                .get_local()
+                .astype(bool)
+                for trap in kinetic_traps
+            ]
+        else:
+            host_entities = [
+                trap.get_host_cells(volume_markers) for trap in kinetic_traps
+            ]
+
+        def can_share(entities_1, entities_2):
+            overlap = float((entities_1 & entities_2).any())
+            # same answer on all the processes
+            return f.MPI.max(mesh.mpi_comm(), overlap) == 0
+
+        # greedy conglomeration of the traps
+        components, components_entities = [], []
+        for trap, entities in zip(kinetic_traps, host_entities):
+            for i, component in enumerate(components):
+                if trap in excluded or component[0] in excluded:
+                    continue
+                if can_share(entities, components_entities[i]):
+                    component.append(trap)
+                    components_entities[i] = components_entities[i] | entities
+                    break
+            else:
+                components.append([trap])
+                components_entities.append(entities)
+
+        for i, component in enumerate(components, 1):
+            for trap in component:
+                trap.component = i
+                trap.shared_component = len(component) > 1
+        return len(components)
+
+    def get_components(self):
+        """Groups the traps by component of the mixed function space (traps
+        at equilibrium are ignored)
+
+        Returns:
+            list: lists of festim.Trap sharing the same component, ordered
+                by component
+        """
+        components = {}
+        kinetic_traps = [trap for trap in self if not trap.equilibrium]
+        for i, trap in enumerate(kinetic_traps, 1):
+            component = trap.component if trap.component is not None else i
+            components.setdefault(component, []).append(trap)
+        return [components[key] for key in sorted(components)]
+
+    def create_restriction_bcs(self, V, volume_markers):
+        """Creates the festim.ZeroDofsBC objects eliminating the trap DOFs
+        located outside of the trap materials
+
+        Args:
+            V (fenics.FunctionSpace): the mixed function space of the
+                concentrations
+            volume_markers (fenics.MeshFunction): the volume markers
+
+        Returns:
+            list: the festim.ZeroDofsBC objects
+        """
+        bcs = []
+        for i, component in enumerate(self.get_components(), 1):
+            bcs += component[0].create_restriction_bcs(
+                V,
+                volume_markers,
+                materials=[mat for tr in component for mat in tr.materials],
+                component=i,
+            )
+        return bcs
+
     def get_trap(self, id):
         for trap in self:
             if trap.id == id:
                 return trap
         raise ValueError("Couldn't find trap {}".format(id))
 
+    def coupled_extrinsic_traps(self):
+        """Returns the ExtrinsicTrapBase objects which density is solved
+        together with the concentrations
+
+        Returns:
+            list: the coupled extrinsic traps
+        """
+        return [
+            trap
+            for trap in self
+            if isinstance(trap, festim.ExtrinsicTrapBase) and trap.coupled
+        ]
+
     def initialise_extrinsic_traps(self, V):
-        """Add functions to ExtrinsicTrapBase objects for density form"""
+        """Add functions to ExtrinsicTrapBase objects for density form.
+        Coupled extrinsic traps are initialised by festim.HTransportProblem"""
         for trap in self:
-            if isinstance(trap, festim.ExtrinsicTrapBase):
+            if isinstance(trap, festim.ExtrinsicTrapBase) and not trap.coupled:
                 trap.density = [f.Function(V)]
                 trap.density_test_function = f.TestFunction(V)
                 trap.density_previous_solution = f.project(f.Constant(0), V)
@@ -104,14 +255,28 @@ class Traps(list):
         self.extrinsic_formulations = []
         expressions_extrinsic = []
         for trap in self:
-            if isinstance(trap, festim.ExtrinsicTrapBase):
+            if isinstance(trap, festim.ExtrinsicTrapBase) and not trap.coupled:
                 trap.create_form_density(dx, dt, T)
                 self.extrinsic_formulations.append(trap.form_density)
         self.sub_expressions.extend(expressions_extrinsic)
 
-    def solve_extrinsic_traps(self):
+    def solve_extrinsic_traps(self, dt=None, T=None):
+        """Solves the extrinsic traps densities
+
+        Args:
+            dt (festim.Stepsize, optional): the stepsize of the simulation.
+                Only needed for pointwise extrinsic traps. Defaults to None.
+            T (festim.Temperature, optional): the temperature of the
+                simulation. Only needed for pointwise extrinsic traps.
+                Defaults to None.
+        """
         for trap in self:
-            if isinstance(trap, festim.ExtrinsicTrapBase):
+            if isinstance(trap, festim.ExtrinsicTrapBase) and trap.coupled:
+                # solved with the concentrations
+                continue
+            elif isinstance(trap, festim.ExtrinsicTrapBase) and trap.pointwise:
+                trap.update_density_pointwise(dt, T)
+            elif isinstance(trap, festim.ExtrinsicTrapBase):
                 du_t = f.TrialFunction(trap.density[0].function_space())
                 J_t = f.derivative(trap.form_density, trap.density[0], du_t)
                 problem = f.NonlinearVariationalProblem(
@@ -132,5 +297,5 @@ class Traps(list):
 
     def update_extrinsic_traps_density(self):
         for trap in self:
-            if isinstance(trap, festim.ExtrinsicTrapBase):
+            if isinstance(trap, festim.ExtrinsicTrapBase) and not trap.coupled:
                 trap.density_previous_solution.assign(trap.density[0])
@@ -0,0 +1,62 @@
+import numpy as np
+
+BINARY_EXTENSIONS = (".npz", ".h5", ".hdf5")
+
+
+def is_hdf5(filename):
+    """Checks if a filename is a HDF5 file
+
+    Args:
+        filename (str): the filename
+
+    Returns:
+        bool: True if filename ends with .h5 or .hdf5
+    """
+    return filename.endswith((".h5", ".hdf5"))
+
+
+def write_to_hdf5(
+    filename, datasets, nb_rows_written=0, fixed_datasets={}, attributes={}, **kwargs
+):
+    """Appends rows to the resizable datasets of a HDF5 file. If no rows have
+    been written yet, the file is (re)created with the fixed datasets and the
+    attributes. Requires h5py.
+
+    Args:
+        filename (str): the filename (must end with .h5 or .hdf5)
+        datasets (dict): the new rows of each resizable dataset (first axis)
+        nb_rows_written (int, optional): the number of rows already in the
+            resizable datasets. Defaults to 0.
+        fixed_datasets (dict, optional): datasets only written when the file
+            is created. Defaults to {}.
+        attributes (dict, optional): attributes of the file, only written
+            when the file is created. Defaults to {}.
+        kwargs: passed to h5py.File.create_dataset for the resizable datasets
+            (eg. compression="gzip")
+    """
+    import h5py
+
+    if nb_rows_written == 0:
+        mode = "w"
+    else:
+        mode = "r+"
+    with h5py.File(filename, mode) as file:
+        if nb_rows_written == 0:
+            for name, value in fixed_datasets.items():
+                file.create_dataset(name, data=value)
+            for name, value in attributes.items():
+                file.attrs[name] = value
+        for name, rows in datasets.items():
+            rows = np.asarray(rows, dtype=np.float64)
+            if name not in file:
+                file.create_dataset(
+                    name,
+                    shape=(0,) + rows.shape[1:],
+                    maxshape=(None,) + rows.shape[1:],
+                    dtype=np.float64,
+                    chunks=True,
+                    **kwargs,
+                )
+            dataset = file[name]
+            dataset.resize(nb_rows_written + len(rows), axis=0)
+            dataset[nb_rows_written:] = rows
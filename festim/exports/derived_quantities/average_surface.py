@@ -1,5 +1,4 @@
 from festim import SurfaceQuantity
-import fenics as f
 
 
 class AverageSurface(SurfaceQuantity):
@@ -7,7 +6,11 @@ class AverageSurface(SurfaceQuantity):
         super().__init__(field=field, surface=surface)
         self.title = "Average {} surface {}".format(self.field, self.surface)
 
+    @property
+    def integrand(self):
+        return self.function
+
     def compute(self):
-        return f.assemble(self.function * self.ds(self.surface)) / f.assemble(
-            1 * self.ds(self.surface)
-        )
+        total = self.assemble_integral("total", self.integrand, self.measure)
+        size = self.assemble_integral("size", 1, self.measure, constant=True)
+        return total / size
@@ -1,7 +1,20 @@
 from festim import (
     MinimumVolume,
     MaximumVolume,
+    MinimumSurface,
+    MaximumSurface,
+    TotalVolume,
+    AverageVolume,
+    TotalSurface,
+    AverageSurface,
+    SurfaceFlux,
+    PointValue,
+    PointValues,
     DerivedQuantity,
+    TimeSeries,
+    is_hdf5,
+    write_to_hdf5,
+    estimate_quadrature_degree,
 )
 import fenics as f
 import os
@@ -10,19 +23,84 @@ from typing import Union
 import warnings
 
 
+class DataRows(list):
+    """The header and the rows of a festim.DerivedQuantities (see
+    DerivedQuantities.data). The rows appended to this list are also added to
+    the time series.
+
+    Args:
+        rows (list): the header (if any)
+        time_series (festim.TimeSeries): the time series of the derived
+            quantities
+
+    Attributes:
+        nb_rows (int): the number of rows of the time series in the list
+        t (list): the times of the rows
+    """
+
+    def __init__(self, rows, time_series) -> None:
+        super().__init__(rows)
+        self.time_series = time_series
+        self.nb_rows = 0
+        self.t = []
+        self.sync()
+
+    def sync(self):
+        """Adds the rows of the time series computed since the last call"""
+        if self.nb_rows < len(self.time_series):
+            rows = self.time_series.rows(self.nb_rows)
+            super().extend(rows.tolist())
+            self.t.extend(rows[:, 0].tolist())
+            self.nb_rows = len(self.time_series)
+
+    def append(self, row):
+        self.time_series.append(row[0], row[1:])
+        super().append(row)
+        self.t.append(row[0])
+        self.nb_rows += 1
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def __iadd__(self, rows):
+        self.extend(rows)
+        return self
+
+
 class DerivedQuantities(list):
     """
     A list of festim.DerivedQuantity objects
 
     Args:
-        filename (str, optional): the filename (must end with .csv).
-            If None, the data will not be exported. Defaults to None.
+        filename (str, optional): the filename (must end with .csv, .npz,
+            .h5 or .hdf5). If None, the data will not be exported. .npz
+            files are only written by finalize() at the end of the
+            simulation. Defaults to None.
         nb_iterations_between_compute (int, optional): number of
             iterations between each derived quantities computation.
             Defaults to 1.
         nb_iterations_between_exports (int, optional): number of
             iterations between each export. If None, the file will be
             exported at the last timestep. Defaults to None.
+        max_rows_in_memory (int, optional): if not None, the computed values
+            are moved to a temporary file on disk when this number of rows
+            is reached in memory. Defaults to None.
+        compression (str, optional): the compression filter of the HDF5
+            dataset (eg. "gzip"), only used if filename ends with .h5 or
+            .hdf5. Defaults to None.
+
+    Attributes:
+        time_series (festim.TimeSeries): the computed values (one time
+            column shared by all the quantities)
+        header (list): the header of the file, None if no header
+        data (list): the header and the rows (time and values of the
+            quantities) built from self.time_series. The list is cached and
+            only the new rows are added to it when accessed. The rows
+            appended to this list are added to self.time_series. Setting it replaces
+            the header and the values and resets the file writer: the next
+            call to write() rewrites the file
+        t (list): the times at which the quantities were computed
     """
 
     def __init__(
@@ -31,6 +109,8 @@ class DerivedQuantities(list):
         filename: str = None,
         nb_iterations_between_compute: int = 1,
         nb_iterations_between_exports: int = None,
+        max_rows_in_memory: int = None,
+        compression: str = None,
     ) -> None:
         # checks that input is list
         if len(args) == 0:
@@ -43,9 +123,15 @@ class DerivedQuantities(list):
         self.filename = filename
         self.nb_iterations_between_compute = nb_iterations_between_compute
         self.nb_iterations_between_exports = nb_iterations_between_exports
+        self.max_rows_in_memory = max_rows_in_memory
+        self.compression = compression
 
         self.data = [self.make_header()]
-        self.t = []
+        # compiled fused forms and sizes of the subdomains
+        self._fused_forms = {}
+        self._sizes = []
+        # located points of the PointValue quantities
+        self._point_values = {}
 
     @property
     def derived_quantities(self):
@@ -92,6 +178,41 @@ class DerivedQuantities(list):
             "festim.DerivedQuantities must be a list of festim.DerivedQuantity"
         )
 
+    @property
+    def data(self):
+        if self._data is None or self._data.time_series is not self.time_series:
+            header = [] if self.header is None else [self.header]
+            self._data = DataRows(header, self.time_series)
+        self._data.sync()
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        rows = list(value)
+        if rows and any(isinstance(item, str) for item in rows[0]):
+            self.header = rows.pop(0)
+        else:
+            self.header = None
+
+        if rows:
+            nb_columns = len(rows[0]) - 1
+        elif self.header is not None:
+            nb_columns = len(self.header) - 1
+        else:
+            nb_columns = len(self)
+        self.time_series = TimeSeries(
+            nb_columns, max_rows_in_memory=self.max_rows_in_memory
+        )
+        for row in rows:
+            self.time_series.append(row[0], row[1:])
+        self._data = None
+        # number of rows of self.time_series already in the file
+        self._nb_rows_written = 0
+
+    @property
+    def t(self):
+        return self.data.t
+
     @property
     def filename(self):
         return self._filename
@@ -101,9 +222,10 @@ class DerivedQuantities(list):
         if value is not None:
             if not isinstance(value, str):
                 raise TypeError("filename must be a string")
-            if not value.endswith(".csv"):
-                raise ValueError("filename must end with .csv")
+            if not value.endswith((".csv", ".npz", ".h5", ".hdf5")):
+                raise ValueError("filename must end with .csv, .npz, .h5 or .hdf5")
         self._filename = value
+        self._nb_rows_written = 0
 
     def make_header(self):
         header = ["t(s)"]
@@ -113,6 +235,7 @@ class DerivedQuantities(list):
 
     def assign_measures_to_quantities(self, dx, ds):
         self.volume_markers = dx.subdomain_data()
+        self.surface_markers = ds.subdomain_data()
         for quantity in self:
             quantity.dx = dx
             quantity.ds = ds
@@ -131,32 +254,236 @@ class DerivedQuantities(list):
             quantity.thermal_cond = materials.thermal_cond
             quantity.Q = materials.Q
 
+    def assign_residual_to_quantities(self, residual, V, dirichlet_surfaces):
+        """Gives the residual of the hydrogen transport problem to the
+        consistent SurfaceFlux objects
+
+        Args:
+            residual (fenics.GenericVector): the residual of the hydrogen
+                transport problem, assembled after each solve (see
+                festim.HTransportProblem.create_residual)
+            V (fenics.FunctionSpace): the function space of the solute
+            dirichlet_surfaces (list): the surfaces with a DirichletBC on
+                the solute
+
+        Raises:
+            ValueError: if a consistent flux is computed on a surface
+                without DirichletBC
+        """
+        for quantity in self:
+            if isinstance(quantity, SurfaceFlux) and quantity.consistent:
+                if quantity.surface not in dirichlet_surfaces:
+                    raise ValueError(
+                        "consistent SurfaceFlux requires a DirichletBC on "
+                        f"surface {quantity.surface}"
+                    )
+                quantity.residual = residual
+                quantity.residual_space = V
+
     def compute(self, t):
         # TODO need to support for soret flag in surface flux
-        row = [t]
-        for quantity in self:
-            if isinstance(quantity, (MaximumVolume, MinimumVolume)):
+        if self.time_series.nb_columns != len(self):
+            if len(self.time_series) > 0:
+                raise ValueError(
+                    f"values of {self.time_series.nb_columns} quantities have "
+                    f"already been computed, got {len(self)} quantities "
+                    "(set data to reset the values)"
+                )
+            # quantities added before the first computation
+            self.data = [] if self.header is None else [self.make_header()]
+        integrals = self.compute_integrals()
+        point_values = self.compute_point_values()
+        values = []
+        for i, quantity in enumerate(self):
+            if i in integrals:
+                value = integrals[i]
+            elif i in point_values:
+                value = point_values[i]
+            elif isinstance(quantity, (MaximumVolume, MinimumVolume)):
                 value = quantity.compute(self.volume_markers)
+            elif isinstance(quantity, (MaximumSurface, MinimumSurface)):
+                value = quantity.compute(self.surface_markers)
             else:
                 value = quantity.compute()
-            quantity.data.append(value)
-            quantity.t.append(t)
-            row.append(value)
-        self.data.append(row)
-        self.t.append(t)
+            quantity.time_series = self.time_series
+            quantity.column = i
+            values.append(value)
+        self.time_series.append(t, values)
+
+    def compute_integrals(self):
+        """Computes the quantities defined by an integral over a volume or a
+        surface (TotalVolume, AverageVolume, TotalSurface, AverageSurface and
+        SurfaceFlux, except the consistent fluxes) with a single assembly:
+        each distinct (integrand, measure) pair is multiplied by a component
+        of a test function of a real vector function space.
+
+        Returns:
+            dict: the values of the quantities, the keys are the indices of
+                the quantities in self
+        """
+        indices = [
+            i
+            for i, quantity in enumerate(self)
+            if isinstance(
+                quantity,
+                (TotalVolume, AverageVolume, TotalSurface, AverageSurface, SurfaceFlux),
+            )
+            and not (isinstance(quantity, SurfaceFlux) and quantity.consistent)
+        ]
+        if len(indices) == 0:
+            return {}
+
+        integrals = []
+        components = {}
+        for i in indices:
+            integral = (self[i].integrand, self[i].measure)
+            if integral not in integrals:
+                integrals.append(integral)
+            components[i] = integrals.index(integral)
+        results = self.assemble_fused("integrals", integrals)
+
+        values = {}
+        for i in indices:
+            values[i] = results[components[i]]
+            if isinstance(self[i], (AverageVolume, AverageSurface)):
+                values[i] /= self.get_size(self[i].measure)
+        return values
+
+    def compute_point_values(self):
+        """Computes the PointValue quantities. The points of the quantities
+        sharing the same function are evaluated together (see
+        festim.PointValues).
+
+        Returns:
+            dict: the values of the quantities, the keys are the indices of
+                the quantities in self
+        """
+        groups = {}
+        for i, quantity in enumerate(self):
+            if isinstance(quantity, PointValue) and isinstance(
+                quantity.function, f.Function
+            ):
+                groups.setdefault(id(quantity.function), []).append(i)
+
+        values = {}
+        for indices in groups.values():
+            points = tuple(tuple(self[i].x) for i in indices)
+            if points not in self._point_values:
+                self._point_values[points] = PointValues(points)
+            results = self._point_values[points].evaluate(self[indices[0]].function)
+            values.update(zip(indices, results))
+        return values
+
+    def get_size(self, measure):
+        """Returns the size (volume or area) of a subdomain, only computed
+        once per measure
+
+        Args:
+            measure (ufl.Measure): the measure of the subdomain
+
+        Returns:
+            float: the size of the subdomain
+        """
+        for known_measure, size in self._sizes:
+            if known_measure == measure:
+                return size
+        size = f.assemble(1 * measure)
+        self._sizes.append((measure, size))
+        return size
+
+    def assemble_fused(self, name, integrals):
+        """Assembles several integrals at once. The form is only compiled
+        again if the integrals changed. Each integral keeps the quadrature
+        degree it would have if it was assembled on its own.
+
+        Args:
+            name (str): the name of the fused form
+            integrals (list): the (integrand, measure) pairs
+
+        Returns:
+            numpy.ndarray: the values of the integrals
+        """
+        if name not in self._fused_forms or self._fused_forms[name][0] != integrals:
+            mesh = self.volume_markers.mesh()
+            V = f.VectorFunctionSpace(mesh, "R", 0, dim=len(integrals))
+            v = f.TestFunction(V)
+            form = sum(
+                integrand
+                * v[k]
+                * measure(degree=estimate_quadrature_degree(integrand, measure))
+                for k, (integrand, measure) in enumerate(integrals)
+            )
+            # global indices of the components, the process owning them
+            # may not be this one
+            comm = mesh.mpi_comm()
+            dofs = []
+            for k in range(len(integrals)):
+                owned = V.sub(k).dofmap().dofs()
+                dof = owned[0] if len(owned) > 0 else -1
+                dofs.append(int(f.MPI.max(comm, float(dof))))
+            self._fused_forms[name] = (
+                integrals,
+                f.Form(form),
+                np.array(dofs, dtype=np.intc),
+            )
+        _, form, dofs = self._fused_forms[name]
+        return f.assemble(form).gather(dofs)
 
     def write(self):
-        if self.filename is not None:
-            # if the directory doesn't exist
-            # create it
-            dirname = os.path.dirname(self.filename)
-            if not os.path.exists(dirname):
-                os.makedirs(dirname, exist_ok=True)
-
-            # save the data to csv
-            np.savetxt(self.filename, np.array(self.data), fmt="%s", delimiter=",")
+        """Writes the new rows to the file (.npz files are written by
+        finalize())"""
+        if self.filename is not None and not self.filename.endswith(".npz"):
+            self.write_to_file()
         return True
 
+    def finalize(self):
+        """Writes the file if rows haven't been written yet (called at the
+        end of the simulation)"""
+        if self.filename is not None:
+            if self._nb_rows_written < self.time_series.nb_rows:
+                self.write_to_file()
+
+    def write_to_file(self):
+        """Writes the values to self.filename. Only the new rows are
+        appended to .csv and HDF5 files."""
+        # if the directory doesn't exist
+        # create it
+        dirname = os.path.dirname(self.filename)
+        if not os.path.exists(dirname):
+            os.makedirs(dirname, exist_ok=True)
+
+        if self.filename.endswith(".npz"):
+            np.savez(
+                self.filename,
+                data=self.time_series.rows(),
+                header=np.array(self.header or [], dtype=str),
+            )
+        elif is_hdf5(self.filename):
+            attributes = {}
+            if self.header is not None:
+                attributes["header"] = self.header
+            write_to_hdf5(
+                self.filename,
+                {"data": self.time_series.rows(self._nb_rows_written)},
+                nb_rows_written=self._nb_rows_written,
+                attributes=attributes,
+                compression=self.compression,
+            )
+        else:
+            # only the new rows are appended to the csv file
+            new_rows = self.time_series.rows(self._nb_rows_written).tolist()
+            if self._nb_rows_written == 0:
+                mode = "w"
+                if self.header is not None:
+                    new_rows.insert(0, self.header)
+            else:
+                mode = "a"
+            with open(self.filename, mode) as file:
+                file.writelines(
+                    ",".join(str(value) for value in row) + "\n" for row in new_rows
+                )
+        self._nb_rows_written = self.time_series.nb_rows
+
     def is_export(self, t, final_time, nb_iterations):
         """Checks if the derived quantities should be exported or not based on
         the current time, the final time of simulation and the current number
@@ -1,10 +1,20 @@
 from festim import Export
+import fenics as f
 
 
 class DerivedQuantity(Export):
     """
     Args:
         field (str, int):  the field ("solute", 0, 1, "T", "retention")
+
+    Attributes:
+        data (list): the computed values of the quantity (copied from the
+            column of self.time_series, only the new values are added when
+            accessed)
+        t (list): the times at which the quantity was computed
+        time_series (festim.TimeSeries): the time series storing the values,
+            set by festim.DerivedQuantities
+        column (int): the index of the quantity in self.time_series
     """
 
     def __init__(self, field) -> None:
@@ -16,8 +26,71 @@ class DerivedQuantity(Export):
         self.S = None
         self.thermal_cond = None
         self.Q = None
-        self.data = []
-        self.t = []
+        self.time_series = None
+        self.column = None
+        self._integrals = {}
+        self._data = []
+        self._t = []
+        # time series and number of its rows copied in self._data and self._t
+        self._synced = (None, 0)
+
+    @property
+    def data(self):
+        self.sync()
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self.sync()
+        self._data = list(value)
+
+    @property
+    def t(self):
+        self.sync()
+        return self._t
+
+    @t.setter
+    def t(self, value):
+        self.sync()
+        self._t = list(value)
+
+    def sync(self):
+        """Adds the values computed since the last call to self.data and
+        self.t (both are reset if the time series changed)"""
+        if self.time_series is None:
+            return
+        time_series, nb_rows = self._synced
+        if time_series is not self.time_series:
+            self._data, self._t = [], []
+            nb_rows = 0
+        if nb_rows < len(self.time_series):
+            rows = self.time_series.rows(nb_rows)
+            self._t.extend(rows[:, 0].tolist())
+            self._data.extend(rows[:, self.column + 1].tolist())
+        self._synced = (self.time_series, len(self.time_series))
+
+    def assemble_integral(self, name, integrand, measure, constant=False):
+        """Assembles integrand * measure. The form is compiled once and only
+        compiled again if the integrand or the measure changed (eg. new
+        function or new measures).
+
+        Args:
+            name (str): the name of the integral
+            integrand (ufl.core.expr.Expr): the integrand
+            measure (ufl.Measure): the measure
+            constant (bool, optional): if True, the value is also computed
+                only once (eg. the size of a subdomain). Defaults to False.
+
+        Returns:
+            float: the value of the integral
+        """
+        integral = (integrand, measure)
+        if name not in self._integrals or self._integrals[name][0] != integral:
+            self._integrals[name] = [integral, f.Form(integrand * measure), None]
+        cached = self._integrals[name]
+        if cached[2] is None or not constant:
+            cached[2] = f.assemble(cached[1])
+        return cached[2]
 
 
 class VolumeQuantity(DerivedQuantity):
@@ -42,6 +115,11 @@ class VolumeQuantity(DerivedQuantity):
 
         self._volume = value
 
+    @property
+    def measure(self):
+        """ufl.Measure: the measure of the volume"""
+        return self.dx(self.volume)
+
 
 class SurfaceQuantity(DerivedQuantity):
     def __init__(self, field: str or int, surface: int) -> None:
@@ -63,3 +141,8 @@ class SurfaceQuantity(DerivedQuantity):
         if not isinstance(value, int) or isinstance(value, bool):
             raise TypeError("surface should be an int")
         self._surface = value
+
+    @property
+    def measure(self):
+        """ufl.Measure: the measure of the surface"""
+        return self.ds(self.surface)
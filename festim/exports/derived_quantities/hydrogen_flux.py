@@ -4,5 +4,5 @@ from festim import SurfaceFlux
 class HydrogenFlux(SurfaceFlux):
     """Equivalent to SurfaceFlux("solute", ...)"""
 
-    def __init__(self, surface) -> None:
-        super().__init__(field="solute", surface=surface)
+    def __init__(self, surface, consistent=False) -> None:
+        super().__init__(field="solute", surface=surface, consistent=consistent)
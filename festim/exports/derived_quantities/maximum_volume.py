@@ -1,4 +1,4 @@
-from festim import VolumeQuantity
+from festim import VolumeQuantity, subdomain_dofs
 import fenics as f
 import numpy as np
 
@@ -9,18 +9,14 @@ class MaximumVolume(VolumeQuantity):
         self.title = "Maximum {} volume {}".format(self.field, self.volume)
 
     def compute(self, volume_markers):
-        """Minimum of f over subdomains cells marked with self.volume"""
+        """Maximum of f over subdomains cells marked with self.volume"""
         V = self.function.function_space()
 
-        dm = V.dofmap()
+        dofs = subdomain_dofs(V, volume_markers, self.volume)
+        values = self.function.vector().get_local()[dofs]
+        if values.size > 0:
+            local_max = np.max(values)
+        else:
+            local_max = -np.inf
 
-        subd_dofs = np.unique(
-            np.hstack(
-                [
-                    dm.cell_dofs(c.index())
-                    for c in f.SubsetIterator(volume_markers, self.volume)
-                ]
-            )
-        )
-
-        return np.max(self.function.vector().get_local()[subd_dofs])
+        return f.MPI.max(V.mesh().mpi_comm(), float(local_max))
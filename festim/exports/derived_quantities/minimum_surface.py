@@ -1,4 +1,4 @@
-from festim import DerivedQuantity
+from festim import DerivedQuantity, subdomain_dofs
 import fenics as f
 import numpy as np
 
@@ -20,15 +20,11 @@ class MinimumSurface(DerivedQuantity):
         """Minimum of f over subdomains facets marked with self.surface"""
         V = self.function.function_space()
 
-        dm = V.dofmap()
+        dofs = subdomain_dofs(V, surface_markers, self.surface)
+        values = self.function.vector().get_local()[dofs]
+        if values.size > 0:
+            local_min = np.min(values)
+        else:
+            local_min = np.inf
 
-        subd_dofs = np.unique(
-            np.hstack(
-                [
-                    dm.cell_dofs(c.index())
-                    for c in f.SubsetIterator(surface_markers, self.surface)
-                ]
-            )
-        )
-
-        return np.min(self.function.vector().get_local()[subd_dofs])
+        return f.MPI.min(V.mesh().mpi_comm(), float(local_min))
@@ -1,4 +1,4 @@
-from festim import VolumeQuantity
+from festim import VolumeQuantity, subdomain_dofs
 import fenics as f
 import numpy as np
 
@@ -12,15 +12,11 @@ class MinimumVolume(VolumeQuantity):
         """Minimum of f over subdomains cells marked with self.volume"""
         V = self.function.function_space()
 
-        dm = V.dofmap()
+        dofs = subdomain_dofs(V, volume_markers, self.volume)
+        values = self.function.vector().get_local()[dofs]
+        if values.size > 0:
+            local_min = np.min(values)
+        else:
+            local_min = np.inf
 
-        subd_dofs = np.unique(
-            np.hstack(
-                [
-                    dm.cell_dofs(c.index())
-                    for c in f.SubsetIterator(volume_markers, self.volume)
-                ]
-            )
-        )
-
-        return np.min(self.function.vector().get_local()[subd_dofs])
+        return f.MPI.min(V.mesh().mpi_comm(), float(local_min))
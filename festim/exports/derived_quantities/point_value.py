@@ -1,4 +1,6 @@
-from festim import DerivedQuantity
+from festim import DerivedQuantity, PointValues
+import fenics as f
+import numpy as np
 
 
 class PointValue(DerivedQuantity):
@@ -16,7 +18,16 @@ class PointValue(DerivedQuantity):
             x = [x]
         self.x = x
         self.title = "{} value at {}".format(field, x)
+        self._point_values = None
 
     def compute(self):
-        """The value at the point"""
-        return self.function(self.x)
+        """The value at the point. If the field is a fenics.Function, the
+        point is only located once (see festim.PointValues), other fields
+        (eg. fenics.Expression) are evaluated at the point directly"""
+        if not isinstance(self.function, f.Function):
+            return self.function(self.x)
+        if self._point_values is None or not np.array_equal(
+            self._point_values.points[0], self.x
+        ):
+            self._point_values = PointValues([self.x])
+        return self._point_values.evaluate(self.function)[0]
@@ -0,0 +1,107 @@
+import fenics as f
+import numpy as np
+
+
+class PointValues:
+    """Evaluates functions at a set of points. The points are located once
+    per function space (cell containing the point, global indices of its
+    DOFs and values of the basis functions at the point) so that evaluating
+    a function only requires one gather of the DOFs values. Works in
+    parallel: the values are available on all processes.
+
+    Args:
+        points (list): the coordinates of the points
+
+    Attributes:
+        points (numpy.ndarray): the coordinates of the points, shape
+            (number of points, dimension)
+    """
+
+    def __init__(self, points) -> None:
+        self.points = np.array(points, dtype=float).reshape(len(points), -1)
+        self._locations = {}
+
+    def locate(self, V):
+        """Locates the points in the mesh of V (only done once per function
+        space)
+
+        Args:
+            V (fenics.FunctionSpace): a scalar function space
+
+        Raises:
+            ValueError: if a point is outside of the mesh
+
+        Returns:
+            tuple: the indices of the points found by the process, the
+                global indices of the DOFs of their cells, the values of the
+                basis functions at the points and the weights of the points
+                (1/number of processes where each point was found)
+        """
+        if V.id() in self._locations:
+            return self._locations[V.id()]
+
+        mesh = V.mesh()
+        tree = mesh.bounding_box_tree()
+        # only the cells owned by the process
+        nb_owned_cells = mesh.topology().ghost_offset(mesh.topology().dim())
+        element = V.element()
+        dofmap = V.dofmap()
+
+        found, dofs, basis_values = [], [], []
+        for i, point in enumerate(self.points):
+            cell_index = tree.compute_first_entity_collision(f.Point(*point))
+            if cell_index >= nb_owned_cells:
+                continue
+            cell = f.Cell(mesh, cell_index)
+            found.append(i)
+            dofs.append(
+                [
+                    dofmap.local_to_global_index(dof)
+                    for dof in dofmap.cell_dofs(cell_index)
+                ]
+            )
+            basis_values.append(
+                element.evaluate_basis_all(point, cell.get_vertex_coordinates(), 0)
+            )
+
+        # number of processes where each point was found
+        counts = np.zeros(len(self.points))
+        counts[found] = 1
+        comm = mesh.mpi_comm()
+        if comm.size > 1:
+            counts = comm.allreduce(counts)
+        if np.any(counts == 0):
+            missing = self.points[counts == 0].tolist()
+            raise ValueError(f"points {missing} are outside of the mesh")
+
+        shape = (len(found), element.space_dimension())
+        location = (
+            np.array(found, dtype=int),
+            np.array(dofs, dtype=np.intc).reshape(shape),
+            np.array(basis_values, dtype=float).reshape(shape),
+            1 / counts[found],
+        )
+        self._locations[V.id()] = location
+        return location
+
+    def evaluate(self, function):
+        """Evaluates a function at the points
+
+        Args:
+            function (fenics.Function): a scalar function
+
+        Returns:
+            numpy.ndarray: the values at the points
+        """
+        V = function.function_space()
+        found, dofs, basis_values, weights = self.locate(V)
+
+        # collective operation, called by all the processes
+        dofs_values = function.vector().gather(dofs.flatten()).reshape(dofs.shape)
+
+        values = np.zeros(len(self.points))
+        values[found] = weights * np.sum(basis_values * dofs_values, axis=1)
+        comm = V.mesh().mpi_comm()
+        if comm.size > 1:
+            values = comm.allreduce(values)
+        return values
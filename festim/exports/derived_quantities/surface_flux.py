@@ -1,10 +1,10 @@
-from festim import SurfaceQuantity, k_B
+from festim import SurfaceQuantity, k_B, subdomain_dofs
 import fenics as f
 import numpy as np
 
 
 class SurfaceFlux(SurfaceQuantity):
-    def __init__(self, field, surface) -> None:
+    def __init__(self, field, surface, consistent=False) -> None:
         """
         Object to compute the flux J of a field u through a surface
         J = integral(-prop * grad(u) . n ds)
@@ -19,8 +19,27 @@ class SurfaceFlux(SurfaceQuantity):
         Args:
             field (str, int):  the field ("solute", 0, 1, "T", "retention")
             surface (int): the surface id
+            consistent (bool, optional): if True, the flux is computed from
+                the residual of the hydrogen transport problem at the DOFs
+                of the surface (reaction force) instead of the gradient of
+                the solution. More accurate on coarse meshes, only available
+                for the solute on surfaces with a DirichletBC. The DOFs
+                shared by several surfaces (eg. corners) are counted in the
+                flux of each surface. Defaults to False.
+
+        Attributes:
+            residual (fenics.GenericVector): the residual of the hydrogen
+                transport problem assembled after each solve, set by
+                festim.DerivedQuantities if consistent is True
+            residual_space (fenics.FunctionSpace): the function space of the
+                solute in the hydrogen transport problem
         """
         super().__init__(field=field, surface=surface)
+        if consistent and field not in [0, "0", "solute"]:
+            raise ValueError("consistent fluxes are only available for the solute")
+        self.consistent = consistent
+        self.residual = None
+        self.residual_space = None
         self.title = "Flux surface {}: {}".format(self.surface, self.field)
 
     @property
@@ -33,21 +52,42 @@ class SurfaceFlux(SurfaceQuantity):
         }
         return field_to_prop[self.field]
 
+    @property
+    def integrand(self):
+        return self.prop * f.dot(f.grad(self.function), self.n)
+
     def compute(self, soret=False):
-        flux = f.assemble(
-            self.prop * f.dot(f.grad(self.function), self.n) * self.ds(self.surface)
-        )
+        if self.consistent:
+            return self.compute_reaction()
+        flux = self.assemble_integral("flux", self.integrand, self.measure)
         if soret and self.field in [0, "0", "solute"]:
-            flux += f.assemble(
+            flux += self.assemble_integral(
+                "soret",
                 self.prop
                 * self.function
                 * self.Q
                 / (k_B * self.T**2)
-                * f.dot(f.grad(self.T), self.n)
-                * self.ds(self.surface)
+                * f.dot(f.grad(self.T), self.n),
+                self.measure,
             )
         return flux
 
+    def compute_reaction(self):
+        """Computes the flux from the residual of the hydrogen transport
+        problem: at the DOFs of a surface with a DirichletBC, the residual is
+        the flux tested against the basis functions. Their sum is the flux
+        through the surface, consistent with the solution (the Soret effect
+        is included).
+
+        Returns:
+            float: the flux
+        """
+        dofs = subdomain_dofs(
+            self.residual_space, self.ds.subdomain_data(), self.surface
+        )
+        flux = np.sum(self.residual.get_local()[dofs])
+        return f.MPI.sum(self.residual_space.mesh().mpi_comm(), float(flux))
+
 
 class SurfaceFluxCylindrical(SurfaceFlux):
     """
@@ -83,12 +123,8 @@ class SurfaceFluxCylindrical(SurfaceFlux):
             raise ValueError("Azimuthal range must be between 0 and pi")
         self._azimuth_range = value
 
-    def compute(self, soret=False):
-        if soret:
-            raise NotImplementedError(
-                "Soret effect not implemented for cylindrical coordinates"
-            )
-
+    @property
+    def integrand(self):
         if self.r is None:
             mesh = (
                 self.function.function_space().mesh()
@@ -99,15 +135,20 @@ class SurfaceFluxCylindrical(SurfaceFlux):
         # dS_z = r dr dtheta , assuming axisymmetry dS_z = theta r dr
         # dS_r = r dz dtheta , assuming axisymmetry dS_r = theta r dz
         # in both cases the expression with self.ds is the same
-
-        flux = f.assemble(
-            self.prop
+        return (
+            float(self.azimuth_range[1] - self.azimuth_range[0])
+            * self.prop
             * self.r
             * f.dot(f.grad(self.function), self.n)
-            * self.ds(self.surface)
         )
-        flux *= self.azimuth_range[1] - self.azimuth_range[0]
-        return flux
+
+    def compute(self, soret=False):
+        if soret:
+            raise NotImplementedError(
+                "Soret effect not implemented for cylindrical coordinates"
+            )
+
+        return self.assemble_integral("flux", self.integrand, self.measure)
 
 
 class SurfaceFluxSpherical(SurfaceFlux):
@@ -159,12 +200,8 @@ class SurfaceFluxSpherical(SurfaceFlux):
             raise ValueError("Azimuthal range must be between 0 and pi")
         self._azimuth_range = value
 
-    def compute(self, soret=False):
-        if soret:
-            raise NotImplementedError(
-                "Soret effect not implemented for spherical coordinates"
-            )
-
+    @property
+    def integrand(self):
         if self.r is None:
             mesh = (
                 self.function.function_space().mesh()
@@ -175,13 +212,21 @@ class SurfaceFluxSpherical(SurfaceFlux):
         # dS_r = r^2 sin(theta) dtheta dphi
         # integral(f dS_r) = integral(f r^2 sin(theta) dtheta dphi)
         #                  = (phi2 - phi1) * (-cos(theta2) + cos(theta1)) * f r^2
-        flux = f.assemble(
-            self.prop
+        angular_factor = float(
+            (self.polar_range[1] - self.polar_range[0])
+            * (-np.cos(self.azimuth_range[1]) + np.cos(self.azimuth_range[0]))
+        )
+        return (
+            angular_factor
+            * self.prop
             * self.r**2
             * f.dot(f.grad(self.function), self.n)
-            * self.ds(self.surface)
-        )
-        flux *= (self.polar_range[1] - self.polar_range[0]) * (
-            -np.cos(self.azimuth_range[1]) + np.cos(self.azimuth_range[0])
         )
-        return flux
+
+    def compute(self, soret=False):
+        if soret:
+            raise NotImplementedError(
+                "Soret effect not implemented for spherical coordinates"
+            )
+
+        return self.assemble_integral("flux", self.integrand, self.measure)
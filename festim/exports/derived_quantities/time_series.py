@@ -0,0 +1,122 @@
+import numpy as np
+import tempfile
+
+
+class TimeSeries:
+    """Columnar storage of the values of derived quantities: one time column
+    shared by all the quantities and one column per quantity. The values are
+    stored column by column in a preallocated float64 array whose capacity
+    is doubled when full. The views returned by rows(), column() and t are only valid until
+    the next call to append().
+
+    Args:
+        nb_columns (int): the number of quantities (the time column excluded)
+        capacity (int, optional): the initial number of rows. Defaults to 16.
+        max_rows_in_memory (int, optional): if not None, the rows are moved to
+            a temporary file on disk when the number of rows in memory
+            reaches this value. Defaults to None.
+
+    Attributes:
+        nb_columns (int): the number of quantities
+        nb_rows (int): the total number of rows (in memory and on disk)
+        nb_rows_on_disk (int): the number of rows moved to disk
+    """
+
+    def __init__(self, nb_columns, capacity=16, max_rows_in_memory=None) -> None:
+        self.nb_columns = nb_columns
+        self.max_rows_in_memory = max_rows_in_memory
+        if max_rows_in_memory is not None:
+            if not isinstance(max_rows_in_memory, int) or max_rows_in_memory < 1:
+                raise ValueError("max_rows_in_memory must be a positive int")
+            capacity = min(capacity, max_rows_in_memory)
+        self._array = np.empty((nb_columns + 1, max(capacity, 1)), dtype=np.float64)
+        self._nb_rows_in_memory = 0
+        self.nb_rows_on_disk = 0
+        self._file = None
+
+    @property
+    def nb_rows(self):
+        return self.nb_rows_on_disk + self._nb_rows_in_memory
+
+    def __len__(self):
+        return self.nb_rows
+
+    def append(self, t, values):
+        """Adds a row to the time series
+
+        Args:
+            t (float): the time
+            values (list): the values of the quantities
+        """
+        if len(values) != self.nb_columns:
+            raise ValueError(
+                f"expected {self.nb_columns} values, got {len(values)} values"
+            )
+        if self._nb_rows_in_memory == self._array.shape[1]:
+            if self.max_rows_in_memory is not None and (
+                self._nb_rows_in_memory == self.max_rows_in_memory
+            ):
+                self._spill()
+            else:
+                self._grow()
+        row = self._array[:, self._nb_rows_in_memory]
+        row[0] = t
+        row[1:] = values
+        self._nb_rows_in_memory += 1
+
+    def _grow(self):
+        """Doubles the capacity of the array (bounded by max_rows_in_memory)"""
+        capacity = 2 * self._array.shape[1]
+        if self.max_rows_in_memory is not None:
+            capacity = min(capacity, self.max_rows_in_memory)
+        array = np.empty((self.nb_columns + 1, capacity), dtype=np.float64)
+        array[:, : self._nb_rows_in_memory] = self._array[:, : self._nb_rows_in_memory]
+        self._array = array
+
+    def _spill(self):
+        """Moves the rows in memory to the temporary file"""
+        if self._file is None:
+            self._file = tempfile.TemporaryFile()
+        self._file.seek(0, 2)
+        # written row by row
+        self._array[:, : self._nb_rows_in_memory].T.tofile(self._file)
+        self.nb_rows_on_disk += self._nb_rows_in_memory
+        self._nb_rows_in_memory = 0
+
+    def rows(self, start=0):
+        """Returns the rows of the time series from start. This is a view of
+        the array in memory unless rows are read from disk.
+
+        Args:
+            start (int, optional): the index of the first row. Defaults to 0.
+
+        Returns:
+            numpy.ndarray: the rows (time in the first column), shape
+                (nb_rows - start, nb_columns + 1)
+        """
+        in_memory = self._array[:, : self._nb_rows_in_memory].T
+        if start >= self.nb_rows_on_disk:
+            return in_memory[start - self.nb_rows_on_disk :]
+        self._file.flush()
+        self._file.seek(start * self._array.itemsize * self._array.shape[0])
+        on_disk = np.fromfile(self._file, dtype=np.float64).reshape(
+            -1, self.nb_columns + 1
+        )
+        return np.concatenate((on_disk, in_memory))
+
+    @property
+    def t(self):
+        """numpy.ndarray: the time column"""
+        return self.rows()[:, 0]
+
+    def column(self, index):
+        """Returns the values of a quantity. This is a view of the array in
+        memory unless rows have been moved to disk.
+
+        Args:
+            index (int): the index of the quantity
+
+        Returns:
+            numpy.ndarray: the values of the quantity
+        """
+        return self.rows()[:, index + 1]
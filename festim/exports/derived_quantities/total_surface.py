@@ -1,5 +1,4 @@
 from festim import SurfaceQuantity
-import fenics as f
 
 
 class TotalSurface(SurfaceQuantity):
@@ -7,5 +6,9 @@ class TotalSurface(SurfaceQuantity):
         super().__init__(field, surface=surface)
         self.title = "Total {} surface {}".format(self.field, self.surface)
 
+    @property
+    def integrand(self):
+        return self.function
+
     def compute(self):
-        return f.assemble(self.function * self.ds(self.surface))
+        return self.assemble_integral("total", self.integrand, self.measure)
@@ -1,5 +1,4 @@
 from festim import VolumeQuantity
-import fenics as f
 
 
 class TotalVolume(VolumeQuantity):
@@ -7,5 +6,9 @@ class TotalVolume(VolumeQuantity):
         super().__init__(field, volume=volume)
         self.title = "Total {} volume {}".format(self.field, self.volume)
 
+    @property
+    def integrand(self):
+        return self.function
+
     def compute(self):
-        return f.assemble(self.function * self.dx(self.volume))
+        return self.assemble_integral("total", self.integrand, self.measure)
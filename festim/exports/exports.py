@@ -21,6 +21,9 @@ class Exports(list):
         self.V_DG1 = None
         self.final_time = None
         self.nb_iterations = 0
+        self.projector = festim.Projector()
+        # fields projected on V_DG1 at the current step
+        self._projected = {}
 
     @property
     def exports(self):
@@ -71,6 +74,23 @@ class Exports(list):
             return value
         raise TypeError("festim.Exports must be a list of festim.Export")
 
+    def project_on_DG1(self, label_to_function, field):
+        """Projects a field on V_DG1. The field is only projected once per
+        step and the projection is shared by all the exports.
+
+        Args:
+            label_to_function (dict): dictionary of labels mapped to solutions
+            field (str, int): the field
+
+        Returns:
+            fenics.Function: the projection of the field on V_DG1
+        """
+        if field not in self._projected:
+            self._projected[field] = self.projector.project(
+                label_to_function[field], self.V_DG1
+            )
+        return self._projected[field]
+
     def write(self, label_to_function, dx):
         """writes to file
 
@@ -78,6 +98,7 @@ class Exports(list):
             label_to_function (dict): dictionary of labels mapped to solutions
             dx (fenics.Measure): the measure for dx
         """
+        self._projected = {}
         for export in self:
             if isinstance(export, festim.DerivedQuantities):
                 # compute derived quantities
@@ -90,8 +111,8 @@ class Exports(list):
                             if not isinstance(
                                 label_to_function[quantity.field], f.Function
                             ):
-                                label_to_function[quantity.field] = f.project(
-                                    label_to_function[quantity.field], self.V_DG1
+                                label_to_function[quantity.field] = self.project_on_DG1(
+                                    label_to_function, quantity.field
                                 )
                         quantity.function = label_to_function[quantity.field]
                     export.compute(self.t)
@@ -104,8 +125,8 @@ class Exports(list):
                     if export.field == "retention":
                         # if not a Function, project it onto V_DG1
                         if not isinstance(label_to_function["retention"], f.Function):
-                            label_to_function["retention"] = f.project(
-                                label_to_function["retention"], self.V_DG1
+                            label_to_function["retention"] = self.project_on_DG1(
+                                label_to_function, "retention"
                             )
                     export.function = label_to_function[export.field]
                     if isinstance(export, festim.TrapDensityXDMF):
@@ -115,16 +136,21 @@ class Exports(list):
                     export.append = True
 
             elif isinstance(export, festim.TXTExport):
-                # if not a Function, project it onto V_DG1
-                if not isinstance(label_to_function[export.field], f.Function):
-                    label_to_function[export.field] = f.project(
-                        label_to_function[export.field], self.V_DG1
-                    )
-                export.function = label_to_function[export.field]
+                if not export.is_it_time_to_export(self.t):
+                    continue
+                # projected onto V_DG1 (shared with the other exports)
+                export.function = self.project_on_DG1(label_to_function, export.field)
                 steady = self.final_time == None
                 export.write(self.t, steady)
         self.nb_iterations += 1
 
+    def finalize(self):
+        """Writes the files of the exports that are only written at the end
+        of the simulation"""
+        for export in self:
+            if isinstance(export, (festim.TXTExport, festim.DerivedQuantities)):
+                export.finalize()
+
     def initialise_derived_quantities(self, dx, ds, materials):
         """If derived quantities in exports, creates header and adds measures
         and properties
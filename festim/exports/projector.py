@@ -0,0 +1,73 @@
+import fenics as f
+
+
+class Projector:
+    """Projects expressions on function spaces. The projection system is
+    only built once per function space: for discontinuous Lagrange spaces,
+    the projection is computed cell by cell with a factorised local solver,
+    otherwise the mass matrix is assembled once and its LU factorisation is
+    reused. The right hand side form is compiled once per expression and the
+    projected functions are reused.
+    """
+
+    def __init__(self) -> None:
+        # solvers of each function space
+        self._solvers = {}
+        # [expression, right hand side form, projected function] for each
+        # function space
+        self._projections = {}
+
+    def get_solver(self, V):
+        """Returns the solver of the projection system on V (only created
+        once per function space)
+
+        Args:
+            V (fenics.FunctionSpace): the function space
+
+        Returns:
+            fenics.LocalSolver or fenics.LUSolver: the solver
+        """
+        if V.id() not in self._solvers:
+            u, v = f.TrialFunction(V), f.TestFunction(V)
+            a = f.inner(u, v) * f.dx
+            if V.ufl_element().family() == "Discontinuous Lagrange":
+                solver = f.LocalSolver(a)
+                solver.factorize()
+            else:
+                # the factorisation is reused as long as the matrix
+                # isn't modified
+                solver = f.LUSolver(f.assemble(a))
+            self._solvers[V.id()] = solver
+        return self._solvers[V.id()]
+
+    def project(self, expression, V):
+        """Projects an expression on a function space
+
+        Args:
+            expression (ufl.core.expr.Expr): the expression
+            V (fenics.FunctionSpace): the function space
+
+        Returns:
+            fenics.Function: the projection of expression on V. The same
+                function is returned (and overwritten) for a given
+                expression and V.
+        """
+        solver = self.get_solver(V)
+        projections = self._projections.setdefault(V.id(), [])
+        for projection in projections:
+            # structural equality of the UFL expressions
+            if projection[0] == expression:
+                break
+        else:
+            v = f.TestFunction(V)
+            L = f.Form(f.inner(expression, v) * f.dx)
+            projection = [expression, L, f.Function(V)]
+            projections.append(projection)
+        _, L, function = projection
+
+        b = f.assemble(L)
+        if isinstance(solver, f.LocalSolver):
+            solver.solve_local(function.vector(), b, V.dofmap())
+        else:
+            solver.solve(function.vector(), b)
+        return function
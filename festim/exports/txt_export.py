@@ -3,6 +3,7 @@ import numpy as np
 import festim
 import warnings
 import os
+import tempfile
 
 warnings.simplefilter("always", DeprecationWarning)
 
@@ -12,15 +13,49 @@ class TXTExport(festim.Export):
     Args:
         field (str): the exported field ("solute", "1", "retention",
             "T"...)
-        filename (str): the filename (must end with .txt).
+        filename (str): the filename (must end with .txt, .npz, .h5 or
+            .hdf5). Binary files contain the datasets "x", "t" and "data"
+            (one profile per row).
         times (list, optional): if provided, the field will be
             exported at these timesteps. Otherwise exports at all
             timesteps. Defaults to None.
         header_format (str, optional): the format of column headers.
             Defautls to ".2e".
+        compression (str, optional): the compression filter of the HDF5
+            datasets (eg. "gzip"), only used if filename ends with .h5 or
+            .hdf5. Defaults to None.
+        layout (str, optional): the layout of .txt files. If "columns",
+            the file has one column per export time (x in the first
+            column) and is rewritten at each export. If "rows", the file
+            has one row per export time (time in the first column, the
+            header contains the x coordinates) and each export only
+            appends a row. Defaults to "columns".
+
+    Notes:
+        The exported profiles are appended to a temporary binary file, so
+        the profiles are not kept in memory. New profiles are appended to
+        HDF5 files and to .txt files with the "rows" layout at each export.
+        .npz files can't be appended to and are written by finalize() at
+        the end of the simulation.
+
+    Attributes:
+        data (list): the columns of the file (x and the exported profiles,
+            read from the temporary file when accessed)
+        header (str): the header of the file
+        t (list): the times of the exported profiles (nan if steady)
+        projector (festim.Projector): projects self.function on the DG1
+            function space if needed
     """
 
-    def __init__(self, field, filename, times=None, header_format=".2e") -> None:
+    def __init__(
+        self,
+        field,
+        filename,
+        times=None,
+        header_format=".2e",
+        compression=None,
+        layout="columns",
+    ) -> None:
         super().__init__(field=field)
         if times:
             self.times = sorted(times)
@@ -28,7 +63,19 @@ class TXTExport(festim.Export):
             self.times = times
         self.filename = filename
         self.header_format = header_format
+        self.compression = compression
+        if layout not in ["columns", "rows"]:
+            raise ValueError('layout must be "columns" or "rows"')
+        self.layout = layout
         self._first_time = True
+        self.header = None
+        self.t = []
+        # temporary binary file with one row per exported profile
+        self._profiles = None
+        self._x = None
+        self._nb_profiles_written = 0
+        self._V_DG1 = None
+        self.projector = festim.Projector()
 
     @property
     def filename(self):
@@ -39,8 +86,8 @@ class TXTExport(festim.Export):
         if value is not None:
             if not isinstance(value, str):
                 raise TypeError("filename must be a string")
-            if not value.endswith(".txt"):
-                raise ValueError("filename must end with .txt")
+            if not value.endswith((".txt", ".npz", ".h5", ".hdf5")):
+                raise ValueError("filename must end with .txt, .npz, .h5 or .hdf5")
         self._filename = value
 
     def is_it_time_to_export(self, current_time):
@@ -59,42 +106,141 @@ class TXTExport(festim.Export):
                 return time
         return None
 
+    def get_V_DG1(self):
+        """Returns the DG1 function space on the mesh of self.function (only
+        created once per mesh, the function space of self.function is used if
+        it is a DG1 function space) and stores the x column if needed
+
+        Returns:
+            fenics.FunctionSpace: the DG1 function space
+        """
+        V = self.function.function_space()
+        element = V.ufl_element()
+        is_DG1 = (
+            element.family() == "Discontinuous Lagrange"
+            and element.degree() == 1
+            and V.num_sub_spaces() == 0
+            and len(V.component()) == 0
+        )
+        if is_DG1 and (self._V_DG1 is None or self._V_DG1.id() != V.id()):
+            self._V_DG1 = V
+        elif self._V_DG1 is None or self._V_DG1.mesh().id() != V.mesh().id():
+            self._V_DG1 = f.FunctionSpace(V.mesh(), "DG", 1)
+        else:
+            return self._V_DG1
+        x = f.interpolate(f.Expression("x[0]", degree=1), self._V_DG1)
+        self._x_column = x.vector()[:]
+        return self._V_DG1
+
+    @property
+    def data(self):
+        if self._profiles is None:
+            return []
+        return [self._x] + list(self.read_profiles())
+
+    def read_profiles(self):
+        """Maps the temporary file of the profiles in memory (the profiles
+        are only read from disk when accessed)
+
+        Returns:
+            numpy.memmap: the profiles, shape (len(self.t), len(x))
+        """
+        self._profiles.flush()
+        return np.memmap(
+            self._profiles,
+            dtype=np.float64,
+            mode="r",
+            shape=(len(self.t), self._x.size),
+        )
+
     def write(self, current_time, steady):
-        # create a DG1 functionspace
-        V_DG1 = f.FunctionSpace(self.function.function_space().mesh(), "DG", 1)
-
-        solution = f.project(self.function, V_DG1)
-        solution_column = np.transpose(solution.vector()[:])
-        if self.is_it_time_to_export(current_time):
-            # if the directory doesn't exist
-            # create it
-            dirname = os.path.dirname(self.filename)
-            if not os.path.exists(dirname):
-                os.makedirs(dirname, exist_ok=True)
-
-            # if steady or it is the first time to export
-            # write data
-            # else append new column to the existing file
-            if steady or self._first_time:
-                if steady:
-                    header = "x,t=steady"
-                else:
-                    header = f"x,t={format(current_time, self.header_format)}s"
-                x = f.interpolate(f.Expression("x[0]", degree=1), V_DG1)
-                x_column = np.transpose([x.vector()[:]])
-                data = np.column_stack([x_column, solution_column])
-                self._first_time = False
-            else:
-                # Update the header
-                old_file = open(self.filename)
-                old_header = old_file.readline().split("\n")[0]
-                old_file.close()
-                header = old_header + f",t={format(current_time, self.header_format)}s"
-                # Append new column
-                old_columns = np.loadtxt(self.filename, delimiter=",", skiprows=1)
-                data = np.column_stack([old_columns, solution_column])
-
-            np.savetxt(self.filename, data, header=header, delimiter=",", comments="")
+        """Projects self.function on a DG1 function space (unless it is
+        already in a DG1 function space) and appends it to the profiles if
+        it's time to export, then writes the file (.npz files are written by
+        finalize())
+
+        Args:
+            current_time (float): the current time
+            steady (bool): True if the simulation is steady state
+        """
+        if not self.is_it_time_to_export(current_time):
+            return
+
+        V_DG1 = self.get_V_DG1()
+        if self.function.function_space().id() == V_DG1.id():
+            solution = self.function
+        else:
+            solution = self.projector.project(self.function, V_DG1)
+
+        # if steady or it is the first time to export
+        # reinitialise the profiles
+        # else append new column
+        time_header = "steady" if steady else f"{current_time:{self.header_format}}s"
+        if steady or self._first_time:
+            self.header = f"x,t={time_header}"
+            self._x = self._x_column
+            if self._profiles is not None:
+                self._profiles.close()
+            self._profiles = tempfile.TemporaryFile()
+            self.t = []
+            self._nb_profiles_written = 0
+            self._first_time = False
+        else:
+            self.header += f",t={time_header}"
+        self._profiles.seek(0, 2)
+        solution.vector().get_local().astype(np.float64).tofile(self._profiles)
+        self.t.append(np.nan if steady else current_time)
+
+        if not self.filename.endswith(".npz"):
+            self.write_to_file()
+
+    def finalize(self):
+        """Writes the file if profiles haven't been written yet (called at
+        the end of the simulation)"""
+        if self._profiles is not None and self._nb_profiles_written < len(self.t):
+            self.write_to_file()
+
+    def write_to_file(self):
+        """Writes the profiles to self.filename. Only the new profiles are
+        appended to HDF5 files and to .txt files with the "rows" layout."""
+        # if the directory doesn't exist
+        # create it
+        dirname = os.path.dirname(self.filename)
+        if not os.path.exists(dirname):
+            os.makedirs(dirname, exist_ok=True)
+
+        start = self._nb_profiles_written
+        profiles = self.read_profiles()
+        if festim.is_hdf5(self.filename):
+            festim.write_to_hdf5(
+                self.filename,
+                {"t": self.t[start:], "data": profiles[start:]},
+                nb_rows_written=start,
+                fixed_datasets={"x": self._x},
+                compression=self.compression,
+            )
+        elif self.filename.endswith(".npz"):
+            np.savez(self.filename, x=self._x, t=np.array(self.t), data=profiles)
+        elif self.layout == "rows":
+            mode = "w" if start == 0 else "a"
+            with open(self.filename, mode) as file:
+                if start == 0:
+                    x_header = ",".join(repr(float(x)) for x in self._x)
+                    file.write(f"t,{x_header}\n")
+                rows = np.column_stack((self.t[start:], profiles[start:]))
+                np.savetxt(file, rows, delimiter=",")
+        else:
+            with open(self.filename, "w") as file:
+                file.write(self.header + "\n")
+                # written by blocks of lines so that only a few values of
+                # each profile are in memory
+                block_size = 1024
+                for i in range(0, self._x.size, block_size):
+                    block = np.column_stack(
+                        (self._x[i : i + block_size], profiles[:, i : i + block_size].T)
+                    )
+                    np.savetxt(file, block, delimiter=",")
+        self._nb_profiles_written = len(self.t)
 
 
 class TXTExports:
@@ -241,6 +241,7 @@ class Simulation:
         spaces, the functions, the variational forms...
         """
         set_log_level(self.log_level)
+        festim.clear_caches()
 
         self.t = 0  # reinitialise t to zero
 
@@ -253,6 +254,21 @@ class Simulation:
             raise AttributeError("dt must be None in steady state simulations")
         if self.settings.transient and self.dt is None:
             raise AttributeError("dt must be provided in transient simulations")
+        # check that a coupled heat transfer problem is transient like the
+        # hydrogen transport problem
+        if isinstance(self.T, festim.HeatTransferProblem) and self.T.coupled:
+            if not (self.T.transient and self.settings.transient):
+                raise ValueError(
+                    "coupled HeatTransferProblem is only available in transient simulations"
+                )
+
+        # check that the exponential decay is only used in transient
+        for source in self.sources:
+            if isinstance(source, festim.RadioactiveDecay) and source.exponential:
+                if not self.settings.transient:
+                    raise ValueError(
+                        "exponential RadioactiveDecay is only available in transient simulations"
+                    )
 
         # initialise dt
         if self.settings.transient:
@@ -275,6 +291,18 @@ class Simulation:
         self.V_DG1 = FunctionSpace(self.mesh.mesh, "DG", 1)
         self.exports.V_DG1 = self.V_DG1
 
+        # interpolate the spatial part of separable expressions once, on the
+        # mesh of the problem using them
+        heat_mesh = self.mesh
+        if isinstance(self.T, festim.HeatTransferProblem) and self.T.mesh is not None:
+            heat_mesh = self.T.mesh
+        for obj in self.sources + self.boundary_conditions:
+            if isinstance(getattr(obj, "value", None), festim.SeparableExpression):
+                if obj.field == "T":
+                    obj.value.interpolate(heat_mesh.mesh)
+                else:
+                    obj.value.interpolate(self.mesh.mesh)
+
         # Define temperature
         if isinstance(self.T, festim.HeatTransferProblem):
             self.T.create_functions(self.materials, self.mesh, self.dt)
@@ -328,6 +356,31 @@ class Simulation:
             self.mesh.dx, self.mesh.ds, self.materials
         )
 
+        # residual of the hydrogen transport problem for consistent fluxes
+        consistent_fluxes = [
+            quantity
+            for export in self.exports
+            if isinstance(export, festim.DerivedQuantities)
+            for quantity in export
+            if isinstance(quantity, festim.SurfaceFlux) and quantity.consistent
+        ]
+        if consistent_fluxes:
+            dirichlet_surfaces = [
+                surface
+                for bc in self.h_transport_problem.boundary_conditions
+                if isinstance(bc, festim.DirichletBC) and bc.field in [0, "0"]
+                for surface in bc.surfaces
+            ]
+            V = self.h_transport_problem.V
+            if V.num_sub_spaces() > 0:
+                V = V.sub(0)
+            residual = self.h_transport_problem.create_residual()
+            for export in self.exports:
+                if isinstance(export, festim.DerivedQuantities):
+                    export.assign_residual_to_quantities(
+                        residual, V, dirichlet_surfaces
+                    )
+
         # needed to ensure that data is actually exported at TXTExport.times
         # see issue 675
         for export in self.exports:
@@ -359,6 +412,9 @@ class Simulation:
         else:
             self.run_steady()
 
+        # write the files that are only written at the end
+        self.exports.finalize()
+
         self.timer.stop()
 
         # End
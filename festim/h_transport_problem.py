@@ -1,4 +1,5 @@
 from fenics import *
+import numpy as np
 import festim
 
 
@@ -15,7 +16,8 @@ class HTransportProblem:
             initial conditions of the h transport problem
 
     Attributes:
-        expressions (list): contains time-dependent fenics.Expressions
+        expressions (festim.ExpressionsRegistry): contains the expressions
+            of the problem, the time dependent ones are updated
         J (ufl.Form): the jacobian of the variational problem
         V (fenics.FunctionSpace): the vector-function space for concentrations
         u (fenics.Function): the vector holding the concentrations (c_m, ct1,
@@ -23,6 +25,22 @@ class HTransportProblem:
         v (fenics.TestFunction): the test function
         u_n (fenics.Function): the "previous" function
         bcs (list): list of fenics.DirichletBC for H transport
+        restriction_bcs (list): list of festim.ZeroDofsBC setting the traps
+            concentrations to zero outside of their materials (only if
+            settings.restrict_traps is True)
+        T_component (int): index of the temperature in the mixed function
+            space when the heat transfer problem is coupled, else None
+        shared_traps_dofs (dict): for each trap sharing its component with
+            other traps, the collapsed function space of the component and
+            the DOFs located outside of the trap materials
+        jacobian_layout (fenics.TensorLayout): the layout of the jacobian
+            without the trap-trap blocks, only used if
+            self.settings.sparse_jacobian is True
+        exponential_decay (list): the DOFs of self.u decaying exponentially
+            and their decay constants
+        residual (fenics.GenericVector): the residual assembled after each
+            solve, before the previous solutions are updated (None unless
+            created with create_residual)
     """
 
     def __init__(self, mobile, traps, T, settings, initial_conditions) -> None:
@@ -41,7 +59,27 @@ class HTransportProblem:
         self.bcs = None
         self.V = None
         self.V_CG1 = None
-        self.expressions = []
+        self.expressions = festim.ExpressionsRegistry()
+        self.T_component = None
+        self.restriction_bcs = []
+        self.shared_traps_dofs = {}
+        self.jacobian_layout = None
+        self.exponential_decay = []
+        self.residual = None
+        self._residual_form = None
+        # post-processing functions, only created once so that the forms of
+        # the derived quantities can be reused
+        self._split_solutions = None
+        self._shared_traps_solutions = {}
+        # True if the traps at equilibrium have been projected since the
+        # last solve
+        self._equilibrium_traps_projected = False
+
+    @property
+    def coupled_heat_transfer(self):
+        """True if the temperature is solved in the same mixed function space
+        as the concentrations"""
+        return isinstance(self.T, festim.HeatTransferProblem) and self.T.coupled
 
     def initialise(self, mesh, materials, dt=None):
         """Assigns BCs, create suitable function space, initialise
@@ -60,10 +98,26 @@ class HTransportProblem:
             self.mobile.T = self.T
         self.attribute_flux_boundary_conditions()
         # Define functions
+        self.traps.make_traps_materials(materials)
         self.define_function_space(mesh)
         self.initialise_concentrations()
-        self.traps.make_traps_materials(materials)
         self.traps.initialise_extrinsic_traps(self.V_CG1)
+        for trap in self.traps:
+            if trap.equilibrium:
+                trap.initialise_equilibrium(self.mobile, self.T, self.V_DG1, mesh.dx)
+        # trap DOFs outside of the trap materials are eliminated with
+        # festim.ZeroDofsBC (continuous elements only)
+        nb_trap_components = len(self.traps.get_components())
+        if (
+            self.settings.restrict_traps
+            and self.settings.traps_element_type == "CG"
+            and nb_trap_components > 0
+        ):
+            self.restriction_bcs = self.traps.create_restriction_bcs(
+                self.V, mesh.volume_markers
+            )
+
+        self.initialise_exponential_decay(materials, mesh.volume_markers)
 
         # Define variational problem H transport
         # if chemical pot create form to convert theta to concentration
@@ -87,9 +141,18 @@ class HTransportProblem:
         order_trap = 1
         element_solute, order_solute = "CG", 1
 
-        # function space for H concentrations
+        # traps living in disjoint materials can share the same component
         nb_traps = len(self.traps)
-        if nb_traps == 0:
+        if nb_traps > 0:
+            nb_traps = self.traps.make_components(
+                mesh.volume_markers,
+                self.settings.traps_element_type,
+                excluded=self.find_constrained_traps(),
+                conglomerate=self.settings.conglomerate_traps,
+            )
+
+        # function space for H concentrations
+        if nb_traps == 0 and not self.coupled_heat_transfer:
             V = FunctionSpace(mesh.mesh, element_solute, order_solute)
         else:
             solute = FiniteElement(element_solute, mesh.mesh.ufl_cell(), order_solute)
@@ -97,11 +160,47 @@ class HTransportProblem:
                 self.settings.traps_element_type, mesh.mesh.ufl_cell(), order_trap
             )
             element = [solute] + [traps] * nb_traps
+            # densities of the coupled extrinsic traps
+            for trap in self.traps.coupled_extrinsic_traps():
+                trap.density_component = len(element)
+                element.append(FiniteElement("CG", mesh.mesh.ufl_cell(), 1))
+            if self.coupled_heat_transfer:
+                # temperature is the last component of the mixed space
+                self.T_component = len(element)
+                element.append(FiniteElement("CG", mesh.mesh.ufl_cell(), 1))
             V = FunctionSpace(mesh.mesh, MixedElement(element))
         self.V = V
+        self.jacobian_layout = None
         self.V_CG1 = FunctionSpace(mesh.mesh, "CG", 1)
         self.V_DG1 = FunctionSpace(mesh.mesh, "DG", 1)
 
+        # DOFs used to separate the shared components in post-processing
+        self.shared_traps_dofs = {}
+        for trap in self.traps:
+            if trap.shared_component:
+                V_trap = V.sub(trap.component).collapse()
+                outside_dofs = trap.get_outside_dofs(V_trap, mesh.volume_markers)
+                self.shared_traps_dofs[trap] = (V_trap, outside_dofs)
+
+    def find_constrained_traps(self):
+        """Finds the traps with initial conditions or Dirichlet boundary
+        conditions. These traps can't share their component with other traps
+
+        Returns:
+            list: the constrained festim.Trap objects
+        """
+        fields = [ini.field for ini in self.initial_conditions]
+        fields += [
+            bc.field
+            for bc in self.boundary_conditions
+            if isinstance(bc, festim.DirichletBC)
+        ]
+        constrained_traps = []
+        for i, trap in enumerate(self.traps, 1):
+            if any(field in fields for field in [i, str(i), trap.id, str(trap.id)]):
+                constrained_traps.append(trap)
+        return constrained_traps
+
     def initialise_concentrations(self):
         """Creates the main fenics.Function (holding all the concentrations),
         eventually split it and assign it to Trap and Mobile.
@@ -112,48 +211,59 @@ class HTransportProblem:
         """
         # TODO rename u and u_n to c and c_n
         self.u = Function(self.V, name="c")  # Function for concentrations
+        self._split_solutions = None
+        self._shared_traps_solutions = {}
         self.v = TestFunction(self.V)  # TestFunction for concentrations
         self.u_n = Function(self.V, name="c_n")
 
+        # components of the traps if they were not set by
+        # self.define_function_space (traps at equilibrium don't have any)
+        kinetic_traps = [trap for trap in self.traps if not trap.equilibrium]
+        for i, trap in enumerate(kinetic_traps, 1):
+            if trap.component is None:
+                trap.component = i
+
         if self.V.num_sub_spaces() == 0:
             self.mobile.solution = self.u
             self.mobile.previous_solution = self.u_n
             self.mobile.test_function = self.v
         else:
-            for i, concentration in enumerate([self.mobile, *self.traps]):
-                concentration.solution = self.u.sub(i)
-                # concentration.solution = list(split(self.u))[i]
-                concentration.previous_solution = self.u_n.sub(i)
-                concentration.test_function = list(split(self.v))[i]
+            self.mobile.solution = self.u.sub(0)
+            self.mobile.previous_solution = self.u_n.sub(0)
+            self.mobile.test_function = list(split(self.v))[0]
+            for trap in kinetic_traps:
+                trap.solution = self.u.sub(trap.component)
+                trap.previous_solution = self.u_n.sub(trap.component)
+                trap.test_function = list(split(self.v))[trap.component]
 
         print("Defining initial values")
-        field_to_component = {
-            "solute": 0,
-            "0": 0,
-            0: 0,
+        field_to_concentration = {
+            "solute": self.mobile,
+            "0": self.mobile,
+            0: self.mobile,
         }
-        for i, trap in enumerate(self.traps, 1):
-            field_to_component[trap.id] = i
-            field_to_component[str(trap.id)] = i
+        for trap in self.traps:
+            field_to_concentration[trap.id] = trap
+            field_to_concentration[str(trap.id)] = trap
         # TODO refactore this, attach the initial conditions to the objects directly
         for ini in self.initial_conditions:
             value = ini.value
-            component = field_to_component[ini.field]
+            concentration = field_to_concentration[ini.field]
+            if concentration is not self.mobile and concentration.equilibrium:
+                raise ValueError(
+                    "initial conditions can't be set on traps at equilibrium"
+                )
 
             if self.V.num_sub_spaces() == 0:
                 functionspace = self.V
+            elif concentration is self.mobile:
+                functionspace = self.V.sub(0).collapse()
             else:
-                functionspace = self.V.sub(component).collapse()
+                functionspace = self.V.sub(concentration.component).collapse()
 
-            if component == 0:
-                self.mobile.initialise(
-                    functionspace, value, label=ini.label, time_step=ini.time_step
-                )
-            else:
-                trap = self.traps.get_trap(component)
-                trap.initialise(
-                    functionspace, value, label=ini.label, time_step=ini.time_step
-                )
+            concentration.initialise(
+                functionspace, value, label=ini.label, time_step=ini.time_step
+            )
 
         # initial guess needs to be non zero if chemical pot
         if self.settings.chemical_pot:
@@ -165,12 +275,83 @@ class HTransportProblem:
                 self.mobile.previous_solution + Constant(DOLFIN_EPS), functionspace
             )
             self.mobile.solution.assign(initial_guess)
+
+        # temperature initial value and initial guess
+        if self.coupled_heat_transfer:
+            assign(self.u_n.sub(self.T_component), self.T.T_n)
+            assign(self.u.sub(self.T_component), self.T.T_n)
+
+        for trap in self.traps.coupled_extrinsic_traps():
+            component = trap.density_component
+            trap.density = [list(split(self.u))[component]]
+            trap.density_previous_solution = list(split(self.u_n))[component]
+            trap.density_test_function = list(split(self.v))[component]
         # this is needed to correctly create the formulation
         # TODO: write a test for this?
         if self.V.num_sub_spaces() != 0:
-            for i, concentration in enumerate([self.mobile, *self.traps]):
-                concentration.previous_solution = list(split(self.u_n))[i]
-                concentration.solution = list(split(self.u))[i]
+            self.mobile.previous_solution = list(split(self.u_n))[0]
+            self.mobile.solution = list(split(self.u))[0]
+            for trap in kinetic_traps:
+                trap.previous_solution = list(split(self.u_n))[trap.component]
+                trap.solution = list(split(self.u))[trap.component]
+
+    def initialise_exponential_decay(self, materials, volume_markers):
+        """Finds the DOFs of self.u decaying exponentially (festim.RadioactiveDecay
+        with exponential=True) and stores them in self.exponential_decay
+
+        Args:
+            materials (festim.Materials): the materials
+            volume_markers (fenics.MeshFunction): the volume markers
+        """
+        self.exponential_decay = []
+        concentrations = [(self.mobile, 0)] + [
+            (trap, trap.component) for trap in self.traps if not trap.equilibrium
+        ]
+        decaying_components = []
+        for concentration, component in concentrations:
+            for source in concentration.sources:
+                if not isinstance(source, festim.RadioactiveDecay):
+                    continue
+                # traps sharing a component decay only once
+                if not source.exponential or (component, source) in decaying_components:
+                    continue
+                decaying_components.append((component, source))
+
+                volumes = source.volume
+                if not isinstance(volumes, list):
+                    volumes = [volumes]
+                if isinstance(concentration, festim.Theta):
+                    for volume in volumes:
+                        if (
+                            materials.find_material_from_id(volume).solubility_law
+                            == "henry"
+                        ):
+                            raise NotImplementedError(
+                                "exponential RadioactiveDecay is not implemented with Henry's law"
+                            )
+
+                if self.V.num_sub_spaces() == 0:
+                    dofmap = self.V.dofmap()
+                else:
+                    dofmap = self.V.sub(component).dofmap()
+                cells = np.flatnonzero(np.isin(volume_markers.array(), volumes))
+                dofs = [dofmap.cell_dofs(cell) for cell in cells]
+                dofs = np.unique(np.array(dofs, dtype=int).flatten())
+                self.exponential_decay.append((dofs, source.decay_constant))
+
+    def apply_exponential_decay(self, dt):
+        """Multiplies the decaying DOFs of self.u by exp(-lambda * dt)
+
+        Args:
+            dt (float): the time step (s)
+        """
+        values = self.u.vector().get_local()
+        for dofs, decay_constant in self.exponential_decay:
+            # only the DOFs owned by the process
+            dofs = dofs[dofs < values.size]
+            values[dofs] *= np.exp(-decay_constant * dt)
+        self.u.vector().set_local(values)
+        self.u.vector().apply("insert")
 
     def define_variational_problem(self, materials, mesh, dt=None):
         """Creates the variational problem for hydrogen transport (form,
@@ -183,21 +364,57 @@ class HTransportProblem:
                 self.settings.transient is True. Defaults to None.
         """
         print("Defining variational problem")
-        expressions = []
+        expressions = festim.ExpressionsRegistry()
         F = 0
 
+        if self.coupled_heat_transfer:
+            # temporarily replace the temperature functions by the components
+            # of the mixed function space so that all the forms use them
+            T_functions = self.T.T, self.T.T_n, self.T.v_T
+            self.T.T = list(split(self.u))[self.T_component]
+            self.T.T_n = list(split(self.u_n))[self.T_component]
+            self.T.v_T = list(split(self.v))[self.T_component]
+            self.T.T_heat, self.T.T_heat_n = self.T.T, self.T.T_n
+
         # diffusion + transient terms
 
         self.mobile.create_form(
-            materials, mesh, self.T, dt, traps=self.traps, soret=self.settings.soret
+            materials,
+            mesh,
+            self.T,
+            dt,
+            traps=self.traps,
+            soret=self.settings.soret,
+            mass_lumping=self.settings.mass_lumping,
         )
         F += self.mobile.F
         expressions += self.mobile.sub_expressions
 
         # Add traps
-        self.traps.create_forms(self.mobile, materials, self.T, mesh.dx, dt)
+        dx_traps = mesh.dx
+        if self.settings.mass_lumping in ["traps", "all"]:
+            # vertex quadrature: the traps equations are nodal
+            dx_traps = mesh.dx(scheme="vertex", degree=1)
+        self.traps.create_forms(self.mobile, materials, self.T, dx_traps, dt)
         F += self.traps.F
         expressions += self.traps.sub_expressions
+
+        # densities of the coupled extrinsic traps
+        for trap in self.traps.coupled_extrinsic_traps():
+            if dt is not None:
+                trap.create_form_density(mesh.dx, dt, self.T)
+                F += trap.form_density
+            else:
+                # no density evolution in steady state
+                F += trap.density[0] * trap.density_test_function * mesh.dx
+
+        # heat transfer (time dependent expressions are updated by self.T)
+        if self.coupled_heat_transfer:
+            self.T.define_variational_problem(materials, mesh, dt)
+            F += self.T.F
+            self.T.T, self.T.T_n, self.T.v_T = T_functions
+            self.T.T_heat, self.T.T_heat_n = self.T.T, self.T.T_n
+
         self.F = F
         self.expressions = expressions
 
@@ -213,9 +430,18 @@ class HTransportProblem:
         """Creates fenics.DirichletBC objects for the hydrogen transport
         problem and add them to self.bcs
         """
-        self.bcs = []
+        self.bcs = list(self.restriction_bcs)
         for bc in self.boundary_conditions:
             if bc.field != "T" and isinstance(bc, festim.DirichletBC):
+                if bc.field in [0, "0", "solute"]:
+                    component = 0
+                else:
+                    trap = self.traps[int(bc.field) - 1]
+                    if trap.equilibrium:
+                        raise ValueError(
+                            "DirichletBC can't be set on traps at equilibrium"
+                        )
+                    component = trap.component
                 bc.create_dirichletbc(
                     self.V,
                     self.T.T,
@@ -223,11 +449,30 @@ class HTransportProblem:
                     chemical_pot=self.settings.chemical_pot,
                     materials=materials,
                     volume_markers=mesh.volume_markers,
+                    component=component,
                 )
                 self.bcs += bc.dirichlet_bc
                 self.expressions += bc.sub_expressions
                 self.expressions.append(bc.expression)
 
+        if self.coupled_heat_transfer:
+            self.T.create_dirichlet_bcs(
+                mesh.surface_markers, V=self.V.sub(self.T_component)
+            )
+            self.bcs += self.T.dirichlet_bcs
+
+    def create_residual(self):
+        """Creates self.residual (eg. for consistent fluxes), it is then
+        assembled after each solve
+
+        Returns:
+            fenics.GenericVector: the residual
+        """
+        if self.residual is None:
+            self.residual = Vector()
+            self._residual_form = Form(self.F)
+        return self.residual
+
     def compute_jacobian(self):
         du = TrialFunction(self.u.function_space())
         self.J = derivative(self.F, self.u, du)
@@ -240,22 +485,26 @@ class HTransportProblem:
             dt (festim.Stepsize): the stepsize
         """
 
-        festim.update_expressions(self.expressions, t)
+        self.expressions.update(t)
 
         converged = False
         u_ = Function(self.u.function_space())
         u_.assign(self.u)
         while converged is False:
             self.u.assign(u_)
+            step = float(dt.value)
             nb_it, converged = self.solve_once()
             if dt.adaptive_stepsize is not None or dt.milestones is not None:
                 dt.adapt(t, nb_it, converged)
 
+        if self.exponential_decay:
+            self.apply_exponential_decay(step)
+
         # Update previous solutions
         self.update_previous_solutions()
 
         # Solve extrinsic traps formulation
-        self.traps.solve_extrinsic_traps()
+        self.traps.solve_extrinsic_traps(dt, self.T)
 
     def solve_once(self):
         """Solves non linear problem
@@ -270,37 +519,114 @@ class HTransportProblem:
             J = derivative(self.F, self.u, du)
         else:
             J = self.J
-        problem = NonlinearVariationalProblem(self.F, self.u, self.bcs, J)
-        solver = NonlinearVariationalSolver(problem)
-        solver.parameters["newton_solver"]["error_on_nonconvergence"] = False
-        solver.parameters["newton_solver"][
-            "absolute_tolerance"
-        ] = self.settings.absolute_tolerance
-        solver.parameters["newton_solver"][
-            "relative_tolerance"
-        ] = self.settings.relative_tolerance
-        solver.parameters["newton_solver"][
-            "maximum_iterations"
-        ] = self.settings.maximum_iterations
-        solver.parameters["newton_solver"][
-            "linear_solver"
-        ] = self.settings.linear_solver
-        nb_it, converged = solver.solve()
+        block_sparse = (
+            self.settings.sparse_jacobian and len(self.traps.get_components()) > 1
+        )
+        if block_sparse:
+            # the trap-trap blocks are removed from the jacobian
+            if self.jacobian_layout is None:
+                self.jacobian_layout = festim.BlockSparseProblem.create_layout(
+                    self.V, self.get_jacobian_blocks()
+                )
+            problem = festim.BlockSparseProblem(
+                self.F, J, self.bcs, self.jacobian_layout
+            )
+            solver = NewtonSolver()
+            newton_parameters = solver.parameters
+        elif self.restriction_bcs:
+            # festim.ZeroDofsBC can't be used with NonlinearVariationalProblem
+            problem = festim.Problem(self.F, J, self.bcs)
+            solver = NewtonSolver()
+            newton_parameters = solver.parameters
+        else:
+            problem = NonlinearVariationalProblem(self.F, self.u, self.bcs, J)
+            solver = NonlinearVariationalSolver(problem)
+            newton_parameters = solver.parameters["newton_solver"]
+        newton_parameters["error_on_nonconvergence"] = False
+        newton_parameters["absolute_tolerance"] = self.settings.absolute_tolerance
+        newton_parameters["relative_tolerance"] = self.settings.relative_tolerance
+        newton_parameters["maximum_iterations"] = self.settings.maximum_iterations
+        newton_parameters["linear_solver"] = self.settings.linear_solver
+        if block_sparse or self.restriction_bcs:
+            nb_it, converged = solver.solve(problem, self.u.vector())
+        else:
+            nb_it, converged = solver.solve()
+
+        if self.coupled_heat_transfer:
+            # the temperature Function is used in post-processing and in
+            # the properties and BCs evaluated pointwise
+            assign(self.T.T, self.u.sub(self.T_component))
+        self._equilibrium_traps_projected = False
+
+        if self.residual is not None:
+            # assembled before the stepsize and the previous solutions are
+            # updated
+            assemble(self._residual_form, tensor=self.residual)
 
         return nb_it, converged
 
+    def get_jacobian_blocks(self):
+        """Finds the components of the mixed function space coupled
+        together. Traps are only coupled with the mobile concentration,
+        themselves and the other fields (temperature, extrinsic traps
+        densities) but not with the other traps.
+
+        Returns:
+            list: lists of coupled components, one per trap component
+        """
+        nb_components = self.V.num_sub_spaces()
+        trap_components = range(1, len(self.traps.get_components()) + 1)
+        other_components = [i for i in range(nb_components) if i not in trap_components]
+        return [other_components + [i] for i in trap_components]
+
+    def update_equilibrium_traps(self):
+        """Projects the concentrations of the traps at equilibrium (only
+        once per solve)"""
+        if self._equilibrium_traps_projected:
+            return
+        for trap in self.traps:
+            if trap.equilibrium:
+                trap.project_equilibrium_concentration()
+        self._equilibrium_traps_projected = True
+
     def update_previous_solutions(self):
         self.u_n.assign(self.u)
         self.traps.update_extrinsic_traps_density()
+        self.update_equilibrium_traps()
+        for trap in self.traps:
+            if trap.equilibrium:
+                trap.previous_solution.assign(trap.equilibrium_solution)
+        if self.coupled_heat_transfer:
+            self.T.T_n.assign(self.T.T)
 
     def update_post_processing_solutions(self, exports):
         if self.u.function_space().num_sub_spaces() == 0:
             res = [self.u]
         else:
-            res = list(self.u.split())
-
-        for i, trap in enumerate(self.traps, 1):
-            trap.post_processing_solution = res[i]
+            # the sub-functions share the vector of self.u
+            if self._split_solutions is None:
+                self._split_solutions = list(self.u.split())
+            res = self._split_solutions
+
+        self.update_equilibrium_traps()
+        for trap in self.traps:
+            if trap.equilibrium:
+                trap.post_processing_solution = trap.equilibrium_solution
+                continue
+            trap.post_processing_solution = res[trap.component]
+            if trap.shared_component:
+                # set the shared component to zero outside of the trap
+                # materials
+                V_trap, outside_dofs = self.shared_traps_dofs[trap]
+                if trap not in self._shared_traps_solutions:
+                    self._shared_traps_solutions[trap] = Function(V_trap)
+                solution = self._shared_traps_solutions[trap]
+                assign(solution, res[trap.component])
+                values = solution.vector().get_local()
+                values[outside_dofs] = 0
+                solution.vector().set_local(values)
+                solution.vector().apply("insert")
+                trap.post_processing_solution = solution
 
         if self.settings.chemical_pot:
             self.mobile.post_processing_solution_to_concentration()
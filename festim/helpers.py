@@ -1,7 +1,21 @@
 import festim
+import re
+import functools
 import xml.etree.ElementTree as ET
-from fenics import Expression, UserExpression, Constant
+from fenics import (
+    Expression,
+    UserExpression,
+    Constant,
+    FunctionSpace,
+    interpolate,
+    Facet,
+    Cell,
+    parameters,
+)
+from ufl.algorithms import compute_form_data
+from ufl.classes import Jacobian
 import sympy as sp
+import numpy as np
 
 
 def update_expressions(expressions, t):
@@ -17,14 +31,152 @@ def update_expressions(expressions, t):
     return expressions
 
 
-def as_expression(expr):
+@functools.lru_cache(maxsize=None)
+def to_ccode(expr):
+    """Converts a sympy expression (or a number) to C++ code. The code of
+    each expression is only generated once.
+
+    Args:
+        expr (sympy.Basic, float, int): the expression
+
+    Returns:
+        str: the C++ code
+    """
+    return sp.printing.ccode(expr)
+
+
+_expressions_cache = {}
+
+
+def cached_expression(expr, degree=2):
+    """Creates a fenics.Expression from a sympy expression (or a number).
+    The C++ code is generated once per expression (see to_ccode) and
+    Expressions not depending on time are shared between all the objects
+    with the same code and degree (eg. the activation energies of several
+    boundary conditions) until the caches are cleared (see clear_caches).
+    The shared Expressions must therefore not be modified. Time dependent
+    Expressions have their own t parameter.
+
+    Args:
+        expr (sympy.Basic, float, int): the expression
+        degree (int, optional): the degree of the Expression. Defaults to 2.
+
+    Returns:
+        fenics.Expression: the expression
+    """
+    ccode = to_ccode(expr)
+    if "t" in re.findall(r"\w+", ccode):
+        return Expression(ccode, degree=degree, t=0)
+    key = (ccode, degree)
+    if key not in _expressions_cache:
+        _expressions_cache[key] = Expression(ccode, degree=degree, t=0)
+    return _expressions_cache[key]
+
+
+def clear_caches():
+    """Empties the caches of the C++ code and of the Expressions (see
+    cached_expression) and of the DOFs of the subdomains (see
+    subdomain_dofs). Called when a festim.Simulation is initialised so that
+    nothing is shared between simulations.
+    """
+    to_ccode.cache_clear()
+    _expressions_cache.clear()
+    _subdomain_dofs_cache.clear()
+
+
+def is_time_dependent(expression):
+    """Checks if a fenics object has to be updated when the time changes.
+    fenics.UserExpression objects are always considered time dependent since
+    they can use a t attribute set after their creation.
+
+    Args:
+        expression (fenics.Expression, fenics.UserExpression,
+            fenics.Constant...): the object
+
+    Returns:
+        bool: True if the object may depend on its t attribute
+    """
+    if isinstance(
+        expression, (TimeDependentConstant, SeparableExpression, UserExpression)
+    ):
+        return True
+    if not hasattr(expression, "t"):
+        return False
+    if isinstance(expression, Expression):
+        # the time parameter is not necessarily used in the C++ code
+        return "t" in re.findall(r"\w+", expression._cppcode)
+    return True
+
+
+class ExpressionsRegistry(list):
+    """List of the expressions (fenics.Expression, festim.TimeDependentConstant...)
+    of a problem. Each object is only added once and only the time dependent
+    ones (see festim.is_time_dependent) are updated by
+    ExpressionsRegistry.update.
+
+    Args:
+        expressions (list, optional): the initial expressions. Defaults to ().
+
+    Attributes:
+        time_dependent (list): the time dependent expressions
+    """
+
+    def __init__(self, expressions=()) -> None:
+        super().__init__()
+        self.time_dependent = []
+        self.extend(expressions)
+
+    def append(self, expression):
+        if any(expression is other for other in self):
+            return
+        super().append(expression)
+        if is_time_dependent(expression):
+            self.time_dependent.append(expression)
+
+    def extend(self, expressions):
+        for expression in expressions:
+            self.append(expression)
+
+    def __iadd__(self, expressions):
+        self.extend(expressions)
+        return self
+
+    def update(self, t):
+        """Sets the time of the time dependent expressions
+
+        Args:
+            t (float): the time
+        """
+        for expression in self.time_dependent:
+            expression.t = t
+
+
+def is_time_dependent_only(expr):
+    """Checks if a sympy expression depends on time but not on space
+
+    Args:
+        expr (sympy.Basic): the expression
+
+    Returns:
+        bool: True if expr depends on festim.t and not on festim.x, festim.y
+            or festim.z
+    """
+    if not isinstance(expr, sp.Basic):
+        return False
+    coordinates = {festim.x, festim.y, festim.z}
+    return festim.t in expr.free_symbols and not expr.free_symbols & coordinates
+
+
+def as_expression(expr, degree=2):
     # if expr is already a fenics Expression, use it as is
-    if isinstance(expr, (Expression, UserExpression)):
+    if isinstance(expr, (Expression, UserExpression, TimeDependentConstant)):
         return expr
+    # expressions of time only are evaluated once per time step
+    elif is_time_dependent_only(expr):
+        return TimeDependentConstant(expr)
     # else assume it's a sympy expression
     else:
-        expr_ccode = sp.printing.ccode(expr)
-        return Expression(expr_ccode, degree=2, t=0)
+        return cached_expression(expr, degree=degree)
 
 
 def as_constant(constant):
@@ -34,14 +186,233 @@ def as_constant(constant):
         return Constant(constant)
 
 
-def as_constant_or_expression(val):
+def as_constant_or_expression(val, degree=2):
     if isinstance(val, (Constant, Expression, UserExpression)):
         return val
     elif isinstance(val, (int, float)):
         return Constant(val)
+    elif is_time_dependent_only(val):
+        return TimeDependentConstant(val)
+    elif isinstance(val, sp.Basic) and not val.free_symbols:
+        return Constant(float(val))
     else:
-        expr_ccode = sp.printing.ccode(val)
-        return Expression(expr_ccode, degree=2, t=0)
+        return cached_expression(val, degree=degree)
+
+
+class TimeDependentConstant(Constant):
+    """fenics.Constant whose value is a function of time only.
+    The value is updated when the time is set (evaluated once per time step
+    instead of at each quadrature point like a fenics.Expression).
+    If the value is not defined at the initial time (eg. 1/t or log(t) at
+    t=0), it is NaN until the time is set.
+
+    Args:
+        value (sympy.Expr): the value, function of festim.t
+        t (float, optional): the initial time. Defaults to 0.
+
+    Attributes:
+        function (callable): the value as a function of time
+        t (float): the time, None if the value has not been evaluated yet
+    """
+
+    def __init__(self, value, t=0) -> None:
+        # Heaviside is evaluated like in the C++ code of the Expressions
+        value = value.replace(
+            lambda expr: isinstance(expr, sp.Heaviside),
+            lambda expr: expr.rewrite(sp.Piecewise),
+        )
+        self.function = sp.lambdify(festim.t, value, "math")
+        super().__init__(float("nan"))
+        self._t = None
+        try:
+            self.t = t
+        except (ArithmeticError, ValueError):
+            pass
+
+    @property
+    def t(self):
+        return self._t
+
+    @t.setter
+    def t(self, value):
+        self.assign(float(self.function(value)))
+        self._t = value
+
+
+def separate_space_and_time(expr):
+    """Factorises a sympy expression as f(x) * g(t)
+
+    Args:
+        expr (sympy.Expr): the expression
+
+    Returns:
+        tuple: the spatial part f(x) and the temporal part g(t) (sympy.Expr).
+            None if expr cannot be factorised or doesn't depend on both space
+            and time
+    """
+    spatial, temporal = sp.factor_terms(expr).as_independent(festim.t, as_Add=False)
+    coordinates = {festim.x, festim.y, festim.z}
+    if temporal == 1 or temporal.free_symbols & coordinates:
+        return None
+    if not spatial.free_symbols & coordinates:
+        return None
+    return spatial, temporal
+
+
+class SeparableExpression:
+    """Expression of the form f(x) * g(t).
+    The spatial part can be interpolated once on the mesh (see
+    SeparableExpression.interpolate) and only the time factor (a
+    fenics.Constant) is updated when the time is set.
+    Can be used in forms like a fenics.Expression.
+
+    Args:
+        spatial (sympy.Expr, float, int): the spatial part f(x)
+        temporal (sympy.Expr): the temporal part g(t), function of festim.t
+
+    Attributes:
+        spatial (fenics.Expression or fenics.Function): the spatial part
+        time_factor (festim.TimeDependentConstant): the temporal part
+        t (float): the time
+    """
+
+    def __init__(self, spatial, temporal) -> None:
+        self.spatial = cached_expression(spatial)
+        self.time_factor = TimeDependentConstant(temporal)
+
+    @property
+    def t(self):
+        return self.time_factor.t
+
+    @t.setter
+    def t(self, value):
+        self.time_factor.t = value
+
+    def interpolate(self, mesh):
+        """Interpolates the spatial part on a CG2 function space (consistent
+        with the degree of festim expressions)
+
+        Args:
+            mesh (fenics.Mesh): the mesh
+        """
+        if isinstance(self.spatial, Expression):
+            V = FunctionSpace(mesh, "CG", 2)
+            self.spatial = interpolate(self.spatial, V)
+
+    def as_ufl(self):
+        """Returns the UFL expression f(x) * g(t)"""
+        return self.spatial * self.time_factor
+
+    def __neg__(self):
+        return -self.as_ufl()
+
+    def __mul__(self, other):
+        return self.as_ufl() * other
+
+    def __rmul__(self, other):
+        return other * self.as_ufl()
+
+
+_subdomain_dofs_cache = {}
+
+
+def subdomain_dofs(V, markers, subdomain):
+    """Finds the DOFs of V owned by the process located on the mesh entities
+    (cells or facets) marked with subdomain. The DOFs are computed once per
+    function space, markers and subdomain and shared between all the
+    quantities using them (until the caches are cleared, see
+    clear_caches). If V has no DOFs on the facets (eg. DG elements),
+    the DOFs of the cells adjacent to the marked facets located on these
+    facets are used.
+
+    Args:
+        V (fenics.FunctionSpace): the function space
+        markers (fenics.MeshFunction): the volume or surface markers
+        subdomain (int): the subdomain id
+
+    Returns:
+        numpy.ndarray: the local indices of the DOFs
+    """
+    key = (V.id(), markers.id(), subdomain)
+    if key not in _subdomain_dofs_cache:
+        mesh = V.mesh()
+        dim = markers.dim()
+        mesh.init(dim, mesh.topology().dim())
+        entities = np.flatnonzero(markers.array() == subdomain).astype(np.uintp)
+        dofmap = V.dofmap()
+        if dofmap.num_entity_closure_dofs(dim) == 0:
+            dofs = np.unique(discontinuous_facet_dofs(V, entities))
+        else:
+            dofs = np.unique(
+                np.asarray(dofmap.entity_closure_dofs(mesh, dim, entities), dtype=int)
+            )
+        # ghost DOFs are numbered after the owned DOFs
+        start, end = dofmap.ownership_range()
+        _subdomain_dofs_cache[key] = dofs[dofs < end - start]
+    return _subdomain_dofs_cache[key]
+
+
+def discontinuous_facet_dofs(V, facets):
+    """Finds the DOFs of the cells adjacent to facets whose coordinates lie
+    on these facets (eg. the DOFs of a DG function space on a surface)
+
+    Args:
+        V (fenics.FunctionSpace): the function space (not a subspace)
+        facets (numpy.ndarray): the indices of the facets
+
+    Returns:
+        numpy.ndarray: the local indices of the DOFs (with duplicates)
+    """
+    mesh = V.mesh()
+    tdim = mesh.topology().dim()
+    gdim = mesh.geometry().dim()
+    mesh.init(tdim - 1, tdim)
+    coordinates = V.tabulate_dof_coordinates().reshape(-1, gdim)
+    dofmap = V.dofmap()
+    dofs = [np.zeros(0, dtype=int)]
+    for index in facets:
+        facet = Facet(mesh, index)
+        midpoint = facet.midpoint().array()[:gdim]
+        normal = facet.normal().array()[:gdim]
+        for cell in facet.entities(tdim):
+            cell_dofs = np.asarray(dofmap.cell_dofs(cell), dtype=int)
+            # the DOFs of a cell on the hyperplane of one of its facets are
+            # on this facet
+            distance = np.abs((coordinates[cell_dofs] - midpoint) @ normal)
+            on_facet = distance <= 1e-10 * Cell(mesh, cell).h()
+            dofs.append(cell_dofs[on_facet])
+    return np.concatenate(dofs)
+
+
+def estimate_quadrature_degree(integrand, measure):
+    """Returns the quadrature degree the form compiler uses for the integral
+    of integrand over measure when it is assembled on its own (set in the
+    metadata of the measure, in the form compiler parameters or estimated
+    from the polynomial degree of the integrand)
+
+    Args:
+        integrand (ufl.core.expr.Expr): the integrand
+        measure (ufl.Measure): the measure
+
+    Returns:
+        int: the quadrature degree
+    """
+    degree = measure.metadata().get("quadrature_degree")
+    if degree is None:
+        degree = parameters["form_compiler"]["quadrature_degree"]
+    if degree is not None and degree >= 0:
+        return degree
+    form_data = compute_form_data(
+        integrand * measure,
+        do_apply_function_pullbacks=True,
+        do_apply_integral_scaling=True,
+        do_apply_geometry_lowering=True,
+        preserve_geometry_types=(Jacobian,),
+        do_apply_restrictions=True,
+        do_append_everywhere_integrals=False,
+    )
+    integral = form_data.integral_data[0].integrals[0]
+    return integral.metadata()["estimated_polynomial_degree"]
 
 
 def kJmol_to_eV(energy):
@@ -0,0 +1,133 @@
+import fenics as f
+import numpy as np
+
+
+class ZeroDofsBC:
+    """Homogeneous Dirichlet boundary condition applied on a list of DOFs.
+    Has the same apply() methods as fenics.DirichletBC but can only be used
+    with festim.Problem (or festim.BlockSparseProblem).
+
+    Args:
+        dofs (numpy.ndarray): the local indices of the constrained DOFs
+            owned by the process
+
+    Attributes:
+        dofs (numpy.ndarray): the local indices of the constrained DOFs
+            owned by the process
+    """
+
+    def __init__(self, dofs) -> None:
+        self.dofs = np.asarray(dofs, dtype=np.intc)
+
+    def apply(self, A, x=None):
+        """Applies the boundary condition to a matrix (identity rows) or to a
+        vector (zero values or, if x is given, x values for the residual of
+        a nonlinear problem)
+
+        Args:
+            A (fenics.GenericMatrix, fenics.GenericVector): the matrix or the
+                vector
+            x (fenics.GenericVector, optional): the current solution of the
+                nonlinear problem. Defaults to None.
+        """
+        if isinstance(A, f.GenericMatrix):
+            # collective operation, called by all the processes
+            A.ident_local(self.dofs)
+            return
+        values = A.get_local()
+        if x is None:
+            values[self.dofs] = 0
+        else:
+            values[self.dofs] = x.get_local()[self.dofs]
+        A.set_local(values)
+        A.apply("insert")
+
+
+class Problem(f.NonlinearProblem):
+    """Nonlinear problem used with a fenics.NewtonSolver, needed when the
+    boundary conditions include festim.ZeroDofsBC objects
+
+    Args:
+        F (ufl.Form): the residual form
+        J (ufl.Form): the jacobian form
+        bcs (list): list of fenics.DirichletBC and festim.ZeroDofsBC
+    """
+
+    def __init__(self, F, J, bcs):
+        f.NonlinearProblem.__init__(self)
+        self.F_form = F
+        self.J_form = J
+        self.bcs = bcs
+
+    def F(self, b, x):
+        f.assemble(self.F_form, tensor=b)
+        for bc in self.bcs:
+            bc.apply(b, x)
+
+    def J(self, A, x):
+        f.assemble(self.J_form, tensor=A)
+        for bc in self.bcs:
+            bc.apply(A)
+
+
+class BlockSparseProblem(Problem):
+    """Nonlinear problem whose jacobian is assembled in a matrix with a
+    block sparsity pattern: components of the mixed function space are only
+    coupled if they belong to the same block. Used with a
+    fenics.NewtonSolver.
+
+    Args:
+        F (ufl.Form): the residual form
+        J (ufl.Form): the jacobian form
+        bcs (list): list of fenics.DirichletBC and festim.ZeroDofsBC
+        layout (fenics.TensorLayout): the layout of the jacobian matrix (see
+            BlockSparseProblem.create_layout)
+    """
+
+    def __init__(self, F, J, bcs, layout):
+        super().__init__(F, J, bcs)
+        self.layout = layout
+
+    def J(self, A, x):
+        if A.empty():
+            from petsc4py import PETSc
+
+            A.init(self.layout)
+            mat = f.as_backend_type(A).mat()
+            # the cell matrices also hold zeros for the uncoupled components,
+            # only these can be outside of the pattern: any other entry
+            # raises an error instead of being dropped
+            mat.setOption(PETSc.Mat.Option.IGNORE_ZERO_ENTRIES, True)
+            mat.setOption(PETSc.Mat.Option.NEW_NONZERO_ALLOCATION_ERR, True)
+        super().J(A, x)
+
+    @staticmethod
+    def create_layout(V, blocks):
+        """Creates the layout of the jacobian matrix
+
+        Args:
+            V (fenics.FunctionSpace): the mixed function space
+            blocks (list): lists of components of V coupled together
+
+        Returns:
+            fenics.TensorLayout: the layout with the block sparsity pattern
+        """
+        mesh = V.mesh()
+        index_map = V.dofmap().index_map()
+        # the third argument is the primary dimension (0: row-major storage),
+        # not the block size, which is the one of index_map
+        layout = f.TensorLayout(
+            mesh.mpi_comm(),
+            [index_map, index_map],
+            0,
+            f.TensorLayout.Sparsity.SPARSE,
+            f.TensorLayout.Ghosts.UNGHOSTED,
+        )
+        pattern = layout.sparsity_pattern()
+        dofmaps = [V.sub(i).dofmap() for i in range(V.num_sub_spaces())]
+        for cell in range(mesh.num_cells()):
+            for block in blocks:
+                dofs = np.concatenate([dofmaps[i].cell_dofs(cell) for i in block])
+                pattern.insert_local([dofs, dofs])
+        pattern.apply()
+        return layout
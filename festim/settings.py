@@ -25,6 +25,26 @@ class Settings:
             options can be veiwed by print(list_linear_solver_methods()).
             More information can be found at: https://fenicsproject.org/pub/tutorial/html/._ftut1017.html.
             Defaults to None, for the newton solver this is: "umfpack".
+        sparse_jacobian (bool, optional): If set to True, the blocks of the
+            jacobian coupling different traps together (structurally zero)
+            are removed from its sparsity pattern. Requires petsc4py.
+            Defaults to False.
+        mass_lumping (str, optional): If "traps", the traps equations (and
+            the trapping terms of the mobile concentration) are integrated
+            with a vertex quadrature (lumped mass), making the traps blocks
+            diagonal. If "all", the transient term of the mobile
+            concentration is also lumped. Defaults to None.
+        conglomerate_traps (bool, optional): If set to True, traps living in
+            disjoint materials share the same component of the mixed
+            function space (see festim.Traps.make_components), which
+            changes the indices of the components. Defaults to False.
+        restrict_traps (bool, optional): If set to True (continuous traps
+            elements only), the traps DOFs located outside of the traps
+            materials are set to zero and eliminated from the Newton
+            system (see festim.Trap.create_restriction_bcs). These DOFs are
+            still allocated: the number of DOFs is unchanged. The initial
+            conditions of the traps are overwritten outside of their
+            materials. Defaults to False.
 
     Attributes:
         transient (bool): transient or steady state sim
@@ -40,6 +60,13 @@ class Settings:
         traps_element_type (str): Finite element used for traps.
         update_jacobian (bool):
         linear_solver (str): linear solver method for the newton solver
+        sparse_jacobian (bool): the trap-trap blocks are removed from the
+            sparsity pattern of the jacobian
+        mass_lumping (str): the terms integrated with a lumped mass
+        conglomerate_traps (bool): traps in disjoint materials share the
+            same component
+        restrict_traps (bool): the traps DOFs outside of the traps
+            materials are eliminated from the Newton system
     """
 
     def __init__(
@@ -54,6 +81,10 @@ class Settings:
         traps_element_type="CG",
         update_jacobian=True,
         linear_solver=None,
+        sparse_jacobian=False,
+        mass_lumping=None,
+        conglomerate_traps=False,
+        restrict_traps=False,
     ):
         # TODO maybe transient and final_time are redundant
         self.transient = transient
@@ -68,3 +99,17 @@ class Settings:
         self.traps_element_type = traps_element_type
         self.update_jacobian = update_jacobian
         self.linear_solver = linear_solver
+        self.sparse_jacobian = sparse_jacobian
+        self.mass_lumping = mass_lumping
+        self.conglomerate_traps = conglomerate_traps
+        self.restrict_traps = restrict_traps
+
+    @property
+    def mass_lumping(self):
+        return self._mass_lumping
+
+    @mass_lumping.setter
+    def mass_lumping(self, value):
+        if value not in [None, "traps", "all"]:
+            raise ValueError('mass_lumping must be None, "traps" or "all"')
+        self._mass_lumping = value
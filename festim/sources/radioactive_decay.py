@@ -13,10 +13,16 @@ class RadioactiveDecay(Source):
         field (str, optional): The field to which the source is
             applied. If "all" the decay will be applied to all
             concentrations. Defaults to "all".
+        exponential (bool, optional): If True, the decay is not added to the
+            variational formulation but the concentrations are multiplied
+            by exp(-lambda * dt) after each time step (exact decay). The
+            stepsize is then not limited by the decay. Only available in
+            transient simulations. Defaults to False.
     """
 
-    def __init__(self, decay_constant, volume, field="all") -> None:
+    def __init__(self, decay_constant, volume, field="all", exponential=False) -> None:
         self.decay_constant = decay_constant
+        self.exponential = exponential
         super().__init__(value=None, volume=volume, field=field)
 
     @property
@@ -1,5 +1,6 @@
 from fenics import Constant, Expression, Function, UserExpression
 import sympy as sp
+import festim
 
 
 class Source:
@@ -7,15 +8,18 @@ class Source:
     Volumetric source term.
 
     Args:
-        value (sympy.Expr, float, int, fenics.Expression, fenics.UserExpression, fenics.Function): the value of the
-            volumetric source term
+        value (sympy.Expr, float, int, fenics.Expression, fenics.UserExpression, fenics.Function, festim.SeparableExpression): the value of the
+            volumetric source term. If value is a sympy expression of the
+            form f(x) * g(t), a festim.SeparableExpression is created. If it
+            only depends on time, a festim.TimeDependentConstant is created.
         volume (int): the volume in which the source is applied
         field (str): the field on which the source is applied ("0",
             "solute", "1", "T")
 
     Attributes:
-        value (fenics.Expression, fenics.UserExpression, fenics.Constant): the
-            value of the volumetric source term
+        value (fenics.Expression, fenics.UserExpression, fenics.Constant,
+            festim.SeparableExpression): the value of the volumetric source
+            term
         volume (int): the volume in which the source is applied
         field (str): the field on which the source is applied ("0", "solute",
             "1", "T")
@@ -28,6 +32,19 @@ class Source:
         if isinstance(value, (float, int)):
             self.value = Constant(value)
         elif isinstance(value, sp.Expr):
-            self.value = Expression(sp.printing.ccode(value), t=0, degree=2)
-        elif isinstance(value, (Expression, UserExpression, Function)):
+            separated = festim.separate_space_and_time(value)
+            if separated is not None:
+                self.value = festim.SeparableExpression(*separated)
+            else:
+                self.value = festim.as_expression(value)
+        elif isinstance(
+            value,
+            (
+                Constant,
+                Expression,
+                UserExpression,
+                Function,
+                festim.SeparableExpression,
+            ),
+        ):
             self.value = value
@@ -21,16 +21,33 @@ class HeatTransferProblem(festim.Temperature):
             If None, the default fenics linear solver will be used ("umfpack").
             More information can be found at: https://fenicsproject.org/pub/tutorial/html/._ftut1017.html.
             Defaults to None.
+        coupled (bool, optional): If True, the temperature is solved
+            together with the hydrogen concentrations in the mixed function
+            space of festim.HTransportProblem (one Newton loop) instead of
+            being solved before them at each time step. Defaults to False.
+        mesh (festim.Mesh, optional): the mesh of the heat transfer problem.
+            If None, the mesh of the simulation is used. If provided, the
+            temperature is transferred to the mesh of the simulation after
+            each solve. Defaults to None.
 
     Attributes:
         F (fenics.Form): the variational form of the heat transfer problem
         v_T (fenics.TestFunction): the test function
         initial_condition (festim.InitialCondition): the initial condition
-        sub_expressions (list): contains time dependent fenics.Expression to
-            be updated
+        sub_expressions (festim.ExpressionsRegistry): contains the
+            expressions of the problem, the time dependent ones are updated
         sources (list): contains festim.Source objects for volumetric heat
             sources
         boundary_conditions (list): contains festim.BoundaryConditions
+        coupled (bool): if True, the heat transfer problem is solved
+            monolithically with the hydrogen transport problem
+        mesh (festim.Mesh): the mesh of the heat transfer problem
+        T_heat (fenics.Function): the temperature on the mesh of the heat
+            transfer problem. Same object as T if mesh is None
+        T_heat_n (fenics.Function): the previous temperature on the mesh of
+            the heat transfer problem. Same object as T_n if mesh is None
+        transfer_matrix (fenics.PETScMatrix): the interpolation matrix from
+            the heat transfer mesh to the mesh of the simulation
     """
 
     def __init__(
@@ -41,6 +58,8 @@ class HeatTransferProblem(festim.Temperature):
         relative_tolerance=1e-10,
         maximum_iterations=30,
         linear_solver=None,
+        coupled=False,
+        mesh=None,
     ) -> None:
         super().__init__()
         self.transient = transient
@@ -49,12 +68,20 @@ class HeatTransferProblem(festim.Temperature):
         self.relative_tolerance = relative_tolerance
         self.maximum_iterations = maximum_iterations
         self.linear_solver = linear_solver
+        self.coupled = coupled
+        self.mesh = mesh
+        if self.coupled and self.mesh is not None:
+            raise ValueError("a coupled HeatTransferProblem cannot have its own mesh")
+
+        self.T_heat = None
+        self.T_heat_n = None
+        self.transfer_matrix = None
 
         self.F = 0
         self.v_T = None
         self.sources = []
         self.boundary_conditions = []
-        self.sub_expressions = []
+        self.sub_expressions = festim.ExpressionsRegistry()
 
     # TODO rename initialise?
     def create_functions(self, materials, mesh, dt=None):
@@ -62,16 +89,36 @@ class HeatTransferProblem(festim.Temperature):
         Solves the steady-state heat transfer problem if self.transient is
         False.
 
+        If self.mesh is not None, the heat transfer problem is solved on
+        self.mesh and self.T, self.T_n are interpolated on the mesh of the
+        simulation.
+
         Args:
             materials (festim.Materials): the materials.
             mesh (festim.Mesh): the mesh
             dt (festim.Stepsize, optional): the stepsize. Only needed if
                 self.transient is True. Defaults to None.
         """
-        # Define variational problem for heat transfers
         V = f.FunctionSpace(mesh.mesh, "CG", 1)
         self.T = f.Function(V, name="T")
         self.T_n = f.Function(V, name="T_n")
+
+        # Define variational problem for heat transfers
+        if self.mesh is None:
+            heat_mesh = mesh
+            self.T_heat = self.T
+            self.T_heat_n = self.T_n
+        else:
+            heat_mesh = self.mesh
+            if isinstance(heat_mesh, festim.Mesh1D):
+                heat_mesh.define_measures(materials)
+            else:
+                heat_mesh.define_measures()
+            V_heat = f.FunctionSpace(heat_mesh.mesh, "CG", 1)
+            self.T_heat = f.Function(V_heat, name="T")
+            self.T_heat_n = f.Function(V_heat, name="T_n")
+            self.transfer_matrix = f.PETScDMCollection.create_transfer_matrix(V_heat, V)
+        V = self.T_heat.function_space()
         self.v_T = f.TestFunction(V)
 
         if self.transient and self.initial_condition:
@@ -79,24 +126,30 @@ class HeatTransferProblem(festim.Temperature):
                 if self.initial_condition.value.endswith(".xdmf"):
                     with f.XDMFFile(self.initial_condition.value) as file:
                         file.read_checkpoint(
-                            self.T_n,
+                            self.T_heat_n,
                             self.initial_condition.label,
                             self.initial_condition.time_step,
                         )
             else:
                 ccode_T_ini = sp.printing.ccode(self.initial_condition.value)
                 self.initial_condition.value = f.Expression(ccode_T_ini, degree=2, t=0)
-                self.T_n.assign(f.interpolate(self.initial_condition.value, V))
+                self.T_heat_n.assign(f.interpolate(self.initial_condition.value, V))
+            self.transfer_temperature()
+
+        if self.coupled:
+            # the formulation is created by festim.HTransportProblem
+            self.T.assign(self.T_n)
+            return
 
-        self.define_variational_problem(materials, mesh, dt)
-        self.create_dirichlet_bcs(mesh.surface_markers)
+        self.define_variational_problem(materials, heat_mesh, dt)
+        self.create_dirichlet_bcs(heat_mesh.surface_markers)
 
         if not self.transient:
             print("Solving stationary heat equation")
-            dT = f.TrialFunction(self.T.function_space())
-            JT = f.derivative(self.F, self.T, dT)
+            dT = f.TrialFunction(self.T_heat.function_space())
+            JT = f.derivative(self.F, self.T_heat, dT)
             problem = f.NonlinearVariationalProblem(
-                self.F, self.T, self.dirichlet_bcs, JT
+                self.F, self.T_heat, self.dirichlet_bcs, JT
             )
             solver = f.NonlinearVariationalSolver(problem)
             newton_solver_prm = solver.parameters["newton_solver"]
@@ -105,7 +158,8 @@ class HeatTransferProblem(festim.Temperature):
             newton_solver_prm["maximum_iterations"] = self.maximum_iterations
             newton_solver_prm["linear_solver"] = self.linear_solver
             solver.solve()
-            self.T_n.assign(self.T)
+            self.T_heat_n.assign(self.T_heat)
+            self.transfer_temperature()
 
     def define_variational_problem(self, materials, mesh, dt=None):
         """Create a variational form for heat transfer problem
@@ -118,7 +172,7 @@ class HeatTransferProblem(festim.Temperature):
         """
 
         print("Defining variational problem heat transfers")
-        T, T_n = self.T, self.T_n
+        T, T_n = self.T_heat, self.T_heat_n
         v_T = self.v_T
 
         self.F = 0
@@ -175,7 +229,7 @@ class HeatTransferProblem(festim.Temperature):
         # Boundary conditions
         for bc in self.boundary_conditions:
             if isinstance(bc, festim.FluxBC):
-                bc.create_form(self.T, solute=None)
+                bc.create_form(T, solute=None)
 
                 # TODO: maybe that's not necessary
                 self.sub_expressions += bc.sub_expressions
@@ -183,19 +237,23 @@ class HeatTransferProblem(festim.Temperature):
                 for surf in bc.surfaces:
                     self.F += -bc.form * self.v_T * mesh.ds(surf)
 
-    def create_dirichlet_bcs(self, surface_markers):
+    def create_dirichlet_bcs(self, surface_markers, V=None):
         """Creates a list of fenics.DirichletBC and add time dependent
         expressions to .sub_expressions
 
         Args:
             surface_markers (fenics.MeshFunction): contains the mesh facet
                 markers
+            V (fenics.FunctionSpace, optional): the function space on which
+                the BCs are applied. If None, the function space of
+                self.T_heat is used. Defaults to None.
         """
-        V = self.T.function_space()
+        if V is None:
+            V = self.T_heat.function_space()
         self.dirichlet_bcs = []
         for bc in self.boundary_conditions:
             if isinstance(bc, festim.DirichletBC) and bc.field == "T":
-                bc.create_expression(self.T)
+                bc.create_expression(self.T_heat)
                 for surf in bc.surfaces:
                     bci = f.DirichletBC(V, bc.expression, surface_markers, surf)
                     self.dirichlet_bcs.append(bci)
@@ -209,13 +267,16 @@ class HeatTransferProblem(festim.Temperature):
         Args:
             t (float): the time
         """
-        if self.transient:
-            festim.update_expressions(self.sub_expressions, t)
+        if self.transient and self.coupled:
+            # T is solved by festim.HTransportProblem
+            self.sub_expressions.update(t)
+        elif self.transient:
+            self.sub_expressions.update(t)
             # Solve heat transfers
-            dT = f.TrialFunction(self.T.function_space())
-            JT = f.derivative(self.F, self.T, dT)  # Define the Jacobian
+            dT = f.TrialFunction(self.T_heat.function_space())
+            JT = f.derivative(self.F, self.T_heat, dT)  # Define the Jacobian
             problem = f.NonlinearVariationalProblem(
-                self.F, self.T, self.dirichlet_bcs, JT
+                self.F, self.T_heat, self.dirichlet_bcs, JT
             )
             solver = f.NonlinearVariationalSolver(problem)
             newton_solver_prm = solver.parameters["newton_solver"]
@@ -224,7 +285,18 @@ class HeatTransferProblem(festim.Temperature):
             newton_solver_prm["maximum_iterations"] = self.maximum_iterations
             newton_solver_prm["linear_solver"] = self.linear_solver
             solver.solve()
-            self.T_n.assign(self.T)
+            self.T_heat_n.assign(self.T_heat)
+            self.transfer_temperature()
+
+    def transfer_temperature(self):
+        """Interpolates self.T_heat and self.T_heat_n on the mesh of the
+        simulation (self.T and self.T_n) with the precomputed transfer matrix.
+        Does nothing if the heat transfer problem has no mesh of its own.
+        """
+        if self.transfer_matrix is None:
+            return
+        self.transfer_matrix.mult(self.T_heat.vector(), self.T.vector())
+        self.transfer_matrix.mult(self.T_heat_n.vector(), self.T_n.vector())
 
     def is_steady_state(self):
         return not self.transient
@@ -1,5 +1,7 @@
 import festim
 import fenics as f
+import numpy as np
+import pytest
 
 
 def test_default_dt_min_value():
@@ -122,3 +124,90 @@ def test_solve_once_linear_solver_mumps():
 
     # test
     assert converged
+
+
+def test_solve_once_sparse_jacobian():
+    """Checks that solve_once() gives the same solution when the trap-trap
+    blocks are removed from the jacobian"""
+    # build
+    mesh = f.UnitIntervalMesh(8)
+    element = f.FiniteElement("CG", mesh.ufl_cell(), 1)
+    V = f.FunctionSpace(mesh, f.MixedElement([element] * 3))
+
+    solutions = []
+    for sparse_jacobian in [False, True]:
+        my_settings = festim.Settings(
+            absolute_tolerance=1e-10,
+            relative_tolerance=1e-10,
+            maximum_iterations=50,
+            sparse_jacobian=sparse_jacobian,
+        )
+        my_problem = festim.HTransportProblem(
+            festim.Mobile(),
+            festim.Traps([festim.Trap(1, 0, 1, 0, "mat", 1) for _ in range(2)]),
+            festim.Temperature(200),
+            my_settings,
+            [],
+        )
+        my_problem.V = V
+        my_problem.u = f.Function(V)
+        my_problem.v = f.TestFunction(V)
+        my_problem.bcs = []
+        c_m, c_t1, c_t2 = f.split(my_problem.u)
+        v_m, v_t1, v_t2 = f.split(my_problem.v)
+        my_problem.F = (
+            f.dot(f.grad(c_m), f.grad(v_m)) * f.dx
+            + c_m * v_m * f.dx
+            - 1 * v_m * f.dx
+            + (c_t1 - c_m**2) * v_t1 * f.dx
+            + (c_t2 - 2 * c_m) * v_t2 * f.dx
+        )
+        # run
+        nb_it, converged = my_problem.solve_once()
+        assert converged
+        solutions.append(my_problem.u.vector()[:])
+
+    # test
+    assert np.allclose(solutions[0], solutions[1])
+
+
+def test_block_sparse_layout_has_less_nonzeros():
+    """Checks that removing the trap-trap blocks reduces the number of
+    nonzeros in the sparsity pattern of the jacobian"""
+    mesh = f.UnitIntervalMesh(8)
+    element = f.FiniteElement("CG", mesh.ufl_cell(), 1)
+    V = f.FunctionSpace(mesh, f.MixedElement([element] * 4))
+
+    full = festim.BlockSparseProblem.create_layout(V, [[0, 1, 2, 3]])
+    sparse = festim.BlockSparseProblem.create_layout(V, [[0, 1], [0, 2], [0, 3]])
+
+    nnz_full = full.sparsity_pattern().num_nonzeros()
+    nnz_sparse = sparse.sparsity_pattern().num_nonzeros()
+    # 16 blocks vs 10 blocks
+    assert nnz_sparse == nnz_full * 10 / 16
+
+
+def test_block_sparse_jacobian_entries_outside_pattern():
+    """Checks that the jacobian of a BlockSparseProblem is assembled when
+    its nonzero entries are in the pattern and that nonzero entries outside
+    of the pattern raise an error instead of being dropped (the elements
+    have different degrees so that the DOFs are not numbered by blocks)"""
+    mesh = f.UnitIntervalMesh(8)
+    P1 = f.FiniteElement("CG", mesh.ufl_cell(), 1)
+    P2 = f.FiniteElement("CG", mesh.ufl_cell(), 2)
+    V = f.FunctionSpace(mesh, f.MixedElement([P1, P2, P1]))
+    layout = festim.BlockSparseProblem.create_layout(V, [[0, 1], [0, 2]])
+    u = f.TrialFunction(V)
+    v = f.TestFunction(V)
+    x = f.Function(V).vector()
+
+    J = (u[0] * v[1] + u[2] * v[0]) * f.dx
+    problem = festim.BlockSparseProblem(None, J, [], layout)
+    A = f.PETScMatrix()
+    problem.J(A, x)
+    assert np.isclose(A.norm("frobenius"), f.assemble(J).norm("frobenius"))
+
+    J = u[1] * v[2] * f.dx
+    problem = festim.BlockSparseProblem(None, J, [], layout)
+    with pytest.raises(RuntimeError):
+        problem.J(f.PETScMatrix(), x)
@@ -1,4 +1,5 @@
 import festim as F
+import pytest
 
 
 def test_extrinsic_trap():
@@ -66,3 +67,39 @@ def test_neutron_induced_trap():
     # run simulation
     my_sim.initialise()
     my_sim.run()
+
+
+def test_neutron_induced_trap_coupled():
+    """Runs a festim sim with a NeutronInducedTrap which density is solved
+    together with the concentrations and checks the density against the
+    analytical solution of its backward Euler discretisation"""
+    my_sim = F.Simulation()
+
+    my_sim.mesh = F.MeshFromVertices([0, 1, 2, 3, 4])
+
+    my_sim.materials = F.Materials([F.Material(1, 1, 0, name="mat")])
+
+    trap_1 = F.NeutronInducedTrap(
+        0, 0, 0, 0, materials=["mat"], phi=1, K=1, n_max=10, A_0=0, E_A=0, coupled=True
+    )
+    my_sim.traps = F.Traps([trap_1])
+
+    my_sim.T = F.Temperature(100)
+
+    my_sim.settings = F.Settings(1e-10, 1e-10, final_time=10)
+    my_sim.dt = F.Stepsize(1)
+
+    my_sim.initialise()
+
+    # one component for the solute, one for the trap and one for the density
+    assert my_sim.h_transport_problem.V.num_sub_spaces() == 3
+    assert trap_1.density_component == 2
+
+    my_sim.run()
+
+    # n_(i+1) = (n_i + dt*phi*K) / (1 + dt*phi*K/n_max)
+    expected = 0
+    for _ in range(10):
+        expected = (expected + 1) / (1 + 1 / 10)
+    density = my_sim.h_transport_problem.u.split()[2]
+    assert density(2) == pytest.approx(expected)
@@ -85,6 +85,65 @@ def test_error_transient_without_stepsize():
         my_model.initialise()
 
 
+def test_error_coupled_heat_transfer_steady_state():
+    """Checks that an error is raised when a coupled HeatTransferProblem is
+    used in a steady state simulation"""
+    my_model = F.Simulation()
+
+    my_model.mesh = F.MeshFromVertices([0, 1, 2, 3])
+
+    my_model.materials = F.Materials([F.Material(id=1, D_0=1, E_D=0, thermal_cond=1)])
+
+    my_model.T = F.HeatTransferProblem(transient=False, coupled=True)
+
+    my_model.settings = F.Settings(
+        absolute_tolerance=1e-10, relative_tolerance=1e-10, transient=False
+    )
+
+    with pytest.raises(ValueError, match="coupled HeatTransferProblem"):
+        my_model.initialise()
+
+
+def test_error_wrong_mass_lumping():
+    """Checks that an error is raised when mass_lumping is not None, "traps"
+    or "all"
+    """
+    with pytest.raises(ValueError, match="mass_lumping must be"):
+        F.Settings(1e-10, 1e-10, mass_lumping="mobile")
+
+
+def test_error_initial_condition_trap_at_equilibrium():
+    """Checks that an error is raised when an initial condition is set on a
+    trap at equilibrium
+    """
+    my_model = F.Simulation()
+    my_model.mesh = F.MeshFromVertices(np.linspace(0, 1, num=10))
+    my_mat = F.Material(id=1, D_0=1, E_D=0)
+    my_model.materials = my_mat
+    my_model.traps = F.Trap(1, 0, 1, 0, my_mat, 1, equilibrium=True)
+    my_model.initial_conditions = [F.InitialCondition(field=1, value=1)]
+    my_model.T = F.Temperature(300)
+    my_model.settings = F.Settings(1e-10, 1e-10, final_time=1)
+    my_model.dt = F.Stepsize(0.1)
+
+    with pytest.raises(ValueError, match="traps at equilibrium"):
+        my_model.initialise()
+
+
+def test_error_exponential_decay_steady_state():
+    """Checks that an error is raised when an exponential RadioactiveDecay is
+    used in a steady state simulation"""
+    my_model = F.Simulation()
+    my_model.mesh = F.MeshFromVertices(np.linspace(0, 1, num=10))
+    my_model.materials = F.Material(id=1, D_0=1, E_D=0)
+    my_model.sources = [F.RadioactiveDecay(1, volume=1, exponential=True)]
+    my_model.T = F.Temperature(300)
+    my_model.settings = F.Settings(1e-10, 1e-10, transient=False)
+
+    with pytest.raises(ValueError, match="exponential RadioactiveDecay"):
+        my_model.initialise()
+
+
 def test_high_recombination_flux():
     """Added test that catches the bug #465
     Checks that with chemical potential and a high recombination coefficient
@@ -195,6 +254,38 @@ def test_txt_export_desired_times(tmp_path, final_time, stepsize, export_times):
     assert len(data[0, :]) == len(my_export.times) + 1
 
 
+def test_txt_export_last_time_after_final_time(tmp_path):
+    """
+    Tests that the TXTExport file is written when the last export time is
+    after the final time
+
+    Args:
+        tmp_path (os.PathLike): path to a temporary folder
+    """
+    my_model = F.Simulation()
+
+    my_model.mesh = F.MeshFromVertices(np.linspace(0, 1))
+    my_model.materials = F.Material(1, 1, 0)
+    my_model.settings = F.Settings(1e-10, 1e-10, final_time=1)
+    my_model.T = F.Temperature(500)
+    my_model.dt = F.Stepsize(0.1)
+
+    my_export = F.TXTExport(
+        "solute", times=[0.5, 5], filename="{}/mobile_conc.txt".format(tmp_path)
+    )
+    my_model.exports = [my_export]
+
+    my_model.initialise()
+    my_model.run()
+
+    data = np.genfromtxt(
+        my_export.filename,
+        skip_header=1,
+        delimiter=",",
+    )
+    assert data.shape[1] == 2
+
+
 def test_txt_export_all_times(tmp_path):
     """
     Tests that TXTExport can be exported at all timesteps
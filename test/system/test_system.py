@@ -172,6 +172,71 @@ def test_run_temperature_transient(tmpdir):
     assert error < 1e-9
 
 
+def test_run_temperature_transient_coupled():
+    """
+    Check that the temperature is correctly computed in 1D transient when the
+    heat transfer problem is coupled to the H transport problem
+    """
+    u = 1 + 2 * festim.x**2 + festim.t
+    size = 1
+
+    my_materials = festim.Materials(
+        [
+            festim.Material(
+                id=1,
+                D_0=4.1e-7,
+                E_D=0.39,
+                thermal_cond=1,
+                rho=1,
+                heat_capacity=1,
+                borders=[0, size],
+            )
+        ]
+    )
+    my_mesh = festim.MeshFromRefinements(200, size)
+
+    my_bcs = [
+        festim.DirichletBC(surfaces=[1], value=1, field=0),
+        festim.DirichletBC(surfaces=[1, 2], value=u, field="T"),
+    ]
+
+    my_temp = festim.HeatTransferProblem(
+        transient=True,
+        initial_condition=festim.InitialCondition(field="T", value=u),
+        coupled=True,
+    )
+
+    my_sources = [
+        festim.Source(
+            value=sp.diff(u, festim.t) - sp.diff(u, festim.x, 2), volume=1, field="T"
+        )
+    ]
+
+    my_settings = festim.Settings(
+        absolute_tolerance=1e10,
+        relative_tolerance=1e-9,
+        maximum_iterations=50,
+        transient=True,
+        final_time=30,
+    )
+
+    my_sim = festim.Simulation(
+        mesh=my_mesh,
+        materials=my_materials,
+        sources=my_sources,
+        boundary_conditions=my_bcs,
+        dt=festim.Stepsize(initial_value=0.5),
+        settings=my_settings,
+        temperature=my_temp,
+    )
+    my_sim.initialise()
+    my_sim.run()
+
+    assert my_sim.h_transport_problem.T_component == 1
+    error = compute_error(u, computed=my_sim.T.T, t=my_sim.t, norm="error_max")
+    assert error < 1e-9
+
+
 def test_run_MMS(tmpdir):
     """
     Test function run() for several refinements
@@ -872,6 +937,50 @@ def test_steady_state_with_2_materials():
     assert my_sim.h_transport_problem.u(0.5, 0.5) != 0
 
 
+def test_separable_heat_source_with_heat_mesh():
+    """Checks that a separable heat source is interpolated on the mesh of
+    the HeatTransferProblem when it has its own mesh (MMS)
+    """
+    u = 300 + sp.exp(festim.t) * sp.sin(festim.x)
+    heat_mesh = festim.MeshFromVertices(np.linspace(0, 1, num=21))
+    my_temp = festim.HeatTransferProblem(
+        transient=True,
+        initial_condition=festim.InitialCondition(field="T", value=u),
+        mesh=heat_mesh,
+    )
+    my_source = festim.Source(
+        value=2 * sp.exp(festim.t) * sp.sin(festim.x), volume=1, field="T"
+    )
+    assert isinstance(my_source.value, festim.SeparableExpression)
+
+    my_sim = festim.Simulation(
+        mesh=festim.MeshFromVertices(np.linspace(0, 1, num=41)),
+        materials=festim.Material(
+            id=1, D_0=1, E_D=0, thermal_cond=1, rho=1, heat_capacity=1
+        ),
+        sources=[my_source],
+        boundary_conditions=[
+            festim.DirichletBC(surfaces=[1], value=1, field=0),
+            festim.DirichletBC(surfaces=[1, 2], value=u, field="T"),
+        ],
+        temperature=my_temp,
+        settings=festim.Settings(
+            absolute_tolerance=1e-10, relative_tolerance=1e-9, final_time=0.5
+        ),
+        dt=festim.Stepsize(0.1),
+    )
+    my_sim.initialise()
+
+    assert (
+        my_source.value.spatial.function_space().mesh().id() == heat_mesh.mesh.id()
+    )
+
+    my_sim.run()
+
+    expected = 300 + np.exp(my_sim.t) * np.sin(0.5)
+    assert my_temp.T_heat(0.5) == pytest.approx(expected, rel=1e-3)
+
+
 def test_steady_state_traps_not_everywhere():
     """Creates a simulation problem with a trap not set in all subdomains runs
     the sim and check that the value is not NaN
@@ -915,6 +1024,170 @@ def test_steady_state_traps_not_everywhere():
     assert not np.isnan(my_sim.h_transport_problem.u.split()[1](0.5))
 
 
+def test_trap_at_material_interface_2D():
+    """Runs a 2D steady state simulation with a trap in one of the two
+    materials and checks that the trap concentration on the interface is not
+    set to zero by the elimination of the DOFs outside of the trap material
+    """
+    mesh = fenics.UnitSquareMesh(8, 8)
+    volume_markers = fenics.MeshFunction("size_t", mesh, mesh.topology().dim(), 1)
+    fenics.CompiledSubDomain("x[0] >= 0.5 - DOLFIN_EPS").mark(volume_markers, 2)
+    surface_markers = fenics.MeshFunction("size_t", mesh, mesh.topology().dim() - 1, 0)
+    fenics.CompiledSubDomain("on_boundary && near(x[0], 0)").mark(surface_markers, 1)
+
+    mat1 = festim.Material(id=1, D_0=1, E_D=0)
+    mat2 = festim.Material(id=2, D_0=1, E_D=0)
+    my_trap = festim.Trap(1, 0, 1, 0, mat1, 1)
+
+    my_sim = festim.Simulation(
+        mesh=festim.Mesh(mesh, volume_markers, surface_markers),
+        materials=festim.Materials([mat1, mat2]),
+        traps=my_trap,
+        temperature=festim.Temperature(1),
+        boundary_conditions=[festim.DirichletBC([1], value=1, field=0)],
+        settings=festim.Settings(
+            absolute_tolerance=1e-10,
+            relative_tolerance=1e-9,
+            transient=False,
+            restrict_traps=True,
+        ),
+    )
+    my_sim.initialise()
+    my_sim.run()
+
+    trapped = my_sim.h_transport_problem.u.split()[1]
+    # c_m = 1 everywhere, c_t = k n c_m / (k c_m + p) = 0.5 in the trap material
+    for y in [0, 0.5, 1]:
+        assert trapped(0.5, y) == pytest.approx(0.5)
+        assert trapped(0.25, y) == pytest.approx(0.5)
+        assert trapped(0.75, y) == pytest.approx(0)
+
+
+@pytest.mark.parametrize("restrict_traps", [False, True])
+def test_trap_initial_condition_outside_trap_material(restrict_traps):
+    """Runs a transient simulation with a trap in one of the two materials
+    and an initial condition everywhere and checks that the initial condition
+    is only overwritten outside of the trap material when restrict_traps is
+    True (by default the simulation is solved as before)
+    """
+    mat1 = festim.Material(id=1, D_0=1, E_D=0, borders=[0, 0.5])
+    mat2 = festim.Material(id=2, D_0=1, E_D=0, borders=[0.5, 1])
+    my_sim = festim.Simulation(
+        mesh=festim.MeshFromVertices(np.linspace(0, 1, num=21)),
+        materials=festim.Materials([mat1, mat2]),
+        traps=festim.Trap(1, 0, 1, 0, mat1, 1),
+        initial_conditions=[festim.InitialCondition(field=1, value=0.3)],
+        temperature=festim.Temperature(1),
+        settings=festim.Settings(
+            absolute_tolerance=1e-10,
+            relative_tolerance=1e-9,
+            final_time=1,
+            restrict_traps=restrict_traps,
+        ),
+        dt=festim.Stepsize(0.5),
+    )
+    my_sim.initialise()
+    my_sim.run()
+
+    assert (len(my_sim.h_transport_problem.restriction_bcs) > 0) == restrict_traps
+    trapped = my_sim.h_transport_problem.u.split()[1]
+    if restrict_traps:
+        assert trapped(0.75) == pytest.approx(0)
+    else:
+        # only the time derivative is solved outside of the trap material
+        assert trapped(0.75) == pytest.approx(0.3)
+
+def test_conglomerated_traps():
+    """Runs a transient simulation with traps in disjoint materials sharing the
+    same component and checks that the trapped inventories are the same as
+    when the traps have their own components (an initial condition prevents
+    the conglomeration)
+    """
+
+    def run(initial_conditions):
+        my_materials = festim.Materials(
+            [
+                festim.Material(id=1, D_0=1, E_D=0, borders=[0, 0.3]),
+                festim.Material(id=2, D_0=2, E_D=0, borders=[0.3, 0.6]),
+                festim.Material(id=3, D_0=3, E_D=0, borders=[0.6, 1]),
+            ]
+        )
+        my_traps = [
+            festim.Trap(1, 0, 1, 0, my_materials[0], 1),
+            festim.Trap(1, 0, 2, 0, my_materials[1], 2),
+            festim.Trap(2, 0, 1, 0, my_materials[2], 3),
+        ]
+        derived_quantities = festim.DerivedQuantities(
+            [festim.TotalVolume(str(i), volume=i) for i in [1, 2, 3]]
+        )
+        my_sim = festim.Simulation(
+            mesh=festim.MeshFromVertices(np.linspace(0, 1, num=101)),
+            materials=my_materials,
+            traps=my_traps,
+            temperature=festim.Temperature(1),
+            boundary_conditions=[festim.DirichletBC([1], value=1, field=0)],
+            initial_conditions=initial_conditions,
+            settings=festim.Settings(
+                absolute_tolerance=1e-10,
+                relative_tolerance=1e-9,
+                final_time=1,
+                conglomerate_traps=True,
+            ),
+            dt=festim.Stepsize(0.1),
+            exports=[derived_quantities],
+        )
+        my_sim.initialise()
+        my_sim.run()
+        return my_sim, [quantity.data[-1] for quantity in derived_quantities]
+
+    conglomerated_sim, conglomerated = run([])
+    separated_sim, separated = run([festim.InitialCondition(field=3, value=0)])
+
+    assert conglomerated_sim.h_transport_problem.V.num_sub_spaces() == 3
+    assert separated_sim.h_transport_problem.V.num_sub_spaces() == 4
+    assert np.allclose(conglomerated, separated, rtol=1e-8, atol=0)
+
+
+def test_trap_at_equilibrium():
+    """Runs a transient simulation with fast trapping kinetics and checks that
+    the trapped inventory is the same when the trap is assumed to be at
+    equilibrium with the mobile concentration
+    """
+
+    def run(equilibrium):
+        my_materials = festim.Materials([festim.Material(id=1, D_0=1, E_D=0)])
+        my_trap = festim.Trap(
+            1e6, 0, 1e6, 0, my_materials[0], 2, equilibrium=equilibrium
+        )
+        derived_quantities = festim.DerivedQuantities(
+            [festim.TotalVolume("1", volume=1), festim.TotalVolume("solute", 1)]
+        )
+        my_sim = festim.Simulation(
+            mesh=festim.MeshFromVertices(np.linspace(0, 1, num=101)),
+            materials=my_materials,
+            traps=my_trap,
+            temperature=festim.Temperature(300),
+            boundary_conditions=[festim.DirichletBC([1], value=1, field=0)],
+            settings=festim.Settings(
+                absolute_tolerance=1e-10,
+                relative_tolerance=1e-9,
+                final_time=0.2,
+            ),
+            dt=festim.Stepsize(0.01),
+            exports=[derived_quantities],
+        )
+        my_sim.initialise()
+        my_sim.run()
+        return my_sim, [quantity.data[-1] for quantity in derived_quantities]
+
+    kinetic_sim, kinetic = run(equilibrium=False)
+    equilibrium_sim, equilibrium = run(equilibrium=True)
+
+    assert kinetic_sim.h_transport_problem.V.num_sub_spaces() == 2
+    assert equilibrium_sim.h_transport_problem.V.num_sub_spaces() == 0
+    assert np.allclose(kinetic, equilibrium, rtol=1e-3, atol=0)
+
+
 def test_no_jacobian_update():
     """Runs a transient sim and with the flag "update_jacobian" set to False."""
 
@@ -1220,3 +1493,130 @@ def test_MMS_decay_with_trap():
     )
     print(msg)
     assert error_max_u < tol_u and error_max_v < tol_v
+
+
+def test_exponential_decay():
+    """Runs a transient simulation with a mobile and a trapped concentration
+    decaying exponentially and checks that the total inventory is exactly
+    multiplied by exp(-lambda t) despite the large stepsize
+    """
+    decay_constant = 10
+    my_materials = festim.Materials([festim.Material(id=1, D_0=1, E_D=0)])
+    my_trap = festim.Trap(1, 0, 1, 0, my_materials[0], 2)
+    derived_quantities = festim.DerivedQuantities(
+        [festim.TotalVolume("solute", volume=1), festim.TotalVolume("1", volume=1)]
+    )
+    my_sim = festim.Simulation(
+        mesh=festim.MeshFromVertices(np.linspace(0, 1, num=11)),
+        materials=my_materials,
+        traps=my_trap,
+        temperature=festim.Temperature(300),
+        initial_conditions=[
+            festim.InitialCondition(field=0, value=1),
+            festim.InitialCondition(field=1, value=1),
+        ],
+        sources=[
+            festim.RadioactiveDecay(
+                decay_constant=decay_constant, volume=1, exponential=True
+            )
+        ],
+        settings=festim.Settings(
+            absolute_tolerance=1e-10,
+            relative_tolerance=1e-9,
+            final_time=1,
+        ),
+        dt=festim.Stepsize(0.1),
+        exports=[derived_quantities],
+    )
+    my_sim.initialise()
+    my_sim.run()
+
+    # trapping and detrapping conserve the total inventory
+    inventory = np.array(derived_quantities[0].data) + np.array(
+        derived_quantities[1].data
+    )
+    expected = 2 * np.exp(-decay_constant * np.array(derived_quantities.t))
+    assert np.allclose(inventory, expected, rtol=1e-6)
+
+
+def test_consistent_surface_flux():
+    """Checks that the consistent surface flux computed from the residual is
+    exact on a coarse mesh (steady state diffusion with a uniform source)
+    whereas the flux computed from the gradient isn't
+    """
+    my_sim = festim.Simulation(
+        mesh=festim.MeshFromVertices(np.linspace(0, 1, num=5)),
+        materials=festim.Material(id=1, D_0=1, E_D=0),
+        sources=[festim.Source(1, volume=1, field="solute")],
+        temperature=festim.Temperature(300),
+        boundary_conditions=[festim.DirichletBC([1, 2], value=0, field="solute")],
+        settings=festim.Settings(
+            absolute_tolerance=1e-10, relative_tolerance=1e-10, transient=False
+        ),
+    )
+    consistent_flux = festim.SurfaceFlux("solute", 1, consistent=True)
+    gradient_flux = festim.SurfaceFlux("solute", 1)
+    my_sim.exports = [festim.DerivedQuantities([consistent_flux, gradient_flux])]
+
+    my_sim.initialise()
+    my_sim.run()
+
+    # exact solution c = x (1 - x) / 2, D grad(c).n = -1/2 at x = 0
+    assert consistent_flux.data[-1] == pytest.approx(-0.5)
+    assert gradient_flux.data[-1] != pytest.approx(-0.5)
+
+
+def test_consistent_surface_flux_transient():
+    """Checks that the consistent surface fluxes satisfy the discrete mass
+    balance of a transient simulation with a trap:
+    d(c_m + c_t)/dt = source + fluxes
+    """
+    my_mat = festim.Material(id=1, D_0=1, E_D=0)
+    my_sim = festim.Simulation(
+        mesh=festim.MeshFromVertices(np.linspace(0, 1, num=11)),
+        materials=my_mat,
+        traps=festim.Trap(1, 0, 1, 0, my_mat, 1),
+        sources=[festim.Source(1, volume=1, field="solute")],
+        temperature=festim.Temperature(300),
+        boundary_conditions=[festim.DirichletBC([1, 2], value=0, field="solute")],
+        settings=festim.Settings(
+            absolute_tolerance=1e-12, relative_tolerance=1e-12, final_time=0.5
+        ),
+        dt=festim.Stepsize(0.1),
+    )
+    derived_quantities = festim.DerivedQuantities(
+        [
+            festim.SurfaceFlux("solute", 1, consistent=True),
+            festim.SurfaceFlux("solute", 2, consistent=True),
+            festim.TotalVolume("solute", volume=1),
+            festim.TotalVolume("1", volume=1),
+        ]
+    )
+    my_sim.exports = [derived_quantities]
+
+    my_sim.initialise()
+    my_sim.run()
+
+    flux_1, flux_2, mobile, trapped = [
+        np.array(quantity.data) for quantity in derived_quantities
+    ]
+    inventory = np.concatenate(([0], mobile + trapped))
+    assert np.allclose(np.diff(inventory) / 0.1, 1 + flux_1 + flux_2, rtol=1e-6)
+
+
+def test_error_consistent_flux_without_dirichlet():
+    my_sim = festim.Simulation(
+        mesh=festim.MeshFromVertices(np.linspace(0, 1, num=5)),
+        materials=festim.Material(id=1, D_0=1, E_D=0),
+        temperature=festim.Temperature(300),
+        boundary_conditions=[festim.DirichletBC([1], value=0, field="solute")],
+        settings=festim.Settings(
+            absolute_tolerance=1e-10, relative_tolerance=1e-10, transient=False
+        ),
+        exports=[
+            festim.DerivedQuantities([festim.SurfaceFlux("solute", 2, consistent=True)])
+        ],
+    )
+
+    with pytest.raises(ValueError, match="requires a DirichletBC on surface 2"):
+        my_sim.initialise()
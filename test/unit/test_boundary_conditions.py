@@ -599,3 +599,24 @@ def test_dissoc_flux():
 
     my_BC = festim.DissociationFlux(surfaces=[0], Kd_0=expr, E_Kd=expr, P=1)
     my_BC.create_form(T, None)
+
+
+def test_recombination_flux_parameters_types():
+    """Checks that the numeric parameters of a RecombinationFlux are
+    converted to fenics.Constant, time dependent ones to
+    festim.TimeDependentConstant and space dependent ones to fenics.Expression
+    """
+    my_BC = festim.RecombinationFlux(Kr_0=1 + festim.x, E_Kr=0.5, order=2, surfaces=[0])
+    my_BC.create_form(fenics.Constant(300), fenics.Constant(1))
+    Kr_0, E_Kr = my_BC.sub_expressions
+    assert isinstance(Kr_0, fenics.Expression)
+    assert isinstance(E_Kr, fenics.Constant)
+
+    my_BC = festim.RecombinationFlux(
+        Kr_0=1 + festim.t, E_Kr=sp.Float(0.5), order=2, surfaces=[0]
+    )
+    my_BC.create_form(fenics.Constant(300), fenics.Constant(1))
+    Kr_0, E_Kr = my_BC.sub_expressions
+    assert isinstance(Kr_0, festim.TimeDependentConstant)
+    assert type(E_Kr) is fenics.Constant
+    assert float(E_Kr) == 0.5
@@ -6,9 +6,11 @@ from festim import (
     TotalVolume,
     MaximumVolume,
     MinimumVolume,
+    AverageSurface,
     Materials,
 )
 import fenics as f
+import numpy as np
 import os
 from pathlib import Path
 import pytest
@@ -264,6 +266,112 @@ class TestCompute:
 
         assert my_derv_quant.data[0] == expected_data
 
+    def test_data_of_quantities(self):
+        """Checks that the data and t attributes of the quantities are the
+        columns of the time series of DerivedQuantities"""
+        my_derv_quant = DerivedQuantities([self.surface_flux_1, self.average_vol_1])
+        for quantity in my_derv_quant:
+            quantity.function = self.label_to_function[quantity.field]
+        my_derv_quant.assign_properties_to_quantities(self.my_mats)
+        my_derv_quant.assign_measures_to_quantities(self.dx, self.ds)
+
+        for t in [1, 2, 3]:
+            my_derv_quant.compute(t)
+
+        rows = my_derv_quant.data[1:]
+        for i, quantity in enumerate(my_derv_quant):
+            assert quantity.t == [1, 2, 3]
+            assert quantity.data == [row[i + 1] for row in rows]
+        assert my_derv_quant.t == [1, 2, 3]
+
+    def test_quantity_added_before_compute(self):
+        """Checks that quantities can be added before the first computation
+        and that the header is updated"""
+        my_derv_quant = DerivedQuantities([self.surface_flux_1])
+        my_derv_quant.data = [my_derv_quant.make_header()]
+        my_derv_quant.append(self.average_vol_1)
+        for quantity in my_derv_quant:
+            quantity.function = self.label_to_function[quantity.field]
+        my_derv_quant.assign_properties_to_quantities(self.my_mats)
+        my_derv_quant.assign_measures_to_quantities(self.dx, self.ds)
+
+        my_derv_quant.compute(1)
+
+        assert my_derv_quant.header == my_derv_quant.make_header()
+        assert len(my_derv_quant.data[1]) == 3
+
+    def test_error_quantity_added_after_compute(self):
+        """Checks that an error is raised instead of dropping the computed
+        values when a quantity is added after a computation"""
+        my_derv_quant = DerivedQuantities([self.surface_flux_1])
+        my_derv_quant.append(self.average_vol_1)
+        for quantity in my_derv_quant:
+            quantity.function = self.label_to_function[quantity.field]
+        my_derv_quant.assign_properties_to_quantities(self.my_mats)
+        my_derv_quant.assign_measures_to_quantities(self.dx, self.ds)
+        my_derv_quant.compute(1)
+
+        my_derv_quant.append(self.tot_surf_1)
+        with pytest.raises(ValueError, match="already been computed"):
+            my_derv_quant.compute(2)
+        assert my_derv_quant.t == [1]
+
+
+def test_data_append():
+    """Checks that the rows appended to data are added to the time series"""
+    my_derv_quant = DerivedQuantities([])
+    my_derv_quant.data = [["t(s)", "a"], [1, 2]]
+
+    my_derv_quant.data.append([2, 3])
+    my_derv_quant.data += [[3, 4]]
+
+    assert my_derv_quant.data == [["t(s)", "a"], [1, 2], [2, 3], [3, 4]]
+    assert my_derv_quant.t == [1, 2, 3]
+
+
+def test_compute_integrals():
+    """Checks that the quantities computed with a single fused assembly
+    match the values computed by each quantity and that the fused form is
+    only compiled once"""
+    mesh = f.UnitIntervalMesh(10)
+    V = f.FunctionSpace(mesh, "P", 1)
+    c = f.interpolate(f.Expression("1 + x[0]*x[0]", degree=2), V)
+
+    vol_markers = f.MeshFunction("size_t", mesh, 1, 1)
+    f.CompiledSubDomain("x[0] >= 0.5 - DOLFIN_EPS").mark(vol_markers, 2)
+    surface_markers = f.MeshFunction("size_t", mesh, 0)
+    f.CompiledSubDomain("near(x[0], 0)").mark(surface_markers, 1)
+    f.CompiledSubDomain("near(x[0], 1)").mark(surface_markers, 2)
+    dx = f.Measure("dx", domain=mesh, subdomain_data=vol_markers)
+    ds = f.Measure("ds", domain=mesh, subdomain_data=surface_markers)
+
+    my_mats = Materials([])
+    my_mats.D = f.interpolate(f.Constant(2), V)
+
+    my_derv_quant = DerivedQuantities(
+        [
+            TotalVolume("solute", 1),
+            TotalVolume("solute", 2),
+            AverageVolume("solute", 2),
+            TotalSurface("solute", 2),
+            AverageSurface("solute", 1),
+            SurfaceFlux("solute", 1),
+            SurfaceFlux("solute", 2),
+        ]
+    )
+    for quantity in my_derv_quant:
+        quantity.function = c
+    my_derv_quant.assign_properties_to_quantities(my_mats)
+    my_derv_quant.assign_measures_to_quantities(dx, ds)
+
+    values = my_derv_quant.compute_integrals()
+    form = my_derv_quant._fused_forms["integrals"][1]
+    my_derv_quant.compute_integrals()
+
+    for i, quantity in enumerate(my_derv_quant):
+        assert values[i] == quantity.compute()
+    assert my_derv_quant._fused_forms["integrals"][1] is form
+
 
 class TestWrite:
     @pytest.fixture
@@ -291,6 +399,49 @@ class TestWrite:
 
         assert os.path.exists(filename)
 
+    def test_write_appends_new_rows(self, folder, my_derived_quantities):
+        """Checks that successive calls to write() only append the new rows
+        and that the file contains all the data
+        """
+        filename = "{}/my_file.csv".format(folder)
+        my_derived_quantities.filename = filename
+        my_derived_quantities.write()
+        my_derived_quantities.time_series.append(4, [5, 6])
+        my_derived_quantities.write()
+        my_derived_quantities.write()
+
+        with open(filename) as file:
+            lines = file.read().splitlines()
+        assert lines == ["a,b,c", "1.0,2.0,3.0", "1.0,2.0,3.0", "4.0,5.0,6.0"]
+
+    def test_write_npz(self, folder, my_derived_quantities):
+        """Checks that the .npz file is only written by finalize() and that
+        it contains the data and the header"""
+        filename = "{}/my_file.npz".format(folder)
+        my_derived_quantities.filename = filename
+        my_derived_quantities.write()
+        assert not os.path.exists(filename)
+        my_derived_quantities.finalize()
+
+        file = np.load(filename)
+        assert file["header"].tolist() == ["a", "b", "c"]
+        assert file["data"].tolist() == [[1, 2, 3], [1, 2, 3]]
+
+    def test_write_hdf5_appends_new_rows(self, folder, my_derived_quantities):
+        """Checks that successive calls to write() append the new rows to
+        the HDF5 dataset"""
+        h5py = pytest.importorskip("h5py")
+        filename = "{}/my_file.h5".format(folder)
+        my_derived_quantities.filename = filename
+        my_derived_quantities.compression = "gzip"
+        my_derived_quantities.write()
+        my_derived_quantities.time_series.append(4, [5, 6])
+        my_derived_quantities.write()
+
+        with h5py.File(filename, "r") as file:
+            assert list(file.attrs["header"]) == ["a", "b", "c"]
+            assert file["data"][:].tolist() == [[1, 2, 3], [1, 2, 3], [4, 5, 6]]
+
     def test_write_folder_doesnt_exist(self, folder, my_derived_quantities):
         """Checks that write() creates the inexisting folder"""
         filename = "{}/folder2/my_file.csv".format(folder)
@@ -499,3 +650,31 @@ def test_instanciate_with_no_derived_quantities():
         filename=folder_results + "derived_quantities.csv",
         nb_iterations_between_exports=1,
     )
+
+
+def test_data_after_spill():
+    """Checks that the data and t of the quantities are lists which are not
+    modified when the rows of the time series are moved to disk"""
+    my_derv_quant = DerivedQuantities([AverageVolume("solute", 1)])
+    my_derv_quant.max_rows_in_memory = 2
+    my_derv_quant.data = [my_derv_quant.make_header()]
+    quantity = my_derv_quant[0]
+    quantity.time_series, quantity.column = my_derv_quant.time_series, 0
+
+    for t in [1, 2]:
+        my_derv_quant.time_series.append(t, [10 * t])
+    data, t, rows = list(quantity.data), quantity.t, my_derv_quant.data
+    for t_new in [3, 4, 5]:
+        my_derv_quant.time_series.append(t_new, [10 * t_new])
+
+    assert my_derv_quant.time_series.nb_rows_on_disk > 0
+    assert data == [10, 20]
+    assert quantity.t is t
+    assert t == [1, 2, 3, 4, 5]
+    assert quantity.data == [10, 20, 30, 40, 50]
+    assert my_derv_quant.data is rows
+    assert rows[1:] == [[t, 10 * t] for t in [1, 2, 3, 4, 5]]
+
+    quantity.data.append(60)
+    quantity.data[0] = 0
+    assert quantity.data == [0, 20, 30, 40, 50, 60]
@@ -52,3 +52,35 @@ class TestCompute:
 
         produced = self.my_max.compute(self.surface_markers)
         assert produced == expected
+
+
+def test_facet_markers():
+    """Checks that the maximum is computed over the facets marked with the
+    surface id"""
+    mesh = f.UnitSquareMesh(8, 8)
+    V = f.FunctionSpace(mesh, "P", 1)
+    c = f.interpolate(f.Expression("x[0] + 2*x[1]", degree=1), V)
+
+    surface_markers = f.MeshFunction("size_t", mesh, 1, 0)
+    f.CompiledSubDomain("near(x[0], 1)").mark(surface_markers, 2)
+
+    my_max = MaximumSurface("solute", 2)
+    my_max.function = c
+
+    assert my_max.compute(surface_markers) == pytest.approx(3)
+
+
+def test_facet_markers_DG():
+    """Checks that the maximum of a DG function is computed over the DOFs
+    located on the facets marked with the surface id"""
+    mesh = f.UnitSquareMesh(8, 8)
+    V = f.FunctionSpace(mesh, "DG", 1)
+    c = f.interpolate(f.Expression("x[0] + 2*x[1]", degree=1), V)
+
+    surface_markers = f.MeshFunction("size_t", mesh, 1, 0)
+    f.CompiledSubDomain("near(x[0], 1)").mark(surface_markers, 2)
+
+    my_max = MaximumSurface("solute", 2)
+    my_max.function = c
+
+    assert my_max.compute(surface_markers) == pytest.approx(3)
@@ -31,3 +31,12 @@ def test_point_compute(mesh, x):
     expected = c(x)
     produced = my_value.compute()
     assert produced == expected
+
+
+def test_point_compute_expression():
+    """Test that the point value export evaluates a field which is not a
+    fenics.Function"""
+    my_value = PointValue("T", 0.5)
+    my_value.function = f.Expression("2*x[0]", degree=1)
+
+    assert my_value.compute() == 1
@@ -0,0 +1,62 @@
+from festim import PointValues, PointValue, DerivedQuantities
+import fenics as f
+import pytest
+
+
+@pytest.mark.parametrize("degree", [1, 2])
+def test_evaluate(degree):
+    """Checks that the values at the points are the values of the function"""
+    mesh = f.UnitSquareMesh(8, 8)
+    V = f.FunctionSpace(mesh, "P", degree)
+    c = f.interpolate(f.Expression("1 + x[0] + 2*x[1]", degree=1), V)
+    points = [(0.1, 0.2), (0.5, 0.5), (1, 1), (0.33, 0.77)]
+
+    point_values = PointValues(points)
+
+    assert point_values.evaluate(c) == pytest.approx([c(p) for p in points])
+
+
+def test_points_located_once():
+    mesh = f.UnitIntervalMesh(10)
+    V = f.FunctionSpace(mesh, "P", 1)
+    c = f.interpolate(f.Expression("x[0]", degree=1), V)
+    point_values = PointValues([0.25, 0.5])
+
+    point_values.evaluate(c)
+    location = point_values.locate(V)
+    c.vector()[:] *= 2
+
+    assert point_values.evaluate(c) == pytest.approx([0.5, 1])
+    assert point_values.locate(V) is location
+
+
+def test_point_outside_of_mesh():
+    mesh = f.UnitIntervalMesh(10)
+    V = f.FunctionSpace(mesh, "P", 1)
+    c = f.Function(V)
+
+    with pytest.raises(ValueError, match="outside of the mesh"):
+        PointValues([0.5, 2]).evaluate(c)
+
+
+def test_derived_quantities_point_values():
+    """Checks that the PointValue quantities computed together by
+    DerivedQuantities have the values of the function"""
+    mesh = f.UnitIntervalMesh(10)
+    V = f.FunctionSpace(mesh, "P", 1)
+    c = f.interpolate(f.Expression("1 + x[0]", degree=1), V)
+    T = f.interpolate(f.Expression("300 + 10*x[0]", degree=1), V)
+
+    my_derv_quant = DerivedQuantities(
+        [
+            PointValue("solute", 0.2),
+            PointValue("T", 0.2),
+            PointValue("solute", 0.7),
+        ]
+    )
+    for quantity in my_derv_quant:
+        quantity.function = T if quantity.field == "T" else c
+
+    values = my_derv_quant.compute_point_values()
+
+    assert [values[i] for i in range(3)] == pytest.approx([1.2, 302, 1.7])
@@ -264,3 +264,8 @@ def test_soret_raises_error_spherical():
     my_flux = SurfaceFluxSpherical("T", 1)
     with pytest.raises(NotImplementedError):
         my_flux.compute(soret=True)
+
+
+def test_consistent_flux_only_for_solute():
+    with pytest.raises(ValueError, match="only available for the solute"):
+        SurfaceFlux("T", 1, consistent=True)
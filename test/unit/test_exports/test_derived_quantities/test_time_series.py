@@ -0,0 +1,62 @@
+from festim import TimeSeries
+import numpy as np
+import pytest
+
+
+def test_append_grows_capacity():
+    """Checks that appending more rows than the initial capacity keeps all
+    the rows"""
+    series = TimeSeries(2, capacity=2)
+    for i in range(5):
+        series.append(i, [2 * i, 3 * i])
+
+    assert len(series) == 5
+    assert np.array_equal(series.t, np.arange(5))
+    assert np.array_equal(series.column(0), 2 * np.arange(5))
+    assert np.array_equal(series.column(1), 3 * np.arange(5))
+
+
+def test_column_is_a_view():
+    """Checks that the columns are contiguous views of the stored array"""
+    series = TimeSeries(2)
+    series.append(1, [2, 3])
+    series.append(4, [5, 6])
+
+    for column in [series.t, series.column(0), series.column(1)]:
+        assert np.shares_memory(column, series.rows())
+        assert column.flags["C_CONTIGUOUS"]
+
+
+def test_rows_from_start():
+    series = TimeSeries(1)
+    for i in range(4):
+        series.append(i, [i])
+
+    assert series.rows(2).tolist() == [[2, 2], [3, 3]]
+
+
+def test_max_rows_in_memory():
+    """Checks that the rows are moved to disk when max_rows_in_memory is
+    reached and that all the rows can still be accessed"""
+    series = TimeSeries(1, max_rows_in_memory=3)
+    for i in range(10):
+        series.append(i, [-i])
+
+    assert series.nb_rows_on_disk == 9
+    assert len(series) == 10
+    assert np.array_equal(series.t, np.arange(10))
+    assert np.array_equal(series.column(0), -np.arange(10))
+    assert series.rows(4).tolist() == [[i, -i] for i in range(4, 10)]
+    assert series.rows(9).tolist() == [[9, -9]]
+
+
+def test_wrong_number_of_values():
+    series = TimeSeries(2)
+    with pytest.raises(ValueError, match="expected 2 values"):
+        series.append(0, [1])
+
+
+@pytest.mark.parametrize("value", [0, -1, 1.5])
+def test_wrong_max_rows_in_memory(value):
+    with pytest.raises(ValueError, match="max_rows_in_memory must be"):
+        TimeSeries(1, max_rows_in_memory=value)
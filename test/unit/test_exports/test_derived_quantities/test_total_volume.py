@@ -42,3 +42,22 @@ class TestCompute:
 
         produced = self.my_total.compute()
         assert produced == expected
+
+    def test_form_compiled_once(self):
+        """Checks that the form is reused between calls and compiled again
+        when the function changes"""
+        self.my_total.compute()
+        form = self.my_total._integrals["total"][1]
+        self.c.vector()[:] *= 2
+        assert self.my_total.compute() == pytest.approx(
+            f.assemble(self.c * self.dx(self.volume))
+        )
+        assert self.my_total._integrals["total"][1] is form
+
+        new_function = f.interpolate(f.Constant(3), self.V)
+        self.my_total.function = new_function
+        assert self.my_total.compute() == pytest.approx(
+            f.assemble(new_function * self.dx(self.volume))
+        )
+        assert self.my_total._integrals["total"][1] is not form
+        self.my_total.function = self.c
@@ -0,0 +1,49 @@
+import festim
+import fenics as f
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def mesh():
+    return f.UnitSquareMesh(4, 4)
+
+
+@pytest.mark.parametrize("family,degree", [("DG", 1), ("DG", 0), ("P", 1)])
+def test_same_as_project(mesh, family, degree):
+    """Checks that the projection is the same as fenics.project"""
+    V = f.FunctionSpace(mesh, family, degree)
+    u = f.interpolate(f.Expression("x[0]*x[0] + x[1]", degree=2), V)
+    expression = u**2 + 1
+    projector = festim.Projector()
+
+    projection = projector.project(expression, V)
+
+    expected = f.project(expression, V)
+    assert np.allclose(projection.vector()[:], expected.vector()[:])
+
+
+def test_projections_reused(mesh):
+    """Checks that the solver of a function space is created once and that the
+    projected function of an expression is reused and updated
+    """
+    V = f.FunctionSpace(mesh, "P", 1)
+    V_DG1 = f.FunctionSpace(mesh, "DG", 1)
+    u = f.Function(V)
+    projector = festim.Projector()
+
+    u.assign(f.Constant(1))
+    projection = projector.project(u + 1, V_DG1)
+    solver = projector.get_solver(V_DG1)
+    assert np.allclose(projection.vector()[:], 2)
+
+    u.assign(f.Constant(2))
+    # a new expression structurally equal to the previous one
+    new_projection = projector.project(u + 1, V_DG1)
+    assert new_projection is projection
+    assert projector.get_solver(V_DG1) is solver
+    assert np.allclose(new_projection.vector()[:], 3)
+
+    other_projection = projector.project(2 * u, V_DG1)
+    assert other_projection is not projection
+    assert np.allclose(other_projection.vector()[:], 4)
@@ -1,5 +1,6 @@
 from festim import TXTExport, Stepsize
 import fenics as f
+import numpy as np
 import os
 import pytest
 from pathlib import Path
@@ -68,6 +69,97 @@ class TestWrite:
 
         assert os.path.exists(my_export.filename)
 
+    def test_columns_appended(self, my_export, function):
+        """Checks that a column is added to the file at each export"""
+        my_export.function = function
+        for current_time in [1, 1.5, 2, 3]:
+            function.assign(f.Constant(current_time))
+            my_export.write(current_time=current_time, steady=False)
+
+        data = np.genfromtxt(my_export.filename, skip_header=1, delimiter=",")
+        assert data.shape[1] == 4
+        assert np.allclose(data[:, 1:], [1, 2, 3])
+        header = open(my_export.filename).readline().rstrip()
+        assert header == "x,t=1.00e+00s,t=2.00e+00s,t=3.00e+00s"
+
+    def test_profiles_not_in_memory(self, my_export, function):
+        """Checks that the profiles are stored in a temporary file and that the
+        file is complete after each export"""
+        my_export.function = function
+        for current_time in [1, 2]:
+            function.assign(f.Constant(current_time))
+            my_export.write(current_time=current_time, steady=False)
+            data = np.genfromtxt(my_export.filename, skip_header=1, delimiter=",")
+            assert np.allclose(data[:, -1], current_time)
+
+        assert isinstance(my_export.read_profiles(), np.memmap)
+        assert my_export.t == [1, 2]
+
+    def test_rows_layout(self, my_export, function):
+        """Checks that a row is appended to the file at each export with the
+        "rows" layout"""
+        my_export.layout = "rows"
+        my_export.function = function
+        for current_time in [1, 2, 3]:
+            function.assign(f.Constant(current_time))
+            my_export.write(current_time=current_time, steady=False)
+            data = np.genfromtxt(my_export.filename, skip_header=1, delimiter=",")
+            assert np.atleast_2d(data)[-1, 0] == current_time
+
+        x = np.genfromtxt(my_export.filename, delimiter=",", max_rows=1)[1:]
+        assert np.allclose(x, my_export.data[0])
+        assert data.shape == (3, x.size + 1)
+        assert np.allclose(data[:, 1:], [[1], [2], [3]])
+
+    def test_error_layout(self, my_export):
+        with pytest.raises(ValueError, match="layout must be"):
+            TXTExport("solute", filename=my_export.filename, layout="coucou")
+
+    def test_write_npz(self, my_export, function):
+        """Checks that x, the export times and the profiles are written in a
+        .npz file"""
+        my_export.filename = my_export.filename.replace(".txt", ".npz")
+        my_export.function = function
+        for current_time in [1, 2]:
+            function.assign(f.Constant(current_time))
+            my_export.write(current_time=current_time, steady=False)
+        my_export.finalize()
+
+        file = np.load(my_export.filename)
+        assert file["t"].tolist() == [1, 2]
+        assert file["data"].shape == (2, file["x"].size)
+        assert np.allclose(file["data"][1], 2)
+
+    def test_write_hdf5(self, my_export, function):
+        """Checks that the profiles are appended to the HDF5 datasets at each
+        export"""
+        h5py = pytest.importorskip("h5py")
+        my_export.filename = my_export.filename.replace(".txt", ".h5")
+        my_export.function = function
+        for current_time in [1, 2, 3]:
+            function.assign(f.Constant(current_time))
+            my_export.write(current_time=current_time, steady=False)
+
+        with h5py.File(my_export.filename, "r") as file:
+            assert file["t"][:].tolist() == [1, 2, 3]
+            assert file["data"].shape == (3, file["x"].size)
+            assert np.allclose(file["data"][2], 3)
+
+    def test_DG1_function_not_projected(self, my_export):
+        """Checks that a function in a DG1 function space is exported as is"""
+        mesh = f.UnitIntervalMesh(10)
+        V_DG1 = f.FunctionSpace(mesh, "DG", 1)
+        function = f.interpolate(f.Expression("x[0]*x[0]", degree=2), V_DG1)
+        my_export.function = function
+        my_export.write(current_time=1, steady=False)
+
+        assert my_export.get_V_DG1().id() == V_DG1.id()
+        assert np.array_equal(my_export.data[1], function.vector()[:])
+        assert np.allclose(
+            my_export.data[0],
+            function.function_space().tabulate_dof_coordinates()[:, 0],
+        )
+
     def test_error_filename_endswith_txt(self, my_export):
         with pytest.raises(ValueError, match="filename must end with .txt"):
             my_export.filename = "coucou"
@@ -5,9 +5,32 @@ from festim import (
     as_constant,
     as_expression,
     as_constant_or_expression,
+    separate_space_and_time,
+    SeparableExpression,
+    TimeDependentConstant,
+    ExpressionsRegistry,
+    is_time_dependent,
+    cached_expression,
+    to_ccode,
+    clear_caches,
+    subdomain_dofs,
+    estimate_quadrature_degree,
     t,
+    x,
 )
-from fenics import Constant, Expression, UserExpression
+from fenics import (
+    Constant,
+    Expression,
+    Function,
+    UnitIntervalMesh,
+    UserExpression,
+    FunctionSpace,
+    MeshFunction,
+    CompiledSubDomain,
+    dx,
+)
+import numpy as np
+import sympy as sp
 import pytest
 
 
@@ -36,7 +59,8 @@ class CustomExpr(UserExpression):
 @pytest.mark.parametrize(
     "expression,type",
     [
-        (3 * t, Expression),
+        (3 * t, TimeDependentConstant),
+        (3 * x * t, Expression),
         (Expression("2 + x[0]", degree=2), Expression),
         (CustomExpr(), UserExpression),
     ],
@@ -54,10 +78,199 @@ def test_as_expression(expression, type):
         (-2.0, Constant),
         (Constant(2.0), Constant),
         # expressions
-        (3 * t, Expression),
+        (3 * t, TimeDependentConstant),
+        (3 * x * t, Expression),
         (Expression("2 + x[0]", degree=2), Expression),
         (CustomExpr(), UserExpression),
     ],
 )
 def test_as_constant_or_expression(expression, type):
     assert isinstance(as_constant_or_expression(expression), type)
+
+
+@pytest.mark.parametrize(
+    "expression,spatial,temporal",
+    [
+        (2 * x * t, 2 * x, t),
+        (x * t + x, x, t + 1),
+        (sp.exp(-x) * sp.Piecewise((1, t < 10), (0, True)), sp.exp(-x), None),
+    ],
+)
+def test_separate_space_and_time(expression, spatial, temporal):
+    separated = separate_space_and_time(expression)
+    assert separated is not None
+    assert separated[0] == spatial
+    if temporal is not None:
+        assert separated[1] == temporal
+
+
+@pytest.mark.parametrize("expression", [x + t, 2 * x, 2 * t, sp.sin(x * t)])
+def test_separate_space_and_time_not_separable(expression):
+    assert separate_space_and_time(expression) is None
+
+
+def test_time_dependent_constant():
+    """Checks that the value of a TimeDependentConstant is updated when
+    setting t
+    """
+    constant = TimeDependentConstant(sp.Piecewise((1 + t, t < 10), (0, True)))
+    assert float(constant) == 1
+    constant.t = 3
+    assert float(constant) == 4
+    constant.t = 20
+    assert float(constant) == 0
+
+
+@pytest.mark.parametrize("expr", [1 / t, sp.log(t), 2 * sp.sqrt(t - 1)])
+def test_time_dependent_constant_undefined_at_zero(expr):
+    """Checks that a TimeDependentConstant can be created from an expression
+    not defined at t=0 and that it is evaluated when setting t"""
+    constant = TimeDependentConstant(expr)
+    assert constant.t is None
+    assert np.isnan(float(constant))
+    constant.t = 2
+    assert float(constant) == pytest.approx(float(expr.subs(t, 2)))
+
+
+@pytest.mark.parametrize("time", [-1, 0, 1, 2, 3])
+def test_time_dependent_constant_heaviside(time):
+    """Checks that a TimeDependentConstant with Heaviside functions has the
+    value of the fenics.Expression of the same sympy expression"""
+    expr = sp.Heaviside(t) + 2 * sp.Heaviside(t - 2)
+    constant = TimeDependentConstant(expr, t=time)
+    expression = Expression(to_ccode(expr), t=time, degree=0)
+    assert float(constant) == expression(0.5)
+
+
+def test_separable_expression():
+    """Checks that the time factor of a SeparableExpression is updated when
+    setting t and that the spatial part is interpolated once
+    """
+    expr = SeparableExpression(1 + x, 2 * t)
+    assert float(expr.time_factor) == 0
+    expr.t = 3
+    assert float(expr.time_factor) == 6
+
+    expr.interpolate(UnitIntervalMesh(10))
+    assert isinstance(expr.spatial, Function)
+    assert expr.spatial(0.5) == pytest.approx(1.5)
+
+
+@pytest.mark.parametrize(
+    "expression,expected",
+    [
+        (Expression("2 + t", degree=1, t=0), True),
+        (Expression("2 + x[0]", degree=1, t=0), False),
+        (Expression("2", degree=1), False),
+        (Constant(2), False),
+        (TimeDependentConstant(2 * t), True),
+        (SeparableExpression(x, t), True),
+        (CustomExpr(), True),
+    ],
+)
+def test_is_time_dependent(expression, expected):
+    assert is_time_dependent(expression) == expected
+
+
+def test_expressions_registry():
+    """Checks that ExpressionsRegistry doesn't contain duplicates and only
+    updates the time dependent expressions
+    """
+    time_dependent = Expression("2 + t", degree=1, t=0)
+    constant = Expression("2 + x[0]", degree=1, t=0)
+
+    registry = ExpressionsRegistry([time_dependent, constant])
+    registry += [time_dependent, constant]
+    registry.append(constant)
+
+    assert registry == [time_dependent, constant]
+    assert registry.time_dependent == [time_dependent]
+    registry.update(3)
+    assert time_dependent.t == 3
+    assert constant.t == 0
+
+
+class LazyTimeExpr(UserExpression):
+    """UserExpression whose t attribute is only set when the time is"""
+
+    def eval(self, x, values):
+        values[0] = getattr(self, "t", 0)
+
+
+def test_expressions_registry_user_expression():
+    """Checks that ExpressionsRegistry updates UserExpressions without a t
+    attribute when they are registered
+    """
+    expression = LazyTimeExpr()
+    registry = ExpressionsRegistry([expression])
+
+    assert registry.time_dependent == [expression]
+    registry.update(3)
+    assert expression(0.5) == 3
+
+
+def test_cached_expression():
+    """Checks that cached_expression shares the Expressions not depending on
+    time and creates new ones for time dependent expressions
+    """
+    assert cached_expression(2 * x + 1) is cached_expression(2 * x + 1)
+    assert cached_expression(2 * x + 1) is not cached_expression(2 * x + 1, degree=1)
+    assert cached_expression(2 * x * t) is not cached_expression(2 * x * t)
+
+
+def test_clear_caches():
+    """Checks that the Expressions and the DOFs are not shared anymore once
+    the caches are cleared"""
+    mesh = UnitIntervalMesh(10)
+    V = FunctionSpace(mesh, "P", 1)
+    volume_markers = MeshFunction("size_t", mesh, 1, 1)
+    expression = cached_expression(2 * x + 1)
+    dofs = subdomain_dofs(V, volume_markers, 1)
+
+    clear_caches()
+
+    assert cached_expression(2 * x + 1) is not expression
+    assert subdomain_dofs(V, volume_markers, 1) is not dofs
+
+
+def test_subdomain_dofs():
+    """Checks that subdomain_dofs finds the DOFs of the marked cells and
+    that they are only computed once"""
+    mesh = UnitIntervalMesh(10)
+    V = FunctionSpace(mesh, "P", 1)
+    volume_markers = MeshFunction("size_t", mesh, 1, 1)
+    CompiledSubDomain("x[0] <= 0.5 + DOLFIN_EPS").mark(volume_markers, 2)
+
+    dofs = subdomain_dofs(V, volume_markers, 2)
+    x = V.tabulate_dof_coordinates()[dofs, 0]
+
+    assert np.allclose(np.sort(x), np.linspace(0, 0.5, num=6))
+    assert subdomain_dofs(V, volume_markers, 2) is dofs
+
+
+def test_subdomain_dofs_DG_facets():
+    """Checks that subdomain_dofs finds the DOFs of a DG function space
+    located on the marked facets"""
+    mesh = UnitIntervalMesh(10)
+    V = FunctionSpace(mesh, "DG", 1)
+    surface_markers = MeshFunction("size_t", mesh, 0, 0)
+    CompiledSubDomain("near(x[0], 1)").mark(surface_markers, 2)
+    CompiledSubDomain("near(x[0], 0.5)").mark(surface_markers, 3)
+
+    x = V.tabulate_dof_coordinates()[:, 0]
+
+    assert np.allclose(x[subdomain_dofs(V, surface_markers, 2)], [1])
+    # interior facet: one DOF in each adjacent cell
+    assert np.allclose(x[subdomain_dofs(V, surface_markers, 3)], [0.5, 0.5])
+
+
+def test_estimate_quadrature_degree():
+    """Checks that estimate_quadrature_degree returns the degree estimated
+    from the integrand unless it is set in the measure"""
+    mesh = UnitIntervalMesh(10)
+    V = FunctionSpace(mesh, "P", 2)
+    u = Function(V)
+
+    assert estimate_quadrature_degree(u, dx) == 2
+    assert estimate_quadrature_degree(u * u, dx) == 4
+    assert estimate_quadrature_degree(u * u, dx(degree=1)) == 1
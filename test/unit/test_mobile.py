@@ -198,6 +198,64 @@ class TestCreateDiffusionForm:
         print(my_mobile.F)
         assert my_mobile.F.equals(expected_form)
 
+    @pytest.mark.parametrize("mass_lumping", ["traps", "all"])
+    def test_with_traps_transient_mass_lumping(self, mass_lumping):
+        """Check that the trapping terms (and the transient term if
+        mass_lumping is "all") are integrated with a vertex quadrature"""
+        # build
+        Index._globalcount = 8
+        my_mobile = festim.Mobile()
+        my_mobile.F = 0
+        my_mobile.solution = f.Function(self.V, name="c_m")
+        my_mobile.previous_solution = f.Function(self.V, name="c_m_n")
+        my_mobile.test_function = f.TestFunction(self.V)
+        my_mats = festim.Materials([self.mat1])
+
+        trap1 = festim.Trap(1, 1, 1, 1, self.mat1, 1)
+        add_functions(trap1, self.V, id=1)
+
+        my_traps = festim.Traps([trap1])
+
+        # run
+        my_mobile.create_diffusion_form(
+            my_mats,
+            self.my_mesh,
+            self.my_temp,
+            dt=self.dt,
+            traps=my_traps,
+            mass_lumping=mass_lumping,
+        )
+
+        # test
+        Index._globalcount = 8
+        v = my_mobile.test_function
+        D = self.mat1.D_0 * f.exp(-self.mat1.E_D / festim.k_B / self.my_temp.T)
+        c_0 = my_mobile.solution
+        c_0_n = my_mobile.previous_solution
+        dx_lumped = self.my_mesh.dx(1, scheme="vertex", degree=1)
+        dx_transient = dx_lumped if mass_lumping == "all" else self.my_mesh.dx(1)
+        expected_form = ((c_0 - c_0_n) / self.dt.value) * v * dx_transient
+        expected_form += f.dot(D * f.grad(c_0), f.grad(v)) * self.my_mesh.dx(1)
+        form_trapping_expected = (
+            (
+                -trap1.k_0
+                * f.exp(-trap1.E_k / festim.k_B / self.my_temp.T)
+                * c_0
+                * (trap1.density[0] - trap1.solution)
+            )
+            * v
+            * dx_lumped
+        )
+        form_trapping_expected += (
+            trap1.p_0
+            * f.exp(-trap1.E_p / festim.k_B / self.my_temp.T)
+            * trap1.solution
+            * v
+            * dx_lumped
+        )
+        expected_form += -form_trapping_expected
+        assert my_mobile.F.equals(expected_form)
+
     def test_with_trap_conglo_transient(self):
         """Check for the case of transient simulation with a trap conglomerate"""
         # build
@@ -41,11 +41,14 @@ def test_implantation_flux_with_time_dependancy():
         / (width * (2 * np.pi) ** 0.5)
         * sp.exp(-0.5 * ((festim.x - imp_depth) / width) ** 2)
     )
-    expected_value = sp.printing.ccode(flux * distribution)
 
     my_source = festim.ImplantationFlux(flux=flux, imp_depth=5e-9, width=5e-9, volume=1)
 
-    assert my_source.value._cppcode == expected_value
+    assert isinstance(my_source.value, festim.SeparableExpression)
+    assert my_source.value.spatial._cppcode == sp.printing.ccode(distribution)
+    assert float(my_source.value.time_factor) == 1
+    my_source.value.t = 20
+    assert float(my_source.value.time_factor) == 0
 
 
 def test_source_with_float_value():
@@ -66,6 +69,17 @@ def test_source_with_int_value():
     assert isinstance(source.value, f.Constant)
 
 
+def test_source_with_time_dependent_value():
+    """
+    Tests that Source created with a sympy expression of time only has a
+    festim.TimeDependentConstant .value attribute
+    """
+    source = festim.Source(1 + festim.t, volume=1, field="solute")
+    assert isinstance(source.value, festim.TimeDependentConstant)
+    source.value.t = 2
+    assert float(source.value) == 3
+
+
 def test_source_with_expression_value():
     """
     Tests that Source can be created with a fenics.Expression value and that
@@ -240,3 +240,38 @@ def test_temperature_from_xdmf(tmpdir):
     temperature = festim.TemperatureFromXDMF(T_file, "T")
 
     assert temperature.is_steady_state()
+
+
+def test_heat_transfer_problem_own_mesh():
+    """Checks that the temperature computed on the mesh of the
+    HeatTransferProblem is correctly interpolated on the mesh of the
+    simulation"""
+    # coarse mesh for the heat transfer problem, fine mesh for H transport
+    heat_mesh = festim.MeshFromVertices(np.linspace(0, 1, num=5))
+    my_mesh = festim.MeshFromVertices(np.linspace(0, 1, num=101))
+    my_mats = festim.Materials([festim.Material(id=1, D_0=1, E_D=0, thermal_cond=1)])
+    my_mesh.define_measures(my_mats)
+
+    my_temp = festim.HeatTransferProblem(transient=False, mesh=heat_mesh)
+    my_temp.boundary_conditions = [
+        festim.DirichletBC(surfaces=1, value=300, field="T"),
+        festim.DirichletBC(surfaces=2, value=500, field="T"),
+    ]
+    my_temp.create_functions(my_mats, my_mesh)
+
+    assert my_temp.T_heat.function_space().dim() == 5
+    assert my_temp.T.function_space().dim() == 101
+    # the temperature is linear so the interpolation is exact
+    T_exact = fenics.interpolate(
+        fenics.Expression("300 + 200*x[0]", degree=1), my_temp.T.function_space()
+    )
+    assert fenics.errornorm(T_exact, my_temp.T, "L2") < 1e-8
+
+
+def test_heat_transfer_problem_coupled_with_mesh():
+    """Checks that an error is raised when a coupled HeatTransferProblem has
+    its own mesh"""
+    with pytest.raises(ValueError, match="cannot have its own mesh"):
+        festim.HeatTransferProblem(
+            coupled=True, mesh=festim.MeshFromVertices([0, 1, 2])
+        )
@@ -1,5 +1,7 @@
 import festim
 import fenics as f
+import numpy as np
+import pytest
 
 
 class TestExtrinsicTrap:
@@ -87,3 +89,96 @@ class TestExtrinsicTrap:
         self.my_trap.relative_tolerance = 1
         self.my_trap.maximum_iterations = 1
         self.my_trap.linear_solver = "mumps"
+
+
+def test_update_density_pointwise():
+    """Checks that the pointwise update of the density of an ExtrinsicTrap
+    is the exact solution of dn/dt = a - b*n"""
+    my_trap = festim.ExtrinsicTrap(
+        1,
+        1,
+        1,
+        1,
+        "mat_name",
+        phi_0=2,
+        n_amax=2,
+        n_bmax=4,
+        eta_a=1,
+        eta_b=1,
+        f_a=1,
+        f_b=1,
+        pointwise=True,
+    )
+    V = f.FunctionSpace(f.UnitIntervalMesh(10), "P", 1)
+    my_trap.density = [f.Function(V)]
+    my_trap.density_previous_solution = f.interpolate(f.Constant(1), V)
+    my_temp = festim.Temperature(value=100)
+    my_temp.T = f.interpolate(f.Constant(100), V)
+    dt = festim.Stepsize(initial_value=0.5)
+
+    my_trap.update_density_pointwise(dt, my_temp)
+
+    # dn/dt = phi_0*(2 - n/n_amax - n/n_bmax) = 4 - 1.5*n
+    a, b, n_0 = 4, 1.5, 1
+    expected = a / b + (n_0 - a / b) * np.exp(-b * 0.5)
+    assert my_trap.density[0].vector().get_local() == pytest.approx(expected)
+
+
+def test_error_pointwise_and_coupled():
+    """Checks that an error is raised when an extrinsic trap is both pointwise
+    and coupled"""
+    with pytest.raises(ValueError, match="both pointwise and coupled"):
+        festim.NeutronInducedTrap(
+            1,
+            1,
+            1,
+            1,
+            "mat_name",
+            phi=1,
+            K=1,
+            n_max=1,
+            A_0=1,
+            E_A=1,
+            pointwise=True,
+            coupled=True,
+        )
+
+
+def test_error_pointwise_not_implemented():
+    """Checks that an error is raised when an extrinsic trap doesn't
+    implement the pointwise update"""
+
+    class MyTrap(festim.ExtrinsicTrapBase):
+        pass
+
+    with pytest.raises(ValueError, match="pointwise update is not implemented"):
+        MyTrap(1, 1, 1, 1, "mat_name", pointwise=True)
+
+
+def test_nodal_values_cached():
+    """Checks that the nodal values of time independent expressions are only
+    interpolated once and that time dependent ones are updated"""
+    my_trap = festim.ExtrinsicTrap(
+        1,
+        1,
+        1,
+        1,
+        "mat_name",
+        phi_0=1 + festim.t * festim.x,
+        n_amax=2 + festim.x,
+        n_bmax=2,
+        eta_a=1,
+        eta_b=1,
+        f_a=1,
+        f_b=1,
+        pointwise=True,
+    )
+    V = f.FunctionSpace(f.UnitIntervalMesh(10), "P", 1)
+
+    n_amax = my_trap.nodal_values(my_trap.n_amax, V)
+    assert my_trap.nodal_values(my_trap.n_amax, V) is n_amax
+
+    my_trap.phi_0.t = 1
+    phi_0 = my_trap.nodal_values(my_trap.phi_0, V)
+    my_trap.phi_0.t = 2
+    assert my_trap.nodal_values(my_trap.phi_0, V) != pytest.approx(phi_0)
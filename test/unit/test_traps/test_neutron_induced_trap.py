@@ -1,5 +1,7 @@
 import festim
 import fenics as f
+import numpy as np
+import pytest
 
 
 class TestNeutronInducedTrap:
@@ -169,3 +171,24 @@ class TestNeutronInducedTrapSolverParameters:
         self.my_trap.absolute_tolerance = 3.6
 
         assert self.my_trap.absolute_tolerance == expected_tolerance
+
+
+def test_update_density_pointwise():
+    """Checks that the pointwise update of the density of a
+    NeutronInducedTrap is the exact solution of dn/dt = a - b*n"""
+    my_trap = festim.NeutronInducedTrap(
+        1, 1, 1, 1, "mat_name", phi=2, K=3, n_max=4, A_0=5, E_A=0.1, pointwise=True
+    )
+    V = f.FunctionSpace(f.UnitIntervalMesh(10), "P", 1)
+    my_trap.density = [f.Function(V)]
+    my_trap.density_previous_solution = f.Function(V)
+    my_temp = festim.Temperature(value=500)
+    my_temp.T = f.interpolate(f.Constant(500), V)
+    dt = festim.Stepsize(initial_value=2)
+
+    my_trap.update_density_pointwise(dt, my_temp)
+
+    a = 2 * 3
+    b = 2 * 3 / 4 + 5 * np.exp(-0.1 / festim.k_B / 500)
+    expected = a / b * (1 - np.exp(-b * 2))
+    assert my_trap.density[0].vector().get_local() == pytest.approx(expected)
@@ -1,6 +1,7 @@
 import festim
 import fenics as f
 import pytest
+import numpy as np
 
 
 def add_functions(trap, V, id=1):
@@ -659,3 +660,117 @@ class TestCreateForm:
         print(my_trap.F)
         print(expected_form)
         assert my_trap.F.equals(expected_form)
+
+
+def test_create_restriction_bcs():
+    """Checks that the restriction BCs set the trap concentration to zero
+    outside of the trap materials, the interface being left free"""
+    mat1 = festim.Material(1, D_0=1, E_D=0, borders=[0, 0.5])
+    mat2 = festim.Material(2, D_0=1, E_D=0, borders=[0.5, 1])
+    my_mats = festim.Materials([mat1, mat2])
+    my_mesh = festim.MeshFromVertices(np.linspace(0, 1, num=11))
+    my_mesh.define_measures(my_mats)
+    V = f.FunctionSpace(my_mesh.mesh, "CG", 1)
+
+    my_trap = festim.Trap(1, 1, 1, 1, materials=[mat1], density=1)
+    bcs = my_trap.create_restriction_bcs(V, my_mesh.volume_markers)
+
+    u = f.interpolate(f.Constant(1), V)
+    for bc in bcs:
+        bc.apply(u.vector())
+
+    assert u(0.25) == pytest.approx(1)
+    assert u(0.5) == pytest.approx(1)
+    assert u(0.6) == pytest.approx(0)
+    assert u(1) == pytest.approx(0)
+
+
+def test_create_restriction_bcs_2D():
+    """Checks that the trap DOFs on the interface between the trap material
+    and the other material are left free in 2D"""
+    mesh = f.UnitSquareMesh(8, 8)
+    volume_markers = f.MeshFunction("size_t", mesh, mesh.topology().dim(), 1)
+    f.CompiledSubDomain("x[0] >= 0.5 - DOLFIN_EPS").mark(volume_markers, 2)
+    V = f.FunctionSpace(
+        mesh, f.MixedElement([f.FiniteElement("CG", mesh.ufl_cell(), 1)] * 2)
+    )
+    mat1 = festim.Material(1, D_0=1, E_D=0)
+
+    my_trap = festim.Trap(1, 1, 1, 1, materials=[mat1], density=1)
+    bcs = my_trap.create_restriction_bcs(V, volume_markers, component=1)
+
+    u = f.interpolate(f.Constant((1, 1)), V)
+    for bc in bcs:
+        bc.apply(u.vector())
+
+    for y in np.linspace(0, 1, num=9):
+        assert u(0.5, y)[1] == pytest.approx(1)
+        assert u(0.25, y)[1] == pytest.approx(1)
+        assert u(0.75, y)[1] == pytest.approx(0)
+        assert u(1, y)[1] == pytest.approx(0)
+        # the other components are not constrained
+        assert u(1, y)[0] == pytest.approx(1)
+
+
+def test_create_restriction_bcs_trap_everywhere():
+    """Checks that no restriction BC is created when the trap is defined in
+    all the materials"""
+    mat1 = festim.Material(1, D_0=1, E_D=0)
+    my_mesh = festim.MeshFromVertices(np.linspace(0, 1, num=11))
+    my_mesh.define_measures(festim.Materials([mat1]))
+    V = f.FunctionSpace(my_mesh.mesh, "CG", 1)
+
+    my_trap = festim.Trap(1, 1, 1, 1, materials=[mat1], density=1)
+
+    assert my_trap.create_restriction_bcs(V, my_mesh.volume_markers) == []
+
+
+def test_get_equilibrium_concentration():
+    """Checks that the trapped concentration at equilibrium cancels the
+    trapping and detrapping terms"""
+    mesh = f.UnitIntervalMesh(10)
+    V = f.FunctionSpace(mesh, "CG", 1)
+    c_m = f.interpolate(f.Expression("1 + x[0]", degree=1), V)
+    T = f.interpolate(f.Constant(500), V)
+    my_trap = festim.Trap(
+        k_0=[1, 2],
+        E_k=[0.1, 0.2],
+        p_0=[3, 4],
+        E_p=[0.5, 0.6],
+        materials=["1", "2"],
+        density=[2, 3],
+        equilibrium=True,
+    )
+
+    for i in range(2):
+        c_t = my_trap.get_equilibrium_concentration(c_m, T, i)
+        k = my_trap.k_0[i] * f.exp(-my_trap.E_k[i] / festim.k_B / T)
+        p = my_trap.p_0[i] * f.exp(-my_trap.E_p[i] / festim.k_B / T)
+        residual = k * c_m * (my_trap.density[i] - c_t) - p * c_t
+        assert f.assemble(residual**2 * f.dx) == pytest.approx(0)
+
+
+def test_project_equilibrium_concentration():
+    """Checks that the projection of the trapped concentration at
+    equilibrium updates the same function and matches a direct projection"""
+    mat1 = festim.Material(1, D_0=1, E_D=0)
+    my_mesh = festim.MeshFromVertices(np.linspace(0, 1, num=11))
+    my_mesh.define_measures(festim.Materials([mat1]))
+    V_CG1 = f.FunctionSpace(my_mesh.mesh, "CG", 1)
+    V_DG1 = f.FunctionSpace(my_mesh.mesh, "DG", 1)
+    mobile = festim.Mobile()
+    mobile.solution = f.interpolate(f.Expression("1 + x[0]", degree=1), V_CG1)
+    mobile.previous_solution = f.interpolate(f.Constant(1), V_CG1)
+    T = festim.Temperature(500)
+    T.T = f.interpolate(f.Constant(500), V_CG1)
+    my_trap = festim.Trap(1, 0.1, 1, 0.5, materials=mat1, density=2, equilibrium=True)
+
+    my_trap.initialise_equilibrium(mobile, T, V_DG1, my_mesh.dx)
+    c_t = my_trap.project_equilibrium_concentration()
+    mobile.solution.assign(f.Constant(3))
+
+    assert my_trap.project_equilibrium_concentration() is c_t
+    expected = f.project(
+        my_trap.get_equilibrium_concentration(mobile.solution, T.T, 0), V_DG1
+    )
+    assert np.allclose(c_t.vector()[:], expected.vector()[:])
@@ -1,6 +1,7 @@
 import festim
 import fenics as f
 import pytest
+import numpy as np
 
 
 def test_set_traps():
@@ -259,3 +260,105 @@ def test_instanciate_with_no_elements():
     """
     # define exports
     festim.Traps()
+
+
+class TestMakeComponents:
+    """
+    General test for the make_components method of the festim.Traps class
+    """
+
+    mat1 = festim.Material(1, D_0=1, E_D=0, borders=[0, 0.3])
+    mat2 = festim.Material(2, D_0=1, E_D=0, borders=[0.3, 0.6])
+    mat3 = festim.Material(3, D_0=1, E_D=0, borders=[0.6, 1])
+    my_mats = festim.Materials([mat1, mat2, mat3])
+    my_mesh = festim.MeshFromVertices(np.linspace(0, 1, num=21))
+    my_mesh.define_measures(my_mats)
+
+    def make_traps(self):
+        return festim.Traps(
+            [
+                festim.Trap(1, 1, 1, 1, self.mat1, density=1),
+                festim.Trap(1, 1, 1, 1, self.mat2, density=1),
+                festim.Trap(1, 1, 1, 1, self.mat3, density=1),
+            ]
+        )
+
+    def test_continuous_elements(self):
+        """Checks that only the traps in non adjacent materials are
+        conglomerated with CG elements"""
+        my_traps = self.make_traps()
+
+        nb_components = my_traps.make_components(self.my_mesh.volume_markers, "CG")
+
+        assert nb_components == 2
+        assert [trap.component for trap in my_traps] == [1, 2, 1]
+        assert [trap.shared_component for trap in my_traps] == [True, False, True]
+
+    def test_discontinuous_elements(self):
+        """Checks that all the traps in disjoint materials are conglomerated
+        with DG elements"""
+        my_traps = self.make_traps()
+
+        nb_components = my_traps.make_components(self.my_mesh.volume_markers, "DG")
+
+        assert nb_components == 1
+        assert [trap.component for trap in my_traps] == [1, 1, 1]
+
+    def test_overlapping_materials(self):
+        """Checks that traps sharing a material are not conglomerated"""
+        my_traps = festim.Traps(
+            [
+                festim.Trap(1, 1, 1, 1, [self.mat1, self.mat3], density=1),
+                festim.Trap(1, 1, 1, 1, self.mat3, density=1),
+            ]
+        )
+
+        nb_components = my_traps.make_components(self.my_mesh.volume_markers, "DG")
+
+        assert nb_components == 2
+        assert not any(trap.shared_component for trap in my_traps)
+
+    def test_excluded_traps(self):
+        """Checks that excluded traps keep their own component"""
+        my_traps = self.make_traps()
+
+        nb_components = my_traps.make_components(
+            self.my_mesh.volume_markers, "DG", excluded=[my_traps[1]]
+        )
+
+        assert nb_components == 2
+        assert [trap.component for trap in my_traps] == [1, 2, 1]
+
+    def test_no_conglomeration(self):
+        """Checks that each trap has its own component if conglomerate is
+        False"""
+        my_traps = self.make_traps()
+
+        nb_components = my_traps.make_components(
+            self.my_mesh.volume_markers, "DG", conglomerate=False
+        )
+
+        assert nb_components == 3
+        assert [trap.component for trap in my_traps] == [1, 2, 3]
+        assert not any(trap.shared_component for trap in my_traps)
+
+    def test_materials_sharing_a_vertex(self):
+        """Checks that traps in materials only sharing a vertex are not
+        conglomerated with CG elements"""
+        mesh = f.UnitSquareMesh(4, 4)
+        volume_markers = f.MeshFunction("size_t", mesh, mesh.topology().dim(), 3)
+        f.CompiledSubDomain(
+            "x[0] <= 0.5 + DOLFIN_EPS && x[1] <= 0.5 + DOLFIN_EPS"
+        ).mark(volume_markers, 1)
+        f.CompiledSubDomain(
+            "x[0] >= 0.5 - DOLFIN_EPS && x[1] >= 0.5 - DOLFIN_EPS"
+        ).mark(volume_markers, 2)
+        my_traps = festim.Traps(
+            [
+                festim.Trap(1, 1, 1, 1, self.mat1, density=1),
+                festim.Trap(1, 1, 1, 1, self.mat2, density=1),
+            ]
+        )
+
+        assert my_traps.make_components(volume_markers, "CG") == 2
+        assert my_traps.make_components(volume_markers, "DG") == 1